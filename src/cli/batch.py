@@ -0,0 +1,371 @@
+"""Handlers for ``anyimg batch`` subcommands."""
+
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+from src.cli.console import LazyConsole
+from src.cli.parser import parse_batch_args
+
+if TYPE_CHECKING:
+    from src.models.result import GenerationResult
+    from src.services.batch_api_service import BatchAPIService
+    from src.services.ledger_service import JobLedger
+
+
+def handle_build(
+    prompts_file: Path,
+    output_path: Path,
+    aspect_ratio: str | None,
+    resolution: str | None,
+    console: LazyConsole,
+) -> int:
+    """Compile a prompts file into Batch API request JSONL.
+
+    Args:
+        prompts_file: Prompts file to read
+        output_path: Batch request JSONL to write
+        aspect_ratio: Default aspect ratio for rows
+        resolution: Default resolution for rows
+        console: Console for output
+
+    Returns:
+        Exit code (0=success)
+    """
+    from src.services.batch_builder_service import BatchBuilder
+    from src.utils.prompts_file import iter_prompt_rows
+
+    builder = BatchBuilder()
+    rows = iter_prompt_rows(prompts_file, aspect_ratio=aspect_ratio, resolution=resolution)
+    count = builder.build(rows, output_path)
+
+    console.print(f"[green]✓[/green] Wrote {count} request(s) to {output_path}")
+    if builder.upload_count:
+        console.print(f"  Uploaded {builder.upload_count} distinct reference image(s)")
+    console.print(f"Submit with: anyimg --batch-file {output_path}")
+
+    return 0
+
+
+def handle_route(
+    parsed: argparse.Namespace,
+    ledger: "JobLedger",
+    console: LazyConsole,
+    err_console: LazyConsole,
+) -> int:
+    """Route a prompts file between inline generation and a Batch API job.
+
+    Args:
+        parsed: Parsed ``batch route`` arguments
+        ledger: Job ledger supplying observed latencies
+        console: Console for output
+        err_console: Console for errors
+
+    Returns:
+        Exit code (0=success, 3=API error)
+    """
+    import asyncio
+
+    from src.models.config import GenerationConfig
+    from src.models.retry import RetryPolicy
+    from src.services.batch_api_service import BatchAPIService
+    from src.services.gemini_service import GeminiService
+    from src.services.image_service import ImageService
+    from src.services.quota_service import QuotaLimiter
+    from src.services.router_service import WorkloadRouter
+    from src.utils.prompts_file import iter_prompt_rows
+
+    # Validates the quota, retry, format and durability options as the main CLI does
+    config = GenerationConfig.from_args(
+        prompt=parsed.prompts_file,
+        concurrency=parsed.concurrency,
+        aspect_ratio=parsed.aspect_ratio,
+        resolution=parsed.resolution,
+        requests_per_minute=parsed.requests_per_minute,
+        images_per_minute=parsed.images_per_minute,
+        quota_file=parsed.quota_file,
+        max_retries=parsed.max_retries,
+        retry_budget=parsed.retry_budget,
+        durability=parsed.durability,
+        durability_group=parsed.durability_group,
+        output_format=parsed.output_format,
+        output_quality=parsed.output_quality,
+        output_effort=parsed.output_effort,
+        derivatives=parsed.derivatives,
+    )
+
+    # The plan needs every row's deadline, so the whole file is read up front
+    rows = list(
+        iter_prompt_rows(
+            Path(parsed.prompts_file),
+            aspect_ratio=config.aspect_ratio,
+            resolution=config.resolution,
+        )
+    )
+    budget = config.retry_budget
+    if budget is None:
+        budget = max(config.max_retries, len(rows))
+
+    # Inline calls and batch job creation draw on the same quota
+    quota_limiter = QuotaLimiter.from_config(config)
+    gemini_service = GeminiService(
+        quota_limiter=quota_limiter,
+        retry_policy=RetryPolicy(max_retries=config.max_retries, retry_budget=budget),
+    )
+    image_service = ImageService.from_config(config)
+    # Batch results are saved with the same format and durability as inline ones
+    batch_api = BatchAPIService(
+        quota_limiter=quota_limiter, ledger=ledger, image_service=image_service
+    )
+
+    router = WorkloadRouter(
+        gemini_service,
+        image_service,
+        batch_api,
+        ledger=ledger,
+        concurrency=config.concurrency,
+        min_batch_size=parsed.min_batch_size,
+    )
+    plan = router.plan(rows, parsed.deadline)
+
+    console.print(
+        f"[cyan]Routing {len(plan.inline)} request(s) inline "
+        f"(~{plan.inline_duration:.0f}s at {plan.inline_latency:.0f}s each) and "
+        f"{len(plan.batch)} to the Batch API (~{plan.batch_latency / 60:.0f} min turnaround)"
+        "[/cyan]"
+    )
+
+    output_dir = Path(parsed.out_dir)
+    try:
+        results = asyncio.run(router.run(plan, output_dir))
+    finally:
+        image_service.close()
+
+    return print_saved_results(results, output_dir, console, err_console)
+
+
+def handle_status(
+    ledger: "JobLedger",
+    batch_api: "BatchAPIService",
+    include_fetched: bool,
+    console: LazyConsole,
+) -> int:
+    """Show ledger jobs, refreshing the state of unfinished ones.
+
+    Args:
+        ledger: Job ledger
+        batch_api: Batch API service used to refresh job states
+        include_fetched: Also show jobs whose results were already fetched
+        console: Console for output
+
+    Returns:
+        Exit code (0=success)
+    """
+    entries = ledger.list_jobs(include_fetched=include_fetched)
+    if not entries:
+        console.print("No batch jobs recorded")
+        return 0
+
+    for entry in entries:
+        state = entry.state
+        if state not in batch_api.COMPLETED_STATES:
+            state = batch_api.refresh_job_state(entry.job_name)
+
+        fetched = f" → {entry.output_dir}" if entry.fetched_at else ""
+        console.print(
+            f"{entry.job_name}  [bold]{state}[/bold]  {entry.source_file.name}  "
+            f"{entry.created_at:%Y-%m-%d %H:%M}{fetched}"
+        )
+
+    return 0
+
+
+def handle_resume(
+    ledger: "JobLedger",
+    batch_api: "BatchAPIService",
+    output_dir: Path,
+    console: LazyConsole,
+    err_console: LazyConsole,
+    max_retries: int = 3,
+) -> int:
+    """Watch every unfetched ledger job, fetching each one's results as it completes.
+
+    Args:
+        ledger: Job ledger
+        batch_api: Batch API service
+        output_dir: Directory for downloaded images
+        console: Console for output
+        err_console: Console for errors
+        max_retries: Retries per status check for transient API errors
+
+    Returns:
+        Exit code (0=success, 3=API error)
+    """
+    import asyncio
+
+    from src.models.job_outcome import JobOutcome
+    from src.models.retry import RetryPolicy
+    from src.services.batch_watcher_service import BatchJobWatcher
+
+    entries = ledger.list_jobs(include_fetched=False)
+    watched = [e.job_name for e in entries if e.state not in batch_api.FAILED_STATES]
+
+    if not watched:
+        console.print("No unfinished batch jobs to resume")
+        return 0
+
+    def report(outcome: JobOutcome) -> None:
+        if outcome.error_message:
+            err_console.print(
+                f"[red]Error:[/red] {outcome.job_name} ended with state {outcome.state}: "
+                f"{outcome.error_message}"
+            )
+        else:
+            saved = sum(1 for r in outcome.results if r.success)
+            console.print(f"[green]✓[/green] {outcome.job_name}: saved {saved} image(s)")
+
+    console.print(f"[cyan]Watching {len(watched)} batch job(s)...[/cyan]")
+    # Budget of one retry per job (at least max_retries), so an outage fails fast
+    policy = RetryPolicy(max_retries=max_retries, retry_budget=max(max_retries, len(watched)))
+    watcher = BatchJobWatcher(batch_api, retry_policy=policy)
+    outcomes = asyncio.run(watcher.watch(watched, output_dir, on_complete=report))
+
+    saved = [r for outcome in outcomes for r in outcome.results]
+    exit_code = print_saved_results(saved, output_dir, console, err_console)
+    if any(o.state != "JOB_STATE_SUCCEEDED" or o.error_message for o in outcomes):
+        return 3
+    return exit_code
+
+
+def handle_fetch(
+    ledger: "JobLedger",
+    batch_api: "BatchAPIService",
+    job_names: list[str],
+    output_dir: Path,
+    console: LazyConsole,
+    err_console: LazyConsole,
+) -> int:
+    """Download results of the given jobs, or of every unfetched succeeded ledger job.
+
+    Args:
+        ledger: Job ledger
+        batch_api: Batch API service
+        job_names: Jobs to fetch (empty for all unfetched succeeded jobs)
+        output_dir: Directory for downloaded images
+        console: Console for output
+        err_console: Console for errors
+
+    Returns:
+        Exit code (0=success, 3=API error)
+    """
+    entries = ledger.list_jobs(include_fetched=False)
+
+    if not job_names:
+        job_names = [e.job_name for e in entries if e.state == "JOB_STATE_SUCCEEDED"]
+        failed_jobs = [e for e in entries if e.state in batch_api.FAILED_STATES]
+        running = [e for e in entries if e.state not in batch_api.COMPLETED_STATES]
+
+        for entry in failed_jobs:
+            err_console.print(
+                f"[red]Error:[/red] {entry.job_name} ended with state {entry.state}: "
+                f"{entry.error_message}"
+            )
+        if running:
+            console.print(
+                f"[yellow]{len(running)} job(s) still running; "
+                "use 'anyimg batch resume' to wait for them[/yellow]"
+            )
+        if not job_names:
+            console.print("No finished batch jobs to fetch")
+            return 3 if failed_jobs else 0
+
+    console.print(f"[cyan]Downloading results of {len(job_names)} batch job(s)...[/cyan]")
+    saved = batch_api.fetch_results(job_names, output_dir)
+
+    return print_saved_results(saved, output_dir, console, err_console)
+
+
+def print_saved_results(
+    saved: list["GenerationResult"],
+    output_dir: Path,
+    console: LazyConsole,
+    err_console: LazyConsole,
+) -> int:
+    """Report images saved from batch results.
+
+    Args:
+        saved: Results from save_batch_images
+        output_dir: Directory the images were saved to
+        console: Console for output
+        err_console: Console for errors
+
+    Returns:
+        Exit code (0 if any image was saved or nothing failed, else 3)
+    """
+    successful = [r for r in saved if r.success]
+    failed = [r for r in saved if not r.success]
+
+    console.print(f"\n[green]✓[/green] Saved {len(successful)} images to {output_dir}/")
+    for result in successful:
+        console.print(f"  - {result.output_path}")
+
+    if failed:
+        err_console.print(f"\n[yellow]Warning:[/yellow] {len(failed)} request(s) failed:")
+        for result in failed:
+            err_console.print(f"  - {result.error_message}")
+
+    return 0 if successful or not failed else 3
+
+
+def batch_main(args: Sequence[str], console: LazyConsole, err_console: LazyConsole) -> int:
+    """Dispatch an ``anyimg batch`` subcommand.
+
+    Args:
+        args: Arguments following ``batch``
+        console: Console for output
+        err_console: Console for errors
+
+    Returns:
+        Exit code of the subcommand
+    """
+    parsed = parse_batch_args(args)
+
+    if parsed.command == "build":
+        return handle_build(
+            Path(parsed.prompts_file),
+            Path(parsed.output_path),
+            parsed.aspect_ratio,
+            parsed.resolution,
+            console,
+        )
+
+    from src.services.batch_api_service import BatchAPIService
+    from src.services.ledger_service import JobLedger
+
+    ledger = JobLedger(Path(parsed.ledger_file) if parsed.ledger_file else None)
+
+    if parsed.command == "route":
+        from src.models.client_options import DEFAULT_POOL_SIZE, ClientOptions
+        from src.services.client_service import configure_client
+
+        # Inline rows and the batch job share one client; give every inline worker a socket
+        configure_client(ClientOptions(pool_size=max(parsed.concurrency, DEFAULT_POOL_SIZE)))
+        return handle_route(parsed, ledger, console, err_console)
+
+    batch_api = BatchAPIService(ledger=ledger)
+
+    if parsed.command == "status":
+        return handle_status(ledger, batch_api, parsed.include_fetched, console)
+
+    if parsed.command == "resume":
+        return handle_resume(
+            ledger, batch_api, Path(parsed.out_dir), console, err_console, parsed.max_retries
+        )
+
+    if parsed.command == "fetch":
+        return handle_fetch(
+            ledger, batch_api, parsed.job_names, Path(parsed.out_dir), console, err_console
+        )
+
+    err_console.print(f"[red]Error:[/red] Unknown batch command: {parsed.command}")
+    return 1
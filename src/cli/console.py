@@ -0,0 +1,44 @@
+"""Lazily constructed console output for the CLI."""
+
+import re
+import sys
+from typing import Any
+
+# Rich markup tags used by the CLI's messages
+_MARKUP_TAG = re.compile(r"\[/?(?:red|green|yellow|cyan|bold)\]")
+
+
+class LazyConsole:
+    """Console that defers importing and building Rich until output needs styling.
+
+    When the stream is not a terminal (pipelines, captured output) messages are
+    written as plain text and Rich is never imported.
+    """
+
+    def __init__(self, stderr: bool = False) -> None:
+        """Initialize lazy console.
+
+        Args:
+            stderr: Write to stderr instead of stdout
+        """
+        self.stderr = stderr
+        self._console: Any = None
+
+    def print(self, message: str = "") -> None:
+        """Print a message that may contain Rich markup.
+
+        Args:
+            message: Text to print
+        """
+        stream = sys.stderr if self.stderr else sys.stdout
+
+        if self._console is None and not stream.isatty():
+            stream.write(_MARKUP_TAG.sub("", message) + "\n")
+            return
+
+        if self._console is None:
+            from rich.console import Console
+
+            self._console = Console(stderr=self.stderr)
+
+        self._console.print(message)
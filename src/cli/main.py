@@ -1,29 +1,86 @@
 """CLI main entry point."""
 
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Sequence
+from typing import TYPE_CHECKING, Iterator, Sequence
 
-from rich.console import Console
-
-from src.cli.parser import parse_args
-from src.models.config import GenerationConfig
+from src.cli.console import LazyConsole
+from src.cli.parser import parse_args, parse_serve_args
 from src.models.exceptions import (
     APIError,
     ConfigurationError,
     FileSystemError,
     ValidationError,
 )
-from src.services.batch_api_service import BatchAPIService
-from src.services.batch_service import generate_batch
-from src.services.gemini_service import GeminiService
-from src.services.image_service import ImageService
+
+# The SDK, Pillow and service modules are imported inside the handlers that use them,
+# so --help and argument errors don't pay for them at startup.
+if TYPE_CHECKING:
+    from src.models.config import GenerationConfig
+    from src.models.prompt_row import PromptRow
+    from src.models.result import GenerationResult
+
+
+def format_latency(result: "GenerationResult") -> str:
+    """Describe a streamed result's latency split, or nothing for unstreamed results."""
+    if result.ttfb is None or result.time_to_image is None:
+        return ""
+    return f" (first byte {result.ttfb:.2f}s, image {result.time_to_image:.2f}s)"
+
+
+def export_metrics(
+    config: "GenerationConfig",
+    results: list["GenerationResult"],
+    started_at: datetime,
+    wall_time: float,
+    console: LazyConsole,
+    err_console: LazyConsole,
+) -> None:
+    """Write run metrics to --metrics-out, if given; a failed write only warns.
+
+    Args:
+        config: Generation configuration
+        results: Every result of the run
+        started_at: When generation started
+        wall_time: Seconds generation took
+        console: Console for output
+        err_console: Console for errors
+    """
+    if config.metrics_out is None:
+        return
+
+    from src.services.metrics_service import summarize_run, write_metrics
+
+    try:
+        write_metrics(summarize_run(results, started_at, wall_time), config.metrics_out)
+    except FileSystemError as e:
+        err_console.print(f"[yellow]Warning:[/yellow] {e.message}")
+        return
+    console.print(f"[cyan]Metrics written to {config.metrics_out}[/cyan]")
+
+
+def configure_api_client(config: "GenerationConfig", console: LazyConsole) -> None:
+    """Size the shared API client's connection pool for this run, prewarming it if asked.
+
+    Args:
+        config: Generation configuration
+        console: Console for output
+    """
+    from src.models.client_options import ClientOptions
+    from src.services.client_service import configure_client
+
+    factory = configure_client(ClientOptions.from_config(config))
+    if config.prewarm:
+        opened = factory.prewarm(config.concurrency)
+        console.print(f"[cyan]Prewarmed {opened} API connection(s)[/cyan]")
 
 
 def handle_normal_mode(
-    config: GenerationConfig,
-    console: Console,
-    err_console: Console,
+    config: "GenerationConfig",
+    console: LazyConsole,
+    err_console: LazyConsole,
 ) -> int:
     """Handle normal inline generation mode.
 
@@ -35,31 +92,150 @@ def handle_normal_mode(
     Returns:
         Exit code (0=success, 3=API error)
     """
-    gemini_service = GeminiService()
-    image_service = ImageService()
-
-    results = generate_batch(config, gemini_service, image_service)
+    from src.models.retry import RetryPolicy
+    from src.services.batch_service import generate_batch
+    from src.services.cache_service import ResponseCache
+    from src.services.gemini_service import GeminiService
+    from src.services.image_service import ImageService
+    from src.services.quota_service import QuotaLimiter
+
+    configure_api_client(config, console)
+    gemini_service = GeminiService(
+        quota_limiter=QuotaLimiter.from_config(config),
+        retry_policy=RetryPolicy.from_config(config),
+        stream=config.stream,
+    )
+    image_service = ImageService.from_config(config)
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    try:
+        results = generate_batch(
+            config, gemini_service, image_service, cache=ResponseCache.from_config(config)
+        )
+    finally:
+        image_service.close()
+    wall_time = time.perf_counter() - started
 
     successful = [r for r in results if r.success]
     failed = [r for r in results if not r.success]
 
     for result in successful:
-        console.print(f"[green]✓[/green] Generated image: {result.output_path}")
+        source = " (cached)" if result.cached else ""
+        console.print(
+            f"[green]✓[/green] Generated image: {result.output_path}{source}"
+            f"{format_latency(result)}"
+        )
 
     if failed:
         err_console.print(f"\n[yellow]Warning:[/yellow] {len(failed)} generation(s) failed:")
         for result in failed:
-            err_console.print(f"  - Index {result.index}: {result.error_message}")
+            attempts = f" (after {result.attempts} attempts)" if result.attempts > 1 else ""
+            err_console.print(f"  - Index {result.index}: {result.error_message}{attempts}")
 
     console.print(f"\n[bold]Summary:[/bold] {len(successful)} successful, {len(failed)} failed")
+    export_metrics(config, results, started_at, wall_time, console, err_console)
 
     return 0 if successful else 3
 
 
+def handle_prompts_mode(
+    config: "GenerationConfig",
+    console: LazyConsole,
+    err_console: LazyConsole,
+) -> int:
+    """Handle prompts-file mode: one inline generation per prompts file row.
+
+    Every row shares one client and one worker pool, and each result is reported as
+    soon as its image is written.
+
+    Args:
+        config: Generation configuration (prompts_file set, output_path is a directory)
+        console: Console for output
+        err_console: Console for errors
+
+    Returns:
+        Exit code (0=success, 1=config, 3=API error)
+
+    Raises:
+        InvalidPromptsFileError: If the prompts file is malformed
+    """
+    prompts_file = config.prompts_file
+
+    if prompts_file is None:
+        err_console.print("[red]Error:[/red] Prompts file path required for prompts mode")
+        return 1
+
+    from src.models.retry import RetryPolicy
+    from src.services.batch_service import iter_prompt_row_results
+    from src.services.gemini_service import GeminiService
+    from src.services.image_service import ImageService
+    from src.services.quota_service import QuotaLimiter
+    from src.utils.prompts_file import iter_prompt_rows
+
+    def read_rows() -> "Iterator[PromptRow]":
+        return iter_prompt_rows(
+            prompts_file, aspect_ratio=config.aspect_ratio, resolution=config.resolution
+        )
+
+    # Validate every row first so a bad row fails the run before any request is paid
+    # for; rows are then read again as they are generated, so none are held in memory
+    row_count = sum(1 for _ in read_rows())
+    budget = config.retry_budget
+    if budget is None:
+        budget = max(config.max_retries, row_count)
+
+    configure_api_client(config, console)
+    gemini_service = GeminiService(
+        quota_limiter=QuotaLimiter.from_config(config),
+        retry_policy=RetryPolicy(max_retries=config.max_retries, retry_budget=budget),
+        stream=config.stream,
+    )
+    image_service = ImageService.from_config(config)
+    output_dir = config.output_path or Path(".")
+
+    results: list[GenerationResult] = []
+    started_at = datetime.now()
+    started = time.perf_counter()
+    try:
+        for result in iter_prompt_row_results(
+            read_rows(),
+            gemini_service,
+            image_service,
+            output_dir,
+            concurrency=config.concurrency,
+            input_max_edge=config.input_max_edge,
+            input_quality=config.input_quality,
+        ):
+            results.append(result)
+            if result.success:
+                console.print(
+                    f"[green]✓[/green] {result.key}: {result.output_path}{format_latency(result)}"
+                )
+            else:
+                attempts = f" (after {result.attempts} attempts)" if result.attempts > 1 else ""
+                err_console.print(
+                    f"[red]✗[/red] {result.key} (row {result.index + 1}): "
+                    f"{result.error_message}{attempts}"
+                )
+    finally:
+        image_service.close()
+
+    wall_time = time.perf_counter() - started
+
+    successful = sum(1 for r in results if r.success)
+    console.print(
+        f"\n[bold]Summary:[/bold] {successful} successful, {len(results) - successful} failed"
+    )
+    export_metrics(config, results, started_at, wall_time, console, err_console)
+
+    return 0 if successful or not row_count else 3
+
+
 def handle_batch_api_mode(
-    config: GenerationConfig,
-    console: Console,
-    err_console: Console,
+    config: "GenerationConfig",
+    console: LazyConsole,
+    err_console: LazyConsole,
 ) -> int:
     """Handle batch API mode using JSONL file.
 
@@ -77,33 +253,94 @@ def handle_batch_api_mode(
         err_console.print("[red]Error:[/red] Batch file path required for batch API mode")
         return 1
 
-    batch_api = BatchAPIService()
+    import asyncio
+
+    from src.cli.batch import print_saved_results
+    from src.models.job_outcome import JobOutcome
+    from src.models.retry import RetryPolicy
+    from src.services.batch_api_service import BatchAPIService, split_batch_file
+    from src.services.batch_watcher_service import BatchJobWatcher
+    from src.services.image_service import ImageService
+    from src.services.ledger_service import JobLedger
+    from src.services.quota_service import QuotaLimiter
+
+    configure_api_client(config, console)
+    image_service = ImageService.from_config(config)
+    batch_api = BatchAPIService(
+        quota_limiter=QuotaLimiter.from_config(config),
+        ledger=JobLedger(config.ledger_file),
+        image_service=image_service,
+    )
 
     try:
-        console.print(f"[cyan]Creating batch job from {jsonl_path}...[/cyan]")
-        job_name = batch_api.create_batch_from_file(jsonl_path)
-        console.print(f"[green]✓[/green] Batch job created: {job_name}")
-        console.print("[cyan]Polling job status (this may take a while)...[/cyan]")
-
-        final_state = batch_api.poll_batch_status(job_name)
-
-        if final_state == "JOB_STATE_SUCCEEDED":
-            console.print("[green]✓[/green] Batch job completed successfully")
-            console.print("[cyan]Downloading and processing results...[/cyan]")
+        shards = split_batch_file(
+            jsonl_path,
+            max_requests=config.shard_max_requests,
+            max_bytes=config.shard_max_mb * 1024 * 1024,
+        )
+        if len(shards) > 1:
+            total = sum(s.request_count for s in shards)
+            console.print(f"[cyan]Split {total} requests into {len(shards)} shards[/cyan]")
+
+        console.print(f"[cyan]Creating batch job(s) from {jsonl_path}...[/cyan]")
+        batch_api.submit_shards(shards)
+        for shard in shards:
+            if shard.job_name:
+                console.print(f"[green]✓[/green] Batch job created: {shard.job_name}")
+        console.print(
+            "[cyan]Polling job status (this may take a while); "
+            "each job's images are saved as soon as it completes...[/cyan]"
+        )
+
+        def report(outcome: JobOutcome) -> None:
+            if outcome.state == "JOB_STATE_SUCCEEDED" and not outcome.error_message:
+                saved = sum(1 for r in outcome.results if r.success)
+                console.print(f"[green]✓[/green] {outcome.job_name}: saved {saved} image(s)")
+
+        # Results are streamed: each image is written as its line is read
+        output_dir = Path("batch_results")
+        watcher = BatchJobWatcher(batch_api, retry_policy=RetryPolicy.from_config(config))
+        outcomes = asyncio.run(
+            watcher.watch_shards(
+                shards, output_dir, max_resubmits=config.shard_resubmits, on_complete=report
+            )
+        )
+
+        failed_shards = [
+            (shard, outcome)
+            for shard, outcome in zip(shards, outcomes)
+            if outcome.state != "JOB_STATE_SUCCEEDED" or outcome.error_message
+        ]
+        for shard, outcome in failed_shards:
+            err_console.print(
+                f"[red]Error:[/red] Batch job failed with state: {outcome.state} "
+                f"({shard.request_count} request(s) in {shard.path.name}): "
+                f"{outcome.error_message}"
+            )
+
+        if len(failed_shards) == len(shards):
+            return 3
 
-            results = batch_api.get_batch_results(job_name)
+        console.print(
+            f"[green]✓[/green] {len(shards) - len(failed_shards)} of {len(shards)} "
+            "batch job(s) completed"
+        )
+        saved = [r for outcome in outcomes for r in outcome.results]
+        exit_code = print_saved_results(saved, output_dir, console, err_console)
 
-            output_dir = Path("batch_results")
-            saved_paths = batch_api.save_batch_images(results, output_dir)
+        if failed_shards:
+            return 3
 
-            console.print(f"\n[green]✓[/green] Saved {len(saved_paths)} images to {output_dir}/")
-            for path in saved_paths:
-                console.print(f"  - {path}")
+        # Shard files are kept only while some shard may still need resubmitting
+        if len(shards) > 1:
+            for shard in shards:
+                shard.path.unlink(missing_ok=True)
+            try:
+                shards[0].path.parent.rmdir()
+            except OSError:
+                pass  # Directory holds other files
 
-            return 0
-        else:
-            err_console.print(f"[red]Error:[/red] Batch job failed with state: {final_state}")
-            return 3
+        return exit_code
 
     except APIError as e:
         err_console.print(f"[red]Error:[/red] {e.message}")
@@ -111,6 +348,113 @@ def handle_batch_api_mode(
             err_console.print(f"[yellow]Fix:[/yellow] {e.remediation}")
         return e.exit_code
 
+    finally:
+        image_service.close()
+
+
+def handle_server_mode(
+    config: "GenerationConfig",
+    console: LazyConsole,
+    err_console: LazyConsole,
+) -> int:
+    """Handle --server mode: run on an ``anyimg serve`` daemon and report as results arrive.
+
+    Args:
+        config: Generation configuration (server set)
+        console: Console for output
+        err_console: Console for errors
+
+    Returns:
+        Exit code (0=success, 1=config, 2=validation, 3=API error, 4=filesystem)
+    """
+    from src.services.remote_service import RemoteGenerator
+
+    results: list[GenerationResult] = []
+    started_at = datetime.now()
+    started = time.perf_counter()
+
+    for result in RemoteGenerator(config.server).run(config):
+        results.append(result)
+        label = result.key if result.key is not None else f"Index {result.index}"
+        if result.success:
+            source = " (cached)" if result.cached else ""
+            console.print(
+                f"[green]✓[/green] {label}: {result.output_path}{source}{format_latency(result)}"
+            )
+        else:
+            attempts = f" (after {result.attempts} attempts)" if result.attempts > 1 else ""
+            err_console.print(f"[red]✗[/red] {label}: {result.error_message}{attempts}")
+
+    wall_time = time.perf_counter() - started
+
+    successful = sum(1 for r in results if r.success)
+    console.print(
+        f"\n[bold]Summary:[/bold] {successful} successful, {len(results) - successful} failed"
+    )
+    export_metrics(config, results, started_at, wall_time, console, err_console)
+
+    return 0 if successful or not results else 3
+
+
+def handle_serve(args: Sequence[str], console: LazyConsole) -> int:
+    """Run the ``anyimg serve`` daemon until interrupted.
+
+    Args:
+        args: Arguments following ``serve``
+        console: Console for output
+
+    Returns:
+        Exit code (0=stopped cleanly, 1=config)
+
+    Raises:
+        ConfigurationError: If GEMINI_API_KEY is unset or the address cannot be bound
+    """
+    import os
+    import signal
+
+    from src.models.client_options import DEFAULT_POOL_SIZE, ClientOptions
+    from src.models.exceptions import MissingAPIKeyError
+    from src.services.client_service import configure_client
+    from src.services.daemon_service import GenerationDaemon
+    from src.services.remote_service import default_socket_path
+
+    parsed = parse_serve_args(args)
+    if not os.getenv("GEMINI_API_KEY", "").strip():
+        raise MissingAPIKeyError()
+
+    # Build the shared client now, so the first job finds it warm
+    pool_size = parsed.pool_size or max(parsed.concurrency, DEFAULT_POOL_SIZE)
+    factory = configure_client(ClientOptions(pool_size=pool_size))
+    if parsed.prewarm:
+        opened = factory.prewarm(parsed.concurrency)
+        console.print(f"[cyan]Prewarmed {opened} API connection(s)[/cyan]")
+    else:
+        factory.get()
+
+    socket_path = Path(parsed.socket).expanduser() if parsed.socket else default_socket_path()
+    daemon = GenerationDaemon(
+        socket_path=socket_path if parsed.port is None else None,
+        port=parsed.port,
+        concurrency=parsed.concurrency,
+    )
+    # Stop cleanly on SIGTERM as on Ctrl-C, removing the socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    console.print(f"[green]✓[/green] anyimg server listening on {daemon.address}")
+    console.print(f"Run jobs with: anyimg --server {daemon.address} --prompt ...")
+    if daemon.token_file is not None:
+        console.print(f"Clients authenticate with the owner-only token in {daemon.token_file}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        factory.close()
+
+    console.print("[cyan]anyimg server stopped[/cyan]")
+    return 0
+
 
 def main(args: Sequence[str] | None = None) -> int:
     """Main CLI entry point.
@@ -121,11 +465,27 @@ def main(args: Sequence[str] | None = None) -> int:
     Returns:
         Exit code (0=success, 1=config, 2=validation, 3=API, 4=filesystem)
     """
-    console = Console()
-    err_console = Console(stderr=True)
+    console = LazyConsole()
+    err_console = LazyConsole(stderr=True)
+
+    argv = list(args) if args is not None else sys.argv[1:]
 
     try:
-        config = parse_args(args)
+        if argv[:1] == ["batch"]:
+            from src.cli.batch import batch_main
+
+            return batch_main(argv[1:], console, err_console)
+
+        if argv[:1] == ["serve"]:
+            return handle_serve(argv[1:], console)
+
+        config = parse_args(argv)
+
+        if config.server is not None:
+            return handle_server_mode(config, console, err_console)
+
+        if config.prompts_file is not None:
+            return handle_prompts_mode(config, console, err_console)
 
         if config.output_path and str(config.output_path).endswith(".jsonl"):
             return handle_batch_api_mode(config, console, err_console)
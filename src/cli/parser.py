@@ -1,12 +1,13 @@
 """CLI argument parser."""
 
 import argparse
-from typing import Sequence
+from typing import TYPE_CHECKING, Sequence
 
-from src.models.config import GenerationConfig
+if TYPE_CHECKING:
+    from src.models.config import GenerationConfig
 
 
-def parse_args(args: Sequence[str] | None = None) -> GenerationConfig:
+def parse_args(args: Sequence[str] | None = None) -> "GenerationConfig":
     """Parse CLI arguments into GenerationConfig.
 
     Args:
@@ -26,8 +27,18 @@ def parse_args(args: Sequence[str] | None = None) -> GenerationConfig:
     parser.add_argument(
         "--prompt",
         type=str,
-        required=True,
-        help="Text prompt for image generation",
+        default=None,
+        help="Text prompt for image generation (required unless --prompts or --batch-file "
+        "is given)",
+    )
+
+    parser.add_argument(
+        "--prompts",
+        dest="prompts_file",
+        type=str,
+        default=None,
+        help="Generate one image per row of this prompts file (.txt: one prompt per line; "
+        ".jsonl: rows with prompt, output, aspect_ratio, resolution, images)",
     )
 
     parser.add_argument(
@@ -43,7 +54,8 @@ def parse_args(args: Sequence[str] | None = None) -> GenerationConfig:
         dest="output_path",
         type=str,
         default=None,
-        help="Output path for generated image (default: anyimg_<timestamp>.png)",
+        help="Output path for generated image (default: anyimg_<timestamp>.png); "
+        "with --prompts, the directory for rows without their own output",
     )
 
     parser.add_argument(
@@ -54,6 +66,13 @@ def parse_args(args: Sequence[str] | None = None) -> GenerationConfig:
         help="Number of images to generate (default: 1)",
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of images to generate in parallel (default: 1)",
+    )
+
     parser.add_argument(
         "--aspect-ratio",
         type=str,
@@ -77,20 +96,201 @@ def parse_args(args: Sequence[str] | None = None) -> GenerationConfig:
         help="JSONL file for batch API mode (triggers batch API instead of inline generation)",
     )
 
+    _add_quota_options(parser)
+
+    parser.add_argument(
+        "--input-max-edge",
+        type=int,
+        default=2048,
+        help="Downsample input images whose longest edge exceeds this many pixels "
+        "(0 uploads originals, default: 2048)",
+    )
+
+    parser.add_argument(
+        "--input-quality",
+        type=int,
+        default=90,
+        help="JPEG quality used when re-encoding downsampled input images (default: 90)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse images for identical requests from this cache directory",
+    )
+
+    parser.add_argument(
+        "--cache-max-size",
+        dest="cache_max_mb",
+        type=int,
+        default=1024,
+        help="Cache size cap in MB; least recently used images are evicted (default: 1024)",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the response cache",
+    )
+
+    parser.add_argument(
+        "--refresh",
+        dest="refresh_cache",
+        action="store_true",
+        help="Generate new images even on a cache hit, replacing the cached ones",
+    )
+
+    parser.add_argument(
+        "--shard-max-requests",
+        type=int,
+        default=10000,
+        help="Split --batch-file into jobs of at most this many requests (default: 10000)",
+    )
+
+    parser.add_argument(
+        "--shard-max-size",
+        dest="shard_max_mb",
+        type=int,
+        default=1900,
+        help="Split --batch-file into job input files of at most this many MB (default: 1900)",
+    )
+
+    parser.add_argument(
+        "--shard-resubmits",
+        type=int,
+        default=2,
+        help="Times a failed batch shard is resubmitted (default: 2)",
+    )
+
+    parser.add_argument(
+        "--ledger-file",
+        type=str,
+        default=None,
+        help="Batch job ledger used by 'anyimg batch status|resume|fetch' "
+        "(default: ~/.cache/anyimg/jobs.db)",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream responses: save each image as soon as it arrives and report "
+        "time-to-first-byte and time-to-image",
+    )
+
+    parser.add_argument(
+        "--metrics-out",
+        type=str,
+        default=None,
+        help="Write per-stage timings, p50/p95/p99 and throughput to this file "
+        "(Prometheus textfile if it ends in .prom, JSON otherwise)",
+    )
+
+    _add_output_options(parser)
+
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=None,
+        help="API connections kept open and reused across requests "
+        "(default: --concurrency, at least 10)",
+    )
+
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="Open one API connection per worker in parallel before generation starts",
+    )
+
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="ADDRESS",
+        help="Run on an 'anyimg serve' daemon at this Unix socket or host:port "
+        "(default: ~/.cache/anyimg/server.sock); the daemon's own API client, pool size "
+        "and API key are used",
+    )
+
     parsed = parser.parse_args(args)
 
+    if parsed.prompt is None and not (parsed.batch_file or parsed.prompts_file):
+        parser.error("the following arguments are required: --prompt")
+    if parsed.prompts_file and parsed.batch_file:
+        parser.error("argument --prompts: not allowed with argument --batch-file")
+    # Prompts rows carry their own images, make one image each and are never cached
+    if parsed.prompts_file and (parsed.input_images or parsed.batch_count != 1):
+        flag = "--in" if parsed.input_images else "--batch"
+        parser.error(f"argument --prompts: not allowed with argument {flag}")
+    if parsed.prompts_file and parsed.cache_dir:
+        parser.error("argument --prompts: not allowed with argument --cache-dir")
+    if parsed.server is not None and parsed.batch_file:
+        parser.error("argument --server: not allowed with argument --batch-file")
+
+    # Deferred so --help and usage errors exit before pydantic is imported
+    from src.models.config import GenerationConfig
+
     # Batch mode: use JSONL file directly
     if parsed.batch_file:
         return GenerationConfig.from_args(
-            prompt="",
+            # Prompts live in the JSONL; the file name stands in for the unused prompt
+            prompt=parsed.prompt or parsed.batch_file,
             input_images=[],
             output_path=parsed.batch_file,
             batch_count=1,
             aspect_ratio=parsed.aspect_ratio,
             resolution=parsed.resolution,
+            requests_per_minute=parsed.requests_per_minute,
+            images_per_minute=parsed.images_per_minute,
+            quota_file=parsed.quota_file,
+            max_retries=parsed.max_retries,
+            retry_budget=parsed.retry_budget,
+            shard_max_requests=parsed.shard_max_requests,
+            shard_max_mb=parsed.shard_max_mb,
+            shard_resubmits=parsed.shard_resubmits,
+            ledger_file=parsed.ledger_file,
+            pool_size=parsed.pool_size,
+            durability=parsed.durability,
+            durability_group=parsed.durability_group,
+            output_format=parsed.output_format,
+            output_quality=parsed.output_quality,
+            output_effort=parsed.output_effort,
+            derivatives=parsed.derivatives,
+        )
+
+    # Prompts mode: every row carries its own prompt, options and images
+    if parsed.prompts_file:
+        return GenerationConfig.from_args(
+            prompt=parsed.prompt or parsed.prompts_file,
+            input_images=[],
+            output_path=parsed.output_path,
+            aspect_ratio=parsed.aspect_ratio,
+            resolution=parsed.resolution,
+            concurrency=parsed.concurrency,
+            requests_per_minute=parsed.requests_per_minute,
+            images_per_minute=parsed.images_per_minute,
+            quota_file=parsed.quota_file,
+            max_retries=parsed.max_retries,
+            retry_budget=parsed.retry_budget,
+            input_max_edge=parsed.input_max_edge,
+            input_quality=parsed.input_quality,
+            prompts_file=parsed.prompts_file,
+            pool_size=parsed.pool_size,
+            prewarm=parsed.prewarm,
+            stream=parsed.stream,
+            metrics_out=parsed.metrics_out,
+            durability=parsed.durability,
+            durability_group=parsed.durability_group,
+            output_format=parsed.output_format,
+            output_quality=parsed.output_quality,
+            output_effort=parsed.output_effort,
+            derivatives=parsed.derivatives,
+            server=parsed.server,
         )
 
-    # Normal mode: parse comma-separated input images
+    # Normal mode: --prompt was required above, and parse comma-separated input images
+    assert parsed.prompt is not None
     input_image_list = None
     if parsed.input_images:
         input_image_list = [p.strip() for p in parsed.input_images.split(",")]
@@ -103,4 +303,351 @@ def parse_args(args: Sequence[str] | None = None) -> GenerationConfig:
         batch_count=parsed.batch_count,
         aspect_ratio=parsed.aspect_ratio,
         resolution=parsed.resolution,
+        concurrency=parsed.concurrency,
+        requests_per_minute=parsed.requests_per_minute,
+        images_per_minute=parsed.images_per_minute,
+        quota_file=parsed.quota_file,
+        max_retries=parsed.max_retries,
+        retry_budget=parsed.retry_budget,
+        input_max_edge=parsed.input_max_edge,
+        input_quality=parsed.input_quality,
+        cache_dir=parsed.cache_dir,
+        cache_max_mb=parsed.cache_max_mb,
+        no_cache=parsed.no_cache,
+        refresh_cache=parsed.refresh_cache,
+        pool_size=parsed.pool_size,
+        prewarm=parsed.prewarm,
+        stream=parsed.stream,
+        metrics_out=parsed.metrics_out,
+        durability=parsed.durability,
+        durability_group=parsed.durability_group,
+        output_format=parsed.output_format,
+        output_quality=parsed.output_quality,
+        output_effort=parsed.output_effort,
+        derivatives=parsed.derivatives,
+        server=parsed.server,
+    )
+
+
+def _add_quota_options(parser: argparse.ArgumentParser) -> None:
+    """Add the client-side quota and retry options shared by inline generation commands."""
+    parser.add_argument(
+        "--rpm",
+        dest="requests_per_minute",
+        type=int,
+        default=None,
+        help="Client-side requests-per-minute quota shared by all anyimg processes on this host",
+    )
+
+    parser.add_argument(
+        "--ipm",
+        dest="images_per_minute",
+        type=int,
+        default=None,
+        help="Client-side images-per-minute quota shared by all anyimg processes on this host",
+    )
+
+    parser.add_argument(
+        "--quota-file",
+        type=str,
+        default=None,
+        help="Shared quota state file (default: ~/.cache/anyimg/quota.json)",
+    )
+
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries per image for rate limits, timeouts and 5xx errors (default: 3)",
+    )
+
+    parser.add_argument(
+        "--retry-budget",
+        type=int,
+        default=None,
+        help="Total retries allowed across the whole run (default: one per image)",
+    )
+
+
+def _add_output_options(parser: argparse.ArgumentParser) -> None:
+    """Add the output format and durability options shared by commands that save images."""
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        type=str,
+        default=None,
+        choices=["png", "jpeg", "webp", "avif"],
+        help="Re-encode every saved image to this format (default: keep the format the "
+        "API returned)",
     )
+
+    parser.add_argument(
+        "--quality",
+        dest="output_quality",
+        type=int,
+        default=None,
+        help="Quality 1-100 for --format jpeg, webp or avif (default: 90, 85, 75)",
+    )
+
+    parser.add_argument(
+        "--effort",
+        dest="output_effort",
+        type=int,
+        default=None,
+        help="Encoder effort 0-10 for --format; higher is slower and smaller "
+        "(default: the encoder's own)",
+    )
+
+    parser.add_argument(
+        "--derivatives",
+        type=_edges,
+        default=None,
+        help="Also save downsized copies with these longest edges next to every image, "
+        "e.g. 256,1024 (written as <name>_256px.<ext>)",
+    )
+
+    parser.add_argument(
+        "--durability",
+        type=str,
+        default="none",
+        choices=["none", "file", "group"],
+        help="How saved images are flushed to disk: none (atomic rename only), file "
+        "(fsync each image) or group (images staged and committed together every "
+        "--durability-group images) "
+        "(default: none)",
+    )
+
+    parser.add_argument(
+        "--durability-group",
+        type=int,
+        default=64,
+        help="Images per commit with --durability group (default: 64)",
+    )
+
+
+def _edges(value: str) -> list[int]:
+    """Parse a comma-separated list of pixel sizes such as ``256,1024``."""
+    try:
+        edges = [int(edge) for edge in value.split(",") if edge.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sizes: {value!r}") from None
+    if not edges or min(edges) < 1:
+        raise argparse.ArgumentTypeError(f"sizes must be positive: {value!r}")
+    return edges
+
+
+def _duration(value: str) -> float:
+    """Parse a duration such as ``90``, ``90s``, ``30m`` or ``2h`` into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    number, unit = (value[:-1], value[-1]) if value[-1:] in units else (value, "s")
+    try:
+        seconds = float(number) * units[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value!r}") from None
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"duration must be positive: {value!r}")
+    return seconds
+
+
+def parse_batch_args(args: Sequence[str]) -> argparse.Namespace:
+    """Parse ``anyimg batch <command>`` arguments.
+
+    Args:
+        args: Arguments following ``batch``
+
+    Returns:
+        Parsed namespace with a ``command`` attribute naming the subcommand
+    """
+    parser = argparse.ArgumentParser(
+        prog="anyimg batch",
+        description="Prepare and manage Gemini Batch API jobs",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser(
+        "build",
+        help="Compile a prompts file into Batch API request JSONL",
+        description="Compile a prompts file (one prompt per line, or JSONL rows with "
+        "prompt, key, aspect_ratio, resolution, images) into Batch API request JSONL. "
+        "Reference images are uploaded once per distinct file content.",
+    )
+    build.add_argument("prompts_file", type=str, help="Prompts file (.txt or .jsonl)")
+    build.add_argument(
+        "--out",
+        dest="output_path",
+        type=str,
+        required=True,
+        help="Batch request JSONL file to write",
+    )
+    build.add_argument(
+        "--aspect-ratio",
+        type=str,
+        default=None,
+        choices=["1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9"],
+        help="Aspect ratio for rows that don't set one (default: auto)",
+    )
+    build.add_argument(
+        "--resolution",
+        type=str,
+        default=None,
+        choices=["1K", "2K", "4K"],
+        help="Resolution for rows that don't set one (default: auto)",
+    )
+
+    ledger_help = "Batch job ledger file (default: ~/.cache/anyimg/jobs.db)"
+
+    route = subparsers.add_parser(
+        "route",
+        help="Split a prompts file between inline generation and the Batch API",
+        description="Send rows that must finish before the expected batch turnaround to "
+        "inline generation and the rest to one Batch API job, run both at once, and "
+        "collect every image in one directory. Rows may set their own 'deadline' "
+        "(seconds) in JSONL prompts files.",
+    )
+    route.add_argument("prompts_file", type=str, help="Prompts file (.txt or .jsonl)")
+    route.add_argument(
+        "--deadline",
+        type=_duration,
+        default=None,
+        help="When results are needed, e.g. 90s, 30m, 2h (default: none, all rows to batch)",
+    )
+    route.add_argument(
+        "--out-dir",
+        type=str,
+        default="batch_results",
+        help="Directory for generated images (default: batch_results)",
+    )
+    route.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Inline requests in flight at once (default: 4)",
+    )
+    route.add_argument(
+        "--min-batch-size",
+        type=int,
+        default=20,
+        help="Run batch-bound rows inline when fewer than this many (default: 20)",
+    )
+    route.add_argument(
+        "--aspect-ratio",
+        type=str,
+        default=None,
+        choices=["1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9"],
+        help="Aspect ratio for rows that don't set one (default: auto)",
+    )
+    route.add_argument(
+        "--resolution",
+        type=str,
+        default=None,
+        choices=["1K", "2K", "4K"],
+        help="Resolution for rows that don't set one (default: auto)",
+    )
+    _add_quota_options(route)
+    _add_output_options(route)
+    route.add_argument("--ledger-file", type=str, default=None, help=ledger_help)
+
+    status = subparsers.add_parser(
+        "status",
+        help="Show batch jobs recorded in the local ledger",
+        description="Show the jobs in the local ledger, refreshing unfinished jobs' states.",
+    )
+    status.add_argument(
+        "--all",
+        dest="include_fetched",
+        action="store_true",
+        help="Also show jobs whose results were already fetched",
+    )
+    status.add_argument("--ledger-file", type=str, default=None, help=ledger_help)
+
+    resume = subparsers.add_parser(
+        "resume",
+        help="Wait for unfinished ledger jobs and fetch their results",
+        description="Reattach to jobs that were still running when a previous run stopped, "
+        "wait for them, and download every succeeded job that was not fetched yet. "
+        "Nothing is resubmitted.",
+    )
+    resume.add_argument(
+        "--out-dir",
+        type=str,
+        default="batch_results",
+        help="Directory for downloaded images (default: batch_results)",
+    )
+    resume.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Retries per status check for rate limits, timeouts and 5xx errors (default: 3)",
+    )
+    resume.add_argument("--ledger-file", type=str, default=None, help=ledger_help)
+
+    fetch = subparsers.add_parser(
+        "fetch",
+        help="Download results of finished jobs",
+        description="Download results of the given jobs, or of every succeeded ledger job "
+        "that was not fetched yet.",
+    )
+    fetch.add_argument("job_names", nargs="*", help="Batch job names (default: all unfetched)")
+    fetch.add_argument(
+        "--out-dir",
+        type=str,
+        default="batch_results",
+        help="Directory for downloaded images (default: batch_results)",
+    )
+    fetch.add_argument("--ledger-file", type=str, default=None, help=ledger_help)
+
+    return parser.parse_args(args)
+
+
+def parse_serve_args(args: Sequence[str]) -> argparse.Namespace:
+    """Parse ``anyimg serve`` arguments.
+
+    Args:
+        args: Arguments following ``serve``
+
+    Returns:
+        Parsed namespace
+    """
+    parser = argparse.ArgumentParser(
+        prog="anyimg serve",
+        description="Run a long-lived daemon that keeps the API client, its connections "
+        "and the worker pools warm, and runs jobs sent by 'anyimg --server ...'. Images "
+        "are written by the daemon, as the daemon's user.",
+    )
+    listen = parser.add_mutually_exclusive_group()
+    listen.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        help="Unix socket to listen on (default: ~/.cache/anyimg/server.sock)",
+    )
+    listen.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Listen on this port on 127.0.0.1 instead of a Unix socket; jobs must carry "
+        "the token the server writes to ~/.cache/anyimg/server-PORT.token",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="API requests in flight at once, across every job (default: 8)",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=None,
+        help="API connections kept open and reused across jobs "
+        "(default: --concurrency, at least 10)",
+    )
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="Open one API connection per worker before accepting jobs",
+    )
+
+    parsed = parser.parse_args(args)
+    if parsed.concurrency < 1:
+        parser.error("argument --concurrency: must be at least 1")
+    return parsed
@@ -0,0 +1,18 @@
+"""Shard model for splitting large Batch API input files into separate jobs."""
+
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+
+class BatchShard(BaseModel):
+    """One slice of a batch input file, submitted as its own Batch API job."""
+
+    index: int = Field(..., ge=0, description="Shard position within the source file (0-based)")
+    path: Path = Field(..., description="JSONL file holding this shard's requests")
+    request_count: int = Field(..., ge=0, description="Number of requests in the shard")
+    size_bytes: int = Field(..., ge=0, description="Size of the shard file in bytes")
+    job_name: str | None = Field(default=None, description="Batch job name once submitted")
+    state: str | None = Field(default=None, description="Last known job state")
+    submissions: int = Field(default=0, ge=0, description="Times the shard has been submitted")
+    error_message: str | None = Field(default=None, description="Last failure, if any")
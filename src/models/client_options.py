@@ -0,0 +1,39 @@
+"""Connection pool options for the shared Gemini API client."""
+
+from pydantic import BaseModel, Field
+
+from .config import GenerationConfig
+
+DEFAULT_POOL_SIZE = 10
+
+
+class ClientOptions(BaseModel):
+    """HTTP connection pool settings for the process-wide Gemini client.
+
+    Every idle connection up to ``pool_size`` is kept alive for ``keepalive_expiry``
+    seconds, so a run whose workers all reconnect between waves reuses its sockets
+    instead of paying a new TCP and TLS handshake per request.
+    """
+
+    pool_size: int = Field(
+        default=DEFAULT_POOL_SIZE, ge=1, description="Connections kept open to the API"
+    )
+    keepalive_expiry: float = Field(
+        default=120.0, gt=0, description="Seconds an idle pooled connection is kept open"
+    )
+    base_url: str | None = Field(
+        default=None, description="API endpoint override (None for the SDK default)"
+    )
+
+    @classmethod
+    def from_config(cls, config: GenerationConfig) -> "ClientOptions":
+        """Create options from CLI configuration.
+
+        The pool defaults to one connection per worker (at least DEFAULT_POOL_SIZE), so
+        every in-flight request has a warm connection to return to.
+        """
+        pool_size = config.pool_size
+        if pool_size is None:
+            pool_size = max(config.concurrency, DEFAULT_POOL_SIZE)
+
+        return cls(pool_size=pool_size)
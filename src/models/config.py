@@ -3,7 +3,10 @@
 import os
 from pathlib import Path
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator
+
+from src.utils.atomic_write import DURABILITY_MODES
+from src.utils.path_utils import OUTPUT_FORMATS
 
 from .exceptions import (
     InvalidBatchCountError,
@@ -24,7 +27,89 @@ class GenerationConfig(BaseModel):
         default=None, description="Custom output path (None for timestamped default)"
     )
     batch_count: int = Field(default=1, ge=1, description="Number of images to generate")
+    concurrency: int = Field(
+        default=1, ge=1, description="Maximum number of generation requests in flight at once"
+    )
+    server: str | None = Field(
+        default=None,
+        description="anyimg serve address to run on ('' for the default socket, None to run "
+        "locally)",
+    )
     api_key: str = Field(..., description="Gemini API key from environment")
+    requests_per_minute: int | None = Field(
+        default=None, ge=1, description="Client-side API requests-per-minute quota"
+    )
+    images_per_minute: int | None = Field(
+        default=None, ge=1, description="Client-side generated-images-per-minute quota"
+    )
+    quota_file: Path | None = Field(
+        default=None, description="Shared quota state file (None for the per-user default)"
+    )
+    max_retries: int = Field(
+        default=3, ge=0, description="Retries per request for transient API errors"
+    )
+    retry_budget: int | None = Field(
+        default=None, ge=0, description="Total retries allowed per run (None for automatic)"
+    )
+    input_max_edge: int = Field(
+        default=2048, ge=0, description="Downsample input images above this edge (0 disables)"
+    )
+    input_quality: int = Field(
+        default=90, ge=1, le=100, description="JPEG quality for downsampled input images"
+    )
+    cache_dir: Path | None = Field(
+        default=None, description="Response cache directory (None disables caching)"
+    )
+    cache_max_mb: int = Field(default=1024, ge=1, description="Response cache size cap in MB")
+    no_cache: bool = Field(default=False, description="Bypass the response cache entirely")
+    refresh_cache: bool = Field(
+        default=False, description="Ignore cached responses but store new ones"
+    )
+    shard_max_requests: int = Field(
+        default=10000, ge=1, description="Maximum requests per Batch API job"
+    )
+    shard_max_mb: int = Field(
+        default=1900, ge=1, description="Maximum Batch API input file size in MB"
+    )
+    shard_resubmits: int = Field(
+        default=2, ge=0, description="Resubmissions allowed per failed Batch API shard"
+    )
+    ledger_file: Path | None = Field(
+        default=None, description="Batch job ledger file (None for the per-user default)"
+    )
+    pool_size: int | None = Field(
+        default=None, ge=1, description="API connection pool size (None to match concurrency)"
+    )
+    prewarm: bool = Field(
+        default=False, description="Open pooled API connections before the first request"
+    )
+    stream: bool = Field(
+        default=False, description="Stream responses and save each image as soon as it arrives"
+    )
+    output_format: str | None = Field(
+        default=None, description="Re-encode saved images to png, jpeg, webp or avif"
+    )
+    output_quality: int | None = Field(
+        default=None, ge=1, le=100, description="Lossy quality for --format"
+    )
+    output_effort: int | None = Field(
+        default=None, ge=0, le=10, description="Encoder effort for --format"
+    )
+    derivatives: list[int] = Field(
+        default_factory=list[int], description="Longest edges of downsized copies saved per image"
+    )
+    durability: str = Field(
+        default="none", description="Image flush mode: none, file (fsync each) or group"
+    )
+    durability_group: int = Field(
+        default=64, ge=1, description="Images per flush with durability 'group'"
+    )
+    metrics_out: Path | None = Field(
+        default=None, description="Run metrics file (.prom for Prometheus, else JSON)"
+    )
+    prompts_file: Path | None = Field(
+        default=None, description="Prompts file to generate inline, one image per row"
+    )
     aspect_ratio: str | None = Field(
         default=None,
         description="Aspect ratio for generated image (e.g., '1:1', '16:9')",
@@ -78,10 +163,36 @@ class GenerationConfig(BaseModel):
             raise InvalidBatchCountError(v)
         return v
 
+    @field_validator("durability")
+    @classmethod
+    def validate_durability(cls, v: str) -> str:
+        """Validate durability is a known mode."""
+        if v not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of: {', '.join(DURABILITY_MODES)}")
+        return v
+
+    @field_validator("output_format")
+    @classmethod
+    def validate_output_format(cls, v: str | None) -> str | None:
+        """Validate output format is one anyimg can encode."""
+        if v is not None and v not in OUTPUT_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(OUTPUT_FORMATS)}")
+        return v
+
+    @field_validator("derivatives")
+    @classmethod
+    def validate_derivatives(cls, v: list[int]) -> list[int]:
+        """Validate derivative sizes are positive."""
+        if any(edge < 1 for edge in v):
+            raise ValueError("derivative sizes must be positive pixel counts")
+        return v
+
     @field_validator("api_key")
     @classmethod
-    def validate_api_key(cls, v: str) -> str:
-        """Validate API key is non-empty."""
+    def validate_api_key(cls, v: str, info: ValidationInfo) -> str:
+        """Validate API key is non-empty (runs on a server use the server's own key)."""
+        if info.data.get("server") is not None:
+            return v
         if not v or not v.strip():
             raise MissingAPIKeyError()
         return v
@@ -95,6 +206,34 @@ class GenerationConfig(BaseModel):
         batch_count: int = 1,
         aspect_ratio: str | None = None,
         resolution: str | None = None,
+        concurrency: int = 1,
+        requests_per_minute: int | None = None,
+        images_per_minute: int | None = None,
+        quota_file: str | None = None,
+        max_retries: int = 3,
+        retry_budget: int | None = None,
+        input_max_edge: int = 2048,
+        input_quality: int = 90,
+        cache_dir: str | None = None,
+        cache_max_mb: int = 1024,
+        no_cache: bool = False,
+        refresh_cache: bool = False,
+        shard_max_requests: int = 10000,
+        shard_max_mb: int = 1900,
+        shard_resubmits: int = 2,
+        ledger_file: str | None = None,
+        prompts_file: str | None = None,
+        pool_size: int | None = None,
+        prewarm: bool = False,
+        stream: bool = False,
+        metrics_out: str | None = None,
+        durability: str = "none",
+        durability_group: int = 64,
+        output_format: str | None = None,
+        output_quality: int | None = None,
+        output_effort: int | None = None,
+        derivatives: list[int] | None = None,
+        server: str | None = None,
     ) -> "GenerationConfig":
         """Create config from CLI arguments."""
         api_key = os.getenv("GEMINI_API_KEY", "")
@@ -104,7 +243,35 @@ class GenerationConfig(BaseModel):
             input_images=[Path(p) for p in (input_images or [])],
             output_path=Path(output_path) if output_path else None,
             batch_count=batch_count,
+            concurrency=concurrency,
             api_key=api_key,
+            requests_per_minute=requests_per_minute,
+            images_per_minute=images_per_minute,
+            quota_file=Path(quota_file) if quota_file else None,
+            max_retries=max_retries,
+            retry_budget=retry_budget,
+            input_max_edge=input_max_edge,
+            input_quality=input_quality,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            cache_max_mb=cache_max_mb,
+            no_cache=no_cache,
+            refresh_cache=refresh_cache,
+            shard_max_requests=shard_max_requests,
+            shard_max_mb=shard_max_mb,
+            shard_resubmits=shard_resubmits,
+            ledger_file=Path(ledger_file) if ledger_file else None,
+            prompts_file=Path(prompts_file) if prompts_file else None,
+            pool_size=pool_size,
+            prewarm=prewarm,
+            stream=stream,
+            metrics_out=Path(metrics_out) if metrics_out else None,
+            durability=durability,
+            durability_group=durability_group,
+            output_format=output_format,
+            output_quality=output_quality,
+            output_effort=output_effort,
+            derivatives=derivatives or [],
+            server=server,
             aspect_ratio=aspect_ratio,
             resolution=resolution,
         )
@@ -0,0 +1,41 @@
+"""Output encoding options for saved images."""
+
+from pydantic import BaseModel, Field
+
+from src.utils.path_utils import OUTPUT_FORMATS
+
+from .config import GenerationConfig
+
+
+class EncodeOptions(BaseModel):
+    """Format and encoder settings every saved image is re-encoded with.
+
+    ``quality`` applies to the lossy formats (JPEG, WebP, AVIF). ``effort`` trades
+    encoding time for smaller files: it is PNG's compression level (0-9), WebP's
+    method (0-6) and AVIF's inverted speed (0-10); values past a format's range are
+    clamped. None keeps each encoder's default.
+    """
+
+    format: str = Field(..., description="Output format: png, jpeg, webp or avif")
+    quality: int | None = Field(
+        default=None, ge=1, le=100, description="Lossy quality (None for the format default)"
+    )
+    effort: int | None = Field(
+        default=None, ge=0, le=10, description="Encoder effort (None for the format default)"
+    )
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type images are encoded to."""
+        return OUTPUT_FORMATS[self.format]
+
+    @classmethod
+    def from_config(cls, config: GenerationConfig) -> "EncodeOptions | None":
+        """Build options from config, or None when images are kept as returned."""
+        if config.output_format is None:
+            return None
+        return cls(
+            format=config.output_format,
+            quality=config.output_quality,
+            effort=config.output_effort,
+        )
@@ -60,6 +60,18 @@ class TooManyInputImagesError(ValidationError):
         )
 
 
+class InvalidPromptsFileError(ValidationError):
+    """Prompts file is missing or has an invalid row."""
+
+    def __init__(self, message: str, line_number: int | None = None) -> None:
+        location = f" (line {line_number})" if line_number is not None else ""
+        super().__init__(
+            message=f"Invalid prompts file{location}: {message}",
+            remediation="Use one prompt per line, or JSONL rows with a 'prompt' field",
+        )
+        self.line_number = line_number
+
+
 class InvalidBatchCountError(ValidationError):
     """Batch count is invalid."""
 
@@ -75,6 +87,9 @@ class APIError(AnyImgError):
     """Gemini API errors."""
 
     exit_code = 3
+    # Set by the retry loop once a request has given up
+    attempts: int = 1
+    retry_wait: float = 0.0
 
 
 class APITimeoutError(APIError):
@@ -90,11 +105,24 @@ class APITimeoutError(APIError):
 class APIRateLimitError(APIError):
     """API rate limit exceeded."""
 
-    def __init__(self) -> None:
+    def __init__(self, retry_after: float | None = None) -> None:
         super().__init__(
             message="API rate limit exceeded",
             remediation="Wait a few minutes before retrying",
         )
+        self.retry_after = retry_after
+
+
+class APIServerError(APIError):
+    """API returned a 5xx server error."""
+
+    def __init__(self, status_code: int, message: str, retry_after: float | None = None) -> None:
+        super().__init__(
+            message=f"API server error ({status_code}): {message}",
+            remediation="The service is temporarily unavailable; retry later",
+        )
+        self.status_code = status_code
+        self.retry_after = retry_after
 
 
 class APIResponseError(APIError):
@@ -0,0 +1,19 @@
+"""Outcome model for a watched Batch API job."""
+
+from pydantic import BaseModel, Field
+
+from .result import GenerationResult
+
+
+class JobOutcome(BaseModel):
+    """Final state of a watched batch job and the images fetched from it."""
+
+    job_name: str = Field(..., description="Batch job name")
+    state: str = Field(..., description="Final job state")
+    error_message: str | None = Field(
+        default=None, description="Why the job failed or its results could not be fetched"
+    )
+    results: list[GenerationResult] = Field(
+        default_factory=list[GenerationResult],
+        description="One result per request line (empty if not fetched)",
+    )
@@ -0,0 +1,21 @@
+"""Ledger entry model for tracking submitted Batch API jobs across runs."""
+
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+
+class LedgerEntry(BaseModel):
+    """A Batch API job recorded in the local job ledger."""
+
+    job_name: str = Field(..., description="Batch job name (e.g. 'batches/abc123')")
+    source_file: Path = Field(..., description="JSONL file the job was created from")
+    state: str | None = Field(default=None, description="Last known job state")
+    error_message: str | None = Field(default=None, description="Job error, if it failed")
+    created_at: datetime = Field(..., description="When the job was created")
+    updated_at: datetime = Field(..., description="When the state was last checked")
+    fetched_at: datetime | None = Field(
+        default=None, description="When results were downloaded (None if not yet)"
+    )
+    output_dir: Path | None = Field(default=None, description="Where results were saved")
@@ -0,0 +1,44 @@
+"""Run metrics models: per-stage latency summaries and throughput."""
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+# Per-request pipeline stages, in the order a request passes through them
+INPUT_LOAD = "input_load"
+REQUEST_BUILD = "request_build"
+API = "api"
+EXTRACT = "extract"
+WRITE = "write"
+STAGES = (INPUT_LOAD, REQUEST_BUILD, API, EXTRACT, WRITE)
+
+
+class LatencySummary(BaseModel):
+    """Distribution of one timing across a run's requests, in seconds."""
+
+    count: int = Field(..., ge=0, description="Number of observations")
+    total: float = Field(..., ge=0, description="Sum of all observations")
+    mean: float = Field(..., ge=0, description="Mean observation")
+    p50: float = Field(..., ge=0, description="Median")
+    p95: float = Field(..., ge=0, description="95th percentile")
+    p99: float = Field(..., ge=0, description="99th percentile")
+    max: float = Field(..., ge=0, description="Slowest observation")
+
+
+class RunMetrics(BaseModel):
+    """Timing and throughput of one anyimg run."""
+
+    started_at: datetime = Field(..., description="When the run started")
+    wall_time: float = Field(..., ge=0, description="Seconds from start to last result")
+    requests: int = Field(..., ge=0, description="Requests attempted")
+    succeeded: int = Field(..., ge=0, description="Images produced")
+    failed: int = Field(..., ge=0, description="Requests that produced no image")
+    cached: int = Field(..., ge=0, description="Images served from the response cache")
+    images_per_second: float = Field(..., ge=0, description="Images produced per wall second")
+    stages: dict[str, LatencySummary] = Field(
+        default_factory=dict, description="Per-request time spent in each pipeline stage"
+    )
+    latency: dict[str, LatencySummary] = Field(
+        default_factory=dict,
+        description="End-to-end per-request latencies (request, time_to_image, ttfb)",
+    )
@@ -0,0 +1,34 @@
+"""Polling policy model for long-running Batch API jobs."""
+
+import math
+
+from pydantic import BaseModel, Field
+
+
+class PollPolicy(BaseModel):
+    """Status-check interval that grows with a job's age and size, up to a cap.
+
+    A job is checked again after ``age_fraction`` of the time it has been running,
+    but never sooner than a floor that rises with the log of its request count
+    (larger jobs take longer, so polling them early is wasted calls) and never later
+    than ``max_interval``.
+    """
+
+    min_interval: float = Field(default=5.0, ge=0, description="Shortest wait between checks")
+    max_interval: float = Field(default=120.0, gt=0, description="Longest wait between checks")
+    age_fraction: float = Field(
+        default=0.1, ge=0, description="Wait as a fraction of the job's age so far"
+    )
+
+    def interval(self, age: float, request_count: int = 1) -> float:
+        """Seconds to wait before checking a job again.
+
+        Args:
+            age: Seconds since the job was created
+            request_count: Number of requests in the job
+
+        Returns:
+            Delay in seconds, between min_interval and max_interval
+        """
+        size_floor = self.min_interval * (1 + math.log10(max(request_count, 1)))
+        return min(self.max_interval, max(size_floor, age * self.age_fraction))
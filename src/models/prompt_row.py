@@ -0,0 +1,65 @@
+"""Prompt row model for prompts files (one generation per row)."""
+
+from pathlib import Path
+
+from pydantic import BaseModel, Field, field_validator
+
+from src.utils.path_utils import validate_input_image
+
+from .exceptions import TooManyInputImagesError
+
+ASPECT_RATIOS = {"1:1", "2:3", "3:2", "3:4", "4:3", "4:5", "5:4", "9:16", "16:9", "21:9"}
+RESOLUTIONS = {"1K", "2K", "4K"}
+
+
+class PromptRow(BaseModel):
+    """A single row of a prompts file."""
+
+    key: str = Field(..., description="Unique request key (defaults to request-<row number>)")
+    prompt: str = Field(..., description="Text prompt for image generation")
+    aspect_ratio: str | None = Field(default=None, description="Aspect ratio (e.g., '16:9')")
+    resolution: str | None = Field(default=None, description="Resolution (e.g., '2K')")
+    input_images: list[Path] = Field(
+        default_factory=list[Path], description="List of 0-3 reference image paths"
+    )
+    output_path: Path | None = Field(
+        default=None, description="Custom output path (None for a key-based default)"
+    )
+    deadline: float | None = Field(
+        default=None, gt=0, description="Seconds from the start of the run the image is needed by"
+    )
+
+    @field_validator("prompt")
+    @classmethod
+    def validate_prompt(cls, v: str) -> str:
+        """Validate prompt is non-empty and stripped."""
+        v = v.strip()
+        if not v:
+            raise ValueError("Prompt cannot be empty")
+        return v
+
+    @field_validator("aspect_ratio")
+    @classmethod
+    def validate_aspect_ratio(cls, v: str | None) -> str | None:
+        """Validate aspect ratio is one the API supports."""
+        if v is not None and v not in ASPECT_RATIOS:
+            raise ValueError(f"Unsupported aspect ratio: {v}")
+        return v
+
+    @field_validator("resolution")
+    @classmethod
+    def validate_resolution(cls, v: str | None) -> str | None:
+        """Validate resolution is one the API supports."""
+        if v is not None and v not in RESOLUTIONS:
+            raise ValueError(f"Unsupported resolution: {v}")
+        return v
+
+    @field_validator("input_images")
+    @classmethod
+    def validate_input_images(cls, v: list[Path]) -> list[Path]:
+        """Validate input images: max 3, exist, are files, valid formats."""
+        if len(v) > 3:
+            raise TooManyInputImagesError(len(v))
+        for path in v:
+            validate_input_image(path)
+        return v
@@ -14,7 +14,7 @@ class ImageGenerationRequest(BaseModel):
     )
     prompt: str = Field(..., description="Text prompt for image generation")
     input_images: list[Any] = Field(  # Using Any for PIL.Image due to Pydantic limitations
-        default_factory=list, description="Opened PIL Image objects (0-3)"
+        default_factory=list, description="Opened PIL Images or prepared image Parts (0-3)"
     )
     timeout: int = Field(default=60, description="Request timeout in seconds")
     aspect_ratio: str | None = Field(
@@ -6,9 +6,24 @@ from pydantic import BaseModel, Field, model_validator
 class ImageGenerationResponse(BaseModel):
     """Wrapper for Gemini API response data."""
 
-    image_data: bytes = Field(..., description="Raw PNG image bytes")
+    image_data: bytes = Field(..., description="Encoded image bytes, as returned by the API")
+    mime_type: str = Field(default="image/png", description="MIME type of image_data")
     success: bool = Field(..., description="Whether generation succeeded")
     error_message: str | None = Field(default=None, description="Error details if failed")
+    attempts: int = Field(default=1, ge=1, description="API attempts made, including retries")
+    retry_wait: float = Field(
+        default=0.0, ge=0, description="Seconds spent waiting between retries"
+    )
+    ttfb: float | None = Field(
+        default=None, ge=0, description="Seconds to the first streamed chunk (streaming only)"
+    )
+    time_to_image: float | None = Field(
+        default=None, ge=0, description="Seconds from sending the request to having the image"
+    )
+    timings: dict[str, float] = Field(
+        default_factory=dict,
+        description="Seconds per stage of the successful attempt (api, extract)",
+    )
 
     @model_validator(mode="after")
     def validate_response(self) -> "ImageGenerationResponse":
@@ -10,9 +10,27 @@ class GenerationResult(BaseModel):
     """Represents the outcome of a single generation attempt (used in batch processing)."""
 
     index: int = Field(..., description="Batch index (0-based)")
+    key: str | None = Field(default=None, description="Request key, for keyed batch requests")
     output_path: Path = Field(..., description="Where image was/would be saved")
     success: bool = Field(..., description="Whether this attempt succeeded")
     error_message: str | None = Field(default=None, description="Error details if failed")
+    attempts: int = Field(default=1, ge=1, description="API attempts made, including retries")
+    retry_wait: float = Field(
+        default=0.0, ge=0, description="Seconds spent waiting between retries"
+    )
+    ttfb: float | None = Field(
+        default=None, ge=0, description="Seconds to the first streamed chunk (streaming only)"
+    )
+    time_to_image: float | None = Field(
+        default=None, ge=0, description="Seconds from sending the request to having the image"
+    )
+    timings: dict[str, float] = Field(
+        default_factory=dict, description="Seconds spent in each pipeline stage"
+    )
+    duration: float | None = Field(
+        default=None, ge=0, description="Seconds from starting the request to its result"
+    )
+    cached: bool = Field(default=False, description="Whether the image came from the cache")
     timestamp: datetime = Field(
         default_factory=datetime.now, description="When generation was attempted"
     )
@@ -0,0 +1,33 @@
+"""Retry policy model for transient API failures."""
+
+from pydantic import BaseModel, Field
+
+from .config import GenerationConfig
+
+
+class RetryPolicy(BaseModel):
+    """Exponential backoff with full jitter and a per-run retry budget."""
+
+    max_retries: int = Field(default=0, ge=0, description="Retries per request after the first try")
+    base_delay: float = Field(default=2.0, gt=0, description="Backoff base in seconds")
+    max_delay: float = Field(
+        default=60.0,
+        gt=0,
+        description="Upper bound for a single backoff; longer server-requested waits give up",
+    )
+    retry_budget: int | None = Field(
+        default=None, ge=0, description="Total retries allowed across a run (None for unlimited)"
+    )
+
+    @classmethod
+    def from_config(cls, config: GenerationConfig) -> "RetryPolicy":
+        """Create policy from CLI configuration.
+
+        The budget defaults to one retry per batch image (at least max_retries), so a
+        sustained outage fails fast instead of multiplying traffic.
+        """
+        budget = config.retry_budget
+        if budget is None:
+            budget = max(config.max_retries, config.batch_count)
+
+        return cls(max_retries=config.max_retries, retry_budget=budget)
@@ -0,0 +1,22 @@
+"""Route plan model splitting a workload between inline generation and the Batch API."""
+
+from pydantic import BaseModel, Field
+
+from .prompt_row import PromptRow
+
+
+class RoutePlan(BaseModel):
+    """Which prompt rows run inline and which go to a Batch API job."""
+
+    inline: list[PromptRow] = Field(
+        default_factory=list[PromptRow], description="Rows generated inline"
+    )
+    batch: list[PromptRow] = Field(
+        default_factory=list[PromptRow], description="Rows sent to a batch job"
+    )
+    order: list[str] = Field(default_factory=list[str], description="Row keys in workload order")
+    inline_latency: float = Field(..., ge=0, description="Estimated seconds per inline request")
+    batch_latency: float = Field(..., ge=0, description="Estimated batch job turnaround seconds")
+    inline_duration: float = Field(
+        default=0.0, ge=0, description="Estimated seconds until every inline row is done"
+    )
@@ -0,0 +1,67 @@
+"""Generation job model for the ``anyimg serve`` daemon."""
+
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field, field_validator
+
+from .config import GenerationConfig
+
+# Never sent: the daemon uses its own API key, and metrics are written by the client
+_CLIENT_ONLY_FIELDS = {"api_key", "server", "metrics_out"}
+# Path options resolved against the client's working directory
+_PATH_FIELDS = ("output_path", "quota_file", "cache_dir", "ledger_file", "prompts_file")
+
+
+class ServerJob(BaseModel):
+    """One CLI run forwarded to a daemon: its options and where it was started."""
+
+    config: dict[str, Any] = Field(..., description="GenerationConfig fields, without the API key")
+    working_dir: Path = Field(
+        ..., description="Client's working directory, for resolving relative paths"
+    )
+
+    @field_validator("working_dir")
+    @classmethod
+    def validate_working_dir(cls, v: Path) -> Path:
+        """Validate the working directory is absolute."""
+        if not v.is_absolute():
+            raise ValueError("working_dir must be an absolute path")
+        return v
+
+    @classmethod
+    def from_config(cls, config: GenerationConfig, working_dir: Path) -> "ServerJob":
+        """Create a job from a client's configuration.
+
+        Args:
+            config: Validated client configuration
+            working_dir: Client's working directory
+
+        Returns:
+            Job ready to send to the daemon
+        """
+        fields = config.model_dump(mode="json", exclude=_CLIENT_ONLY_FIELDS)
+        return cls(config=fields, working_dir=working_dir.absolute())
+
+    def to_config(self, api_key: str) -> GenerationConfig:
+        """Validate the job's options as the daemon's configuration.
+
+        Relative paths are resolved against the client's working directory, since the
+        daemon runs elsewhere.
+
+        Args:
+            api_key: The daemon's Gemini API key
+
+        Returns:
+            Validated configuration
+
+        Raises:
+            ValueError: If an option is invalid
+            ValidationError: If an input image is missing or invalid
+        """
+        fields = {k: v for k, v in self.config.items() if k not in _CLIENT_ONLY_FIELDS}
+        for name in _PATH_FIELDS:
+            if fields.get(name):
+                fields[name] = self.working_dir / fields[name]
+        fields["input_images"] = [self.working_dir / p for p in fields.get("input_images", [])]
+        return GenerationConfig(**fields, api_key=api_key)
@@ -1,15 +1,29 @@
 """Batch API service for handling JSONL-based batch image generation jobs."""
 
 import base64
+import itertools
 import json
+import os
+import tempfile
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterable, Iterator, cast
 
 from google import genai
 from google.genai import types
 
-from src.models.exceptions import APIError, ConfigurationError
+from src.models.batch_shard import BatchShard
+from src.models.exceptions import APIError, ConfigurationError, FileSystemError
+from src.models.poll import PollPolicy
+from src.models.result import GenerationResult
+from src.services.client_service import shared_client
+from src.services.image_service import ImageService
+from src.services.ledger_service import JobLedger
+from src.services.quota_service import QuotaLimiter
+from src.utils.path_utils import extension_for_mime_type
 
 
 class BatchAPIError(APIError):
@@ -22,6 +36,137 @@ class BatchAPIError(APIError):
         )
 
 
+# Shard state recorded when the job could not be created at all
+SUBMIT_FAILED = "SUBMIT_FAILED"
+
+
+def split_batch_file(
+    jsonl_path: Path,
+    max_requests: int,
+    max_bytes: int,
+    shard_dir: Path | None = None,
+) -> list[BatchShard]:
+    """Split a batch input file into shards within per-job request and size limits.
+
+    A file that already fits is returned as a single shard pointing at the original
+    file, without copying it. Otherwise requests are streamed into consecutive shard
+    files; a request without a ``key`` is given ``request-<n>`` (its position in the
+    source file) so results from every shard can be merged by key.
+
+    Args:
+        jsonl_path: Batch input JSONL file
+        max_requests: Maximum requests per shard
+        max_bytes: Maximum shard file size in bytes (a single larger request still
+            gets a shard of its own)
+        shard_dir: Directory for shard files (default: ``<stem>.shards`` next to the
+            input file)
+
+    Returns:
+        Shards in source order
+
+    Raises:
+        FileSystemError: If the input cannot be read or shard files cannot be written
+    """
+    try:
+        total_bytes = jsonl_path.stat().st_size
+        if total_bytes <= max_bytes:
+            with open(jsonl_path, "rb") as f:
+                request_count = sum(1 for line in f if line.strip())
+            if request_count <= max_requests:
+                return [
+                    BatchShard(
+                        index=0,
+                        path=jsonl_path,
+                        request_count=request_count,
+                        size_bytes=total_bytes,
+                    )
+                ]
+
+        shard_dir = shard_dir or jsonl_path.with_name(f"{jsonl_path.stem}.shards")
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        return _write_shards(jsonl_path, shard_dir, max_requests, max_bytes)
+    except OSError as e:
+        raise FileSystemError(
+            f"Failed to split batch file: {jsonl_path}",
+            remediation="Check that the file is readable and the directory is writable",
+        ) from e
+
+
+def _write_shards(
+    jsonl_path: Path, shard_dir: Path, max_requests: int, max_bytes: int
+) -> list[BatchShard]:
+    """Stream requests from jsonl_path into shard files under shard_dir."""
+    shards: list[BatchShard] = []
+    out: BinaryIO | None = None
+    request_number = 0
+
+    try:
+        with open(jsonl_path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request_number += 1
+                line = _ensure_key(line.rstrip(b"\r\n"), request_number) + b"\n"
+
+                current = shards[-1] if shards else None
+                if (
+                    out is None
+                    or current is None
+                    or current.request_count >= max_requests
+                    or current.size_bytes + len(line) > max_bytes
+                ):
+                    if out is not None:
+                        out.close()
+                    index = len(shards)
+                    path = shard_dir / f"{jsonl_path.stem}.shard-{index:04d}.jsonl"
+                    out = open(path, "wb")
+                    current = BatchShard(index=index, path=path, request_count=0, size_bytes=0)
+                    shards.append(current)
+
+                out.write(line)
+                current.request_count += 1
+                current.size_bytes += len(line)
+    finally:
+        if out is not None:
+            out.close()
+
+    return shards
+
+
+def _ensure_key(line: bytes, request_number: int) -> bytes:
+    """Give a request line the ``request-<n>`` key when it has none."""
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError:
+        # Malformed lines are passed through for the Batch API to report
+        return line
+    if not isinstance(request, dict):
+        return line
+    fields = cast(dict[str, Any], request)
+    if fields.get("key"):
+        return line
+    fields["key"] = f"request-{request_number}"
+    return json.dumps(fields, separators=(",", ":")).encode("utf-8")
+
+
+def job_age(batch_job: Any, fallback_start: float) -> float:
+    """Seconds since a batch job was created.
+
+    Args:
+        batch_job: Job returned by batches.get
+        fallback_start: Epoch time to measure from when the job has no create_time
+
+    Returns:
+        Job age in seconds
+    """
+    create_time = getattr(batch_job, "create_time", None)
+    if isinstance(create_time, datetime):
+        if create_time.tzinfo is None:
+            create_time = create_time.replace(tzinfo=timezone.utc)
+        return max(0.0, (datetime.now(timezone.utc) - create_time).total_seconds())
+    return time.time() - fallback_start
+
+
 class BatchAPIService:
     """Service for batch image generation via Gemini Batch API."""
 
@@ -33,13 +178,38 @@ class BatchAPIService:
         "JOB_STATE_EXPIRED",
     }
 
-    def __init__(self, client: genai.Client | None = None) -> None:
+    # Shard states worth resubmitting
+    FAILED_STATES = {
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+        SUBMIT_FAILED,
+    }
+
+    def __init__(
+        self,
+        client: genai.Client | None = None,
+        quota_limiter: QuotaLimiter | None = None,
+        ledger: JobLedger | None = None,
+        poll_policy: PollPolicy | None = None,
+        image_service: ImageService | None = None,
+    ) -> None:
         """Initialize Batch API service.
 
         Args:
-            client: Optional genai.Client instance for testing. If None, creates new client.
+            client: Optional genai.Client instance for testing. If None, uses the shared
+                process-wide client.
+            quota_limiter: Optional limiter consulted before every batches.create call
+            ledger: Optional job ledger recording every created job and its state
+            poll_policy: Status polling backoff (defaults to PollPolicy())
+            image_service: Service saving result images, with its output format and
+                durability (defaults to ImageService())
         """
-        self.client = client if client is not None else genai.Client()
+        self.client = client if client is not None else shared_client()
+        self.quota_limiter = quota_limiter
+        self.ledger = ledger
+        self.poll_policy = poll_policy if poll_policy is not None else PollPolicy()
+        self.image_service = image_service if image_service is not None else ImageService()
 
     def create_batch_from_file(
         self,
@@ -58,6 +228,7 @@ class BatchAPIService:
         Raises:
             ConfigurationError: If file upload fails
             APIError: If batch job creation fails
+            FileSystemError: If the job cannot be recorded in the ledger
         """
         try:
             uploaded_file = self.client.files.upload(
@@ -68,6 +239,9 @@ class BatchAPIService:
                 ),
             )
 
+            if self.quota_limiter is not None:
+                self.quota_limiter.acquire(requests=1)
+
             batch_job = self.client.batches.create(
                 model="gemini-3-pro-image-preview",
                 src=uploaded_file.name,  # type: ignore[arg-type]
@@ -79,7 +253,7 @@ class BatchAPIService:
             if batch_job is None:  # type: ignore[comparison-overlap]
                 raise BatchAPIError("Batch job creation returned None")
 
-            return batch_job.name  # type: ignore[return-value]
+            job_name: str = batch_job.name  # type: ignore[assignment]
 
         except Exception as e:
             error_msg = str(e).lower()
@@ -95,18 +269,27 @@ class BatchAPIService:
                     remediation="Check your JSONL file format and retry",
                 ) from e
 
+        # Recorded before any polling so a killed runner can reattach to the job
+        if self.ledger is not None:
+            self.ledger.record(job_name, jsonl_path, state="JOB_STATE_PENDING")
+
+        return job_name
+
     def poll_batch_status(
         self,
         job_name: str,
-        poll_interval: int = 10,
+        poll_interval: float | None = None,
         timeout: int | None = None,
+        request_count: int = 1,
     ) -> str:
         """Poll batch job status until completion.
 
         Args:
             job_name: Batch job name
-            poll_interval: Seconds between status checks
+            poll_interval: Fixed seconds between status checks (None to back off
+                according to poll_policy)
             timeout: Maximum seconds to wait (None for no timeout)
+            request_count: Requests in the job, used to size the adaptive interval
 
         Returns:
             Final job state
@@ -115,11 +298,16 @@ class BatchAPIService:
             BatchAPIError: If job fails or times out
         """
         start_time = time.time()
+        last_state = None
 
         while True:
             batch_job = self.client.batches.get(name=job_name)
             state = batch_job.state.name  # type: ignore[union-attr]
 
+            if state != last_state:
+                self.record_state(job_name, state, batch_job.error)  # type: ignore[union-attr]
+                last_state = state
+
             # Check if completed
             if state in self.COMPLETED_STATES:
                 return state
@@ -131,22 +319,116 @@ class BatchAPIService:
                 )
 
             # Wait before next poll
-            time.sleep(poll_interval)
+            time.sleep(
+                self._poll_delay(poll_interval, job_age(batch_job, start_time), request_count)
+            )
 
-    def get_batch_results(
-        self,
-        job_name: str,
-    ) -> list[dict[str, Any]]:
-        """Download and parse batch job results.
+    def submit_shards(self, shards: list[BatchShard], max_workers: int = 4) -> None:
+        """Create one batch job per shard, uploading shards concurrently.
+
+        Each shard's job_name, state and submissions are updated in place. A shard
+        whose upload or job creation fails is marked SUBMIT_FAILED instead of
+        aborting the others.
+
+        Args:
+            shards: Shards to submit
+            max_workers: Shards uploaded at once
+
+        Raises:
+            ConfigurationError: If authentication fails
+        """
+
+        def submit(shard: BatchShard) -> None:
+            shard.submissions += 1
+            try:
+                shard.job_name = self.create_batch_from_file(
+                    shard.path,
+                    display_name=shard.path.name,
+                )
+                shard.state = "JOB_STATE_PENDING"
+                shard.error_message = None
+            except APIError as e:
+                shard.state = SUBMIT_FAILED
+                shard.error_message = e.message
+
+        if not shards:
+            return
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+            # list() re-raises the first ConfigurationError from any worker
+            list(executor.map(submit, shards))
+
+    def refresh_job_state(self, job_name: str) -> str:
+        """Fetch a job's current state and store it in the ledger.
 
         Args:
             job_name: Batch job name
 
         Returns:
-            List of result dictionaries (one per request)
+            Current job state
+        """
+        batch_job = self.client.batches.get(name=job_name)
+        state: str = batch_job.state.name  # type: ignore[union-attr]
+        self.record_state(job_name, state, batch_job.error)  # type: ignore[union-attr]
+        return state
+
+    def record_state(self, job_name: str, state: str, error: Any = None) -> None:
+        """Store a job's state in the ledger, if one is configured.
+
+        Args:
+            job_name: Batch job name
+            state: Job state reported by the API
+            error: Job error reported by the API, if any
+        """
+        if self.ledger is not None:
+            failed = state in self.FAILED_STATES and error is not None
+            self.ledger.update_state(job_name, state, str(error) if failed else None)
+
+    def _poll_delay(self, poll_interval: float | None, age: float, request_count: int = 1) -> float:
+        """Seconds until the next status check: fixed if given, else from poll_policy."""
+        if poll_interval is not None:
+            return poll_interval
+        return self.poll_policy.interval(age, request_count)
+
+    def fetch_results(self, job_names: list[str], output_dir: Path) -> list[GenerationResult]:
+        """Download several succeeded jobs' results into one directory.
+
+        Results are streamed job by job into save_batch_images, so images from every
+        job (or shard) land in output_dir under their original request keys. Each job
+        is marked as fetched in the ledger once its results are saved.
+
+        Args:
+            job_names: Names of succeeded batch jobs
+            output_dir: Directory to save images
+
+        Returns:
+            One GenerationResult per result line, in job order
+
+        Raises:
+            BatchAPIError: If a job did not succeed or a download fails
+        """
+        results = itertools.chain.from_iterable(
+            self.iter_batch_results(job_name) for job_name in job_names
+        )
+        saved = self.save_batch_images(results, output_dir)
+
+        if self.ledger is not None:
+            for job_name in job_names:
+                self.ledger.mark_fetched(job_name, output_dir)
+
+        return saved
+
+    def download_batch_results(self, job_name: str, destination: Path) -> Path:
+        """Stream a succeeded batch job's results file to disk.
+
+        Args:
+            job_name: Batch job name
+            destination: Local path to write the JSONL results to
+
+        Returns:
+            The destination path
 
         Raises:
-            BatchAPIError: If job did not succeed or results parsing fails
+            BatchAPIError: If job did not succeed or the download fails
         """
         try:
             batch_job = self.client.batches.get(name=job_name)
@@ -158,78 +440,191 @@ class BatchAPIService:
                 )
 
             result_file_name = batch_job.dest.file_name  # type: ignore[union-attr]
-            file_content_bytes = self.client.files.download(file=result_file_name)  # type: ignore[arg-type]
-            file_content = file_content_bytes.decode("utf-8")
 
-            # Parse JSONL results
-            results = []
-            for line in file_content.splitlines():
-                if line:
-                    parsed_response = json.loads(line)
-                    results.append(parsed_response)
+            try:
+                # Chunks go straight to disk; the file is never held in memory
+                self.client.files.download(file=result_file_name, destination=str(destination))  # type: ignore[arg-type]
+            except TypeError:
+                # SDK versions without streaming downloads only return bytes
+                data = self.client.files.download(file=result_file_name)  # type: ignore[arg-type]
+                destination.write_bytes(data)
 
-            return results
+            return destination
 
         except BatchAPIError:
             raise
         except Exception as e:
             raise BatchAPIError(
-                f"Failed to get batch results: {str(e)}",
+                f"Failed to download batch results: {str(e)}",
             ) from e
 
-    def save_batch_images(
-        self,
-        results: list[dict[str, Any]],
-        output_dir: Path,
-    ) -> list[str]:
-        """Save images from batch results to files.
+    def iter_batch_results(self, job_name: str) -> Iterator[dict[str, Any]]:
+        """Download batch job results and yield them one parsed line at a time.
+
+        The results file is streamed to a temporary file and read back line by line,
+        so memory use is bounded by the largest single result, not the job size.
 
         Args:
-            results: Parsed batch results
-            output_dir: Directory to save images
+            job_name: Batch job name
 
-        Returns:
-            List of saved file paths
+        Yields:
+            Result dictionaries (one per request); an unparseable line yields an
+            ``{"key": "line-N", "error": ...}`` entry
 
         Raises:
-            BatchAPIError: If image saving fails
+            BatchAPIError: If job did not succeed or the download fails
         """
-        saved_paths: list[str] = []  # type: ignore[assignment]
+        fd, tmp_name = tempfile.mkstemp(prefix="anyimg-batch-", suffix=".jsonl")
+        os.close(fd)
+        tmp_path = Path(tmp_name)
 
         try:
-            output_dir.mkdir(parents=True, exist_ok=True)
+            self.download_batch_results(job_name, tmp_path)
+
+            with open(tmp_path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        parsed_response = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        # Report a corrupt line as a failed item instead of losing the rest
+                        parsed_response = {
+                            "key": f"line-{line_number}",
+                            "error": f"Unparseable result line: {str(e)}",
+                        }
+                    yield parsed_response
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
-            for i, result in enumerate(results, start=1):
-                key = result.get("key", f"request-{i}")
+    def get_batch_results(
+        self,
+        job_name: str,
+    ) -> list[dict[str, Any]]:
+        """Download and parse batch job results.
 
-                # Check for error
-                if "error" in result:
-                    print(f"[yellow]Warning:[/yellow] Request {key} failed: {result['error']}")
-                    continue
+        Holds every result in memory; prefer iter_batch_results for large jobs.
 
-                # Extract and save image
-                if "response" in result and result["response"]:
-                    candidates = result["response"].get("candidates", [])
-                    if candidates and "content" in candidates[0]:
-                        parts = candidates[0]["content"].get("parts", [])
+        Args:
+            job_name: Batch job name
 
-                        for part in parts:
-                            if "inlineData" in part:
-                                mime_type = part["inlineData"].get("mimeType", "image/png")
-                                data = base64.b64decode(part["inlineData"]["data"])
+        Returns:
+            List of result dictionaries (one per request)
 
-                                # Determine file extension
-                                ext = ".png" if "png" in mime_type else ".jpg"
+        Raises:
+            BatchAPIError: If job did not succeed or the download fails
+        """
+        return list(self.iter_batch_results(job_name))
 
-                                file_path = output_dir / f"{key}{ext}"
-                                with open(file_path, "wb") as f:
-                                    f.write(data)
+    def save_batch_images(
+        self,
+        results: Iterable[dict[str, Any]],
+        output_dir: Path,
+        max_workers: int | None = None,
+        max_in_flight: int | None = None,
+    ) -> list[GenerationResult]:
+        """Save images from batch results to files.
 
-                                saved_paths.append(str(file_path))  # type: ignore[arg-type]
+        Results are decoded and written by a thread pool while they are still being
+        read, through image_service (so an output format is encoded in its process
+        pool). At most max_in_flight results are held at once, so memory stays bounded
+        even when results come from the iter_batch_results generator.
 
-            return saved_paths
+        Args:
+            results: Parsed batch results (list or iterator)
+            output_dir: Directory to save images
+            max_workers: Decode/write threads (default: CPU count, at most 8)
+            max_in_flight: Results buffered ahead of the workers (default: 2 per worker)
 
+        Returns:
+            One GenerationResult per input result, in input order; failed items carry
+            their error instead of aborting the save
+
+        Raises:
+            BatchAPIError: If the output directory cannot be created or the saved
+                images cannot be flushed to disk
+        """
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             raise BatchAPIError(
                 f"Failed to save batch images: {str(e)}",
             ) from e
+
+        workers = max_workers or min(8, os.cpu_count() or 1)
+        slots = threading.BoundedSemaphore(max_in_flight or workers * 2)
+        futures: list[Future[GenerationResult]] = []
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for i, result in enumerate(results):
+                    # Block reading further results until a worker frees a slot
+                    slots.acquire()
+                    future = executor.submit(self._save_batch_image, i, result, output_dir)
+                    future.add_done_callback(lambda _: slots.release())
+                    futures.append(future)
+        finally:
+            # Publish what was saved even if reading the results failed part way
+            try:
+                self.image_service.flush()
+            except FileSystemError as e:
+                raise BatchAPIError(f"Failed to save batch images: {e.message}") from e
+        return [future.result() for future in futures]
+
+    def _save_batch_image(
+        self, index: int, result: dict[str, Any], output_dir: Path
+    ) -> GenerationResult:
+        """Decode and write one batch result, converting any failure into a failed result."""
+        key = result.get("key", f"request-{index + 1}")
+        output_path = output_dir / f"{key}.png"
+
+        try:
+            # Check for error
+            if "error" in result:
+                return GenerationResult(
+                    index=index,
+                    key=key,
+                    output_path=output_path,
+                    success=False,
+                    error_message=f"Request {key} failed: {result['error']}",
+                )
+
+            # Extract and save the first final (non-thought) image
+            response: dict[str, Any] = result.get("response") or {}
+            candidates: list[dict[str, Any]] = response.get("candidates", [])
+            parts: list[dict[str, Any]] = (
+                candidates[0].get("content", {}).get("parts", []) if candidates else []
+            )
+
+            for part in parts:
+                if "inlineData" in part and not part.get("thought"):
+                    inline_data: dict[str, Any] = part["inlineData"]
+                    mime_type: str = inline_data.get("mimeType", "image/png")
+                    data = base64.b64decode(inline_data["data"], validate=True)
+
+                    extension = extension_for_mime_type(
+                        self.image_service.output_mime_type(mime_type)
+                    )
+                    output_path = output_dir / f"{key}{extension}"
+                    self.image_service.save_image(data, output_path, mime_type)
+
+                    return GenerationResult(
+                        index=index, key=key, output_path=output_path, success=True
+                    )
+
+            return GenerationResult(
+                index=index,
+                key=key,
+                output_path=output_path,
+                success=False,
+                error_message=f"Request {key} returned no image",
+            )
+
+        except Exception as e:
+            return GenerationResult(
+                index=index,
+                key=key,
+                output_path=output_path,
+                success=False,
+                error_message=f"Failed to save image for request {key}: {str(e)}",
+            )
@@ -0,0 +1,154 @@
+"""Compile prompts files into Batch API request JSONL."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable
+
+from google import genai
+from google.genai import types
+
+from src.models.exceptions import APIError, ConfigurationError, FileSystemError
+from src.models.prompt_row import PromptRow
+from src.services.client_service import shared_client
+from src.utils.path_utils import mime_type_for_path
+
+
+class BatchBuilder:
+    """Writes one Batch API request line per prompt row.
+
+    Reference images are uploaded through the Files API once per distinct content
+    (sha256 of the file bytes) and referenced by URI, so a shared style image used by
+    thousands of rows is uploaded and stored only once.
+    """
+
+    def __init__(self, client: genai.Client | None = None) -> None:
+        """Initialize batch builder.
+
+        Args:
+            client: Optional genai.Client instance for testing. If None, the shared
+                process-wide client is taken on the first upload, so image-free prompts
+                files need no API key.
+        """
+        self._client = client
+        # sha256 of file content -> (file URI, MIME type)
+        self._uploads: dict[str, tuple[str, str]] = {}
+        # resolved path -> sha256, so repeated paths are hashed once
+        self._path_digests: dict[Path, str] = {}
+
+    @property
+    def client(self) -> genai.Client:
+        """Gemini client, taken from the shared client on first use."""
+        if self._client is None:
+            self._client = shared_client()
+        return self._client
+
+    @property
+    def upload_count(self) -> int:
+        """Number of distinct reference images uploaded so far."""
+        return len(self._uploads)
+
+    def build(self, rows: Iterable[PromptRow], output_path: Path) -> int:
+        """Stream prompt rows into a Batch API JSONL file.
+
+        Args:
+            rows: Prompt rows (typically from iter_prompt_rows)
+            output_path: JSONL file to write
+
+        Returns:
+            Number of request lines written
+
+        Raises:
+            FileSystemError: If the output file or a reference image cannot be accessed
+            ConfigurationError: If authentication fails while uploading
+            APIError: If a reference image upload fails
+        """
+        try:
+            if output_path.parent != Path("."):
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+            f = open(output_path, "w", encoding="utf-8")
+        except OSError as e:
+            raise FileSystemError(
+                f"Failed to create batch file: {output_path}",
+                remediation="Check file permissions and disk space",
+            ) from e
+
+        count = 0
+        with f:
+            for row in rows:
+                line = {"key": row.key, "request": self.request_for(row)}
+                f.write(json.dumps(line, separators=(",", ":")) + "\n")
+                count += 1
+
+        return count
+
+    def request_for(self, row: PromptRow) -> dict[str, Any]:
+        """Build the GenerateContentRequest body for one row.
+
+        Args:
+            row: Prompt row
+
+        Returns:
+            Request dictionary in the Batch API's JSON field naming
+        """
+        parts: list[dict[str, Any]] = [{"text": row.prompt}]
+        for path in row.input_images:
+            file_uri, mime_type = self._upload(path)
+            parts.append({"fileData": {"fileUri": file_uri, "mimeType": mime_type}})
+
+        generation_config: dict[str, Any] = {"responseModalities": ["TEXT", "IMAGE"]}
+        image_config: dict[str, str] = {}
+        if row.aspect_ratio:
+            image_config["aspectRatio"] = row.aspect_ratio
+        if row.resolution:
+            image_config["imageSize"] = row.resolution
+        if image_config:
+            generation_config["imageConfig"] = image_config
+
+        return {
+            "contents": [{"role": "user", "parts": parts}],
+            "generationConfig": generation_config,
+        }
+
+    def _upload(self, path: Path) -> tuple[str, str]:
+        """Upload a reference image unless identical content was already uploaded."""
+        resolved = path.resolve()
+        digest = self._path_digests.get(resolved)
+        if digest is None:
+            try:
+                digest = hashlib.sha256(resolved.read_bytes()).hexdigest()
+            except OSError as e:
+                raise FileSystemError(
+                    f"Failed to read image: {path}",
+                    remediation=f"Ensure {path} is readable",
+                ) from e
+            self._path_digests[resolved] = digest
+
+        uploaded = self._uploads.get(digest)
+        if uploaded is not None:
+            return uploaded
+
+        mime_type = mime_type_for_path(path) or "image/png"
+        try:
+            file = self.client.files.upload(
+                file=str(path),
+                config=types.UploadFileConfig(
+                    display_name=f"anyimg-{digest[:16]}",
+                    mime_type=mime_type,
+                ),
+            )
+        except Exception as e:
+            error_msg = str(e).lower()
+            if "401" in error_msg or "unauthorized" in error_msg or "auth" in error_msg:
+                raise ConfigurationError(
+                    message="Authentication failed",
+                    remediation="Check your GEMINI_API_KEY environment variable",
+                ) from e
+            raise APIError(
+                message=f"Failed to upload reference image {path}: {str(e)}",
+                remediation="Check your network connection and retry",
+            ) from e
+
+        uploaded = (str(file.uri), file.mime_type or mime_type)
+        self._uploads[digest] = uploaded
+        return uploaded
@@ -1,37 +1,57 @@
 """Batch generation orchestrator for handling multiple image generations."""
 
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
 from src.models.config import GenerationConfig
+from src.models.exceptions import APIError, FileSystemError
+from src.models.metrics import INPUT_LOAD, REQUEST_BUILD, WRITE
+from src.models.prompt_row import PromptRow
 from src.models.request import ImageGenerationRequest
+from src.models.response import ImageGenerationResponse
 from src.models.result import GenerationResult
-from src.services.gemini_service import GeminiService
+from src.services.cache_service import ResponseCache
+from src.services.gemini_service import AsyncGeminiService, GeminiService
 from src.services.image_service import ImageService
-from src.utils.path_utils import auto_rename_if_exists, resolve_output_path
+from src.utils.path_utils import (
+    OUTPUT_FORMATS,
+    PathAllocator,
+    extension_for_mime_type,
+    generate_timestamp_filename,
+    mime_type_for_path,
+)
+from src.utils.timing import StageTimer
 
 
-def generate_batch(
+def resolve_batch_output_paths(
     config: GenerationConfig,
-    gemini_service: GeminiService,
-    image_service: ImageService,
-) -> list[GenerationResult]:
-    """Generate batch of images.
+    allocator: PathAllocator | None = None,
+    directory: Path | None = None,
+) -> list[Path]:
+    """Resolve one unique output path per batch index.
+
+    Paths are claimed up front so that concurrent slots never race for the
+    same filename. Default names share one millisecond timestamp and carry the
+    slot's index, so a batch's own slots never collide with each other. With an
+    output format set, custom paths take that format's extension.
 
     Args:
         config: Generation configuration
-        gemini_service: Service for API calls
-        image_service: Service for file I/O
+        allocator: Allocator to claim the paths with (defaults to a new one)
+        directory: Directory for default timestamped names (default: the working
+            directory)
 
     Returns:
-        List of GenerationResult for each attempt (both success and failure)
+        List of output paths, one per batch index
     """
-    results: list[GenerationResult] = []
-
-    # Load input images once (if any)
-    input_pil_images = (
-        image_service.load_input_images(config.input_images) if config.input_images else []
-    )
+    allocator = allocator if allocator is not None else PathAllocator()
+    now = datetime.now()
+    output_paths: list[Path] = []
 
     for i in range(config.batch_count):
-        # Generate output path
         if config.output_path:
             # Custom path: add index for batch mode
             if config.batch_count > 1:
@@ -41,59 +61,691 @@ def generate_batch(
                 output_path = parent / f"{stem}_{i + 1}{suffix}"
             else:
                 output_path = config.output_path
+            if config.output_format is not None:
+                extension = extension_for_mime_type(OUTPUT_FORMATS[config.output_format])
+                output_path = output_path.with_suffix(extension)
         else:
             # Default timestamped path
-            output_path = resolve_output_path(None)
+            index = i + 1 if config.batch_count > 1 else None
+            output_path = (directory or Path(".")) / generate_timestamp_filename(index, now)
 
-        # Auto-rename if exists
-        output_path = auto_rename_if_exists(output_path)
+        # Auto-rename if exists (on disk or already claimed by an earlier index)
+        output_paths.append(allocator.allocate(output_path))
 
-        try:
-            # Create request
-            request = ImageGenerationRequest(
-                prompt=config.prompt,
-                input_images=input_pil_images,
-                aspect_ratio=config.aspect_ratio,
-                resolution=config.resolution,
+    return output_paths
+
+
+def _prepare_inputs(config: GenerationConfig, image_service: ImageService) -> list[Any]:
+    """Load and downsample the batch's input images once, ready for upload."""
+    if not config.input_images:
+        return []
+    return image_service.prepare_input_images(
+        config.input_images,
+        max_edge=config.input_max_edge,
+        quality=config.input_quality,
+        cache_dir=config.cache_dir if not config.no_cache else None,
+    )
+
+
+def _build_request(config: GenerationConfig, input_images: list[Any]) -> ImageGenerationRequest:
+    """Create the generation request shared by every batch slot."""
+    return ImageGenerationRequest(
+        prompt=config.prompt,
+        input_images=input_images,
+        aspect_ratio=config.aspect_ratio,
+        resolution=config.resolution,
+    )
+
+
+def _final_output_path(
+    output_path: Path, mime_type: str, custom: bool, allocator: PathAllocator
+) -> Path:
+    """Pick the path to write a response to.
+
+    Default-named outputs take the extension of the format the API returned, so the
+    bytes can be written without re-encoding; the slot's original claim is released.
+    Custom paths are kept as given.
+    """
+    if custom:
+        return output_path
+
+    extension = extension_for_mime_type(mime_type)
+    if output_path.suffix == extension:
+        return output_path
+    final_path = allocator.allocate(output_path.with_suffix(extension))
+    allocator.release(output_path)
+    return final_path
+
+
+def _serve_from_cache(
+    index: int,
+    output_path: Path,
+    cache_key: str,
+    config: GenerationConfig,
+    image_service: ImageService,
+    cache: ResponseCache,
+    allocator: PathAllocator,
+) -> GenerationResult | None:
+    """Satisfy a slot from the response cache, or return None on a miss."""
+    cached_path = cache.lookup(cache_key)
+    if cached_path is None:
+        return None
+
+    mime_type = mime_type_for_path(cached_path) or "image/png"
+    output_path = _final_output_path(
+        output_path,
+        image_service.output_mime_type(mime_type),
+        config.output_path is not None,
+        allocator,
+    )
+
+    if mime_type_for_path(output_path) in (None, mime_type) and not image_service.derivatives:
+        image_service.link_image(cached_path, output_path)
+    else:
+        # Another format, or derivatives to render: go through the image service
+        image_service.save_image(cached_path.read_bytes(), output_path, mime_type)
+
+    return GenerationResult(
+        index=index,
+        output_path=output_path,
+        success=True,
+        error_message=None,
+        cached=True,
+    )
+
+
+def _store_in_cache(
+    cache: ResponseCache, cache_key: str, response: ImageGenerationResponse
+) -> None:
+    """Add a fresh response to the cache; the cache is best-effort."""
+    try:
+        cache.store(cache_key, response.image_data, response.mime_type)
+    except FileSystemError:
+        pass  # The image itself was saved; only future reuse is lost
+
+
+def _timed(result: GenerationResult, timer: StageTimer) -> GenerationResult:
+    """Attach a slot's stage timings to a result built elsewhere."""
+    return result.model_copy(update={"timings": timer.timings, "duration": timer.elapsed})
+
+
+def _generate_one(
+    index: int,
+    output_path: Path,
+    config: GenerationConfig,
+    input_images: list[Any],
+    gemini_service: GeminiService,
+    image_service: ImageService,
+    cache: ResponseCache | None = None,
+    input_load: float = 0.0,
+    allocator: PathAllocator | None = None,
+) -> GenerationResult:
+    """Run a single batch slot, converting any failure into a failed result."""
+    allocator = allocator if allocator is not None else PathAllocator()
+    timer = StageTimer()
+    timer.add(INPUT_LOAD, input_load)
+
+    try:
+        with timer.stage(REQUEST_BUILD):
+            request = _build_request(config, input_images)
+            cache_key = cache.key_for(request, variant=index) if cache else ""
+
+        # Short-circuit identical requests from the cache
+        if cache is not None:
+            with timer.stage(WRITE):
+                hit = _serve_from_cache(
+                    index, output_path, cache_key, config, image_service, cache, allocator
+                )
+            if hit is not None:
+                return _timed(hit, timer)
+
+        # Generate image
+        response = gemini_service.generate_image(request)
+        timer.timings.update(response.timings)
+
+        if not response.success:
+            # Record API failure
+            return GenerationResult(
+                index=index,
+                output_path=output_path,
+                success=False,
+                error_message=response.error_message,
+                attempts=response.attempts,
+                retry_wait=response.retry_wait,
+                timings=timer.timings,
+                duration=timer.elapsed,
             )
 
-            # Generate image
-            response = gemini_service.generate_image(request)
+        # Save image
+        with timer.stage(WRITE):
+            output_mime_type = image_service.output_mime_type(response.mime_type)
+            output_path = _final_output_path(
+                output_path, output_mime_type, config.output_path is not None, allocator
+            )
+            image_service.save_image(response.image_data, output_path, response.mime_type)
 
-            if response.success:
-                # Save image
-                image_service.save_image(response.image_data, output_path)
+            if cache is not None:
+                _store_in_cache(cache, cache_key, response)
 
-                # Record success
-                results.append(
-                    GenerationResult(
-                        index=i,
-                        output_path=output_path,
-                        success=True,
-                        error_message=None,
-                    )
+        # Record success
+        return GenerationResult(
+            index=index,
+            output_path=output_path,
+            success=True,
+            error_message=None,
+            attempts=response.attempts,
+            retry_wait=response.retry_wait,
+            ttfb=response.ttfb,
+            time_to_image=response.time_to_image,
+            timings=timer.timings,
+            duration=timer.elapsed,
+        )
+
+    except Exception as e:
+        # Record exception (don't abort batch)
+        return GenerationResult(
+            index=index,
+            output_path=output_path,
+            success=False,
+            error_message=str(e),
+            attempts=e.attempts if isinstance(e, APIError) else 1,
+            retry_wait=e.retry_wait if isinstance(e, APIError) else 0.0,
+            timings=timer.timings,
+            duration=timer.elapsed,
+        )
+
+
+def iter_batch_results(
+    config: GenerationConfig,
+    gemini_service: GeminiService,
+    image_service: ImageService,
+    concurrency: int | None = None,
+    cache: ResponseCache | None = None,
+    executor: Executor | None = None,
+    directory: Path | None = None,
+) -> Iterator[GenerationResult]:
+    """Generate a batch of images, yielding each result as soon as its slot finishes.
+
+    At most ``concurrency`` slots are submitted at a time, so a run sharing an
+    executor with other runs never holds more than its own share of the workers.
+    Each slot's image is written before its result is yielded, and the image
+    service is flushed once every slot is done.
+
+    Args:
+        config: Generation configuration
+        gemini_service: Service for API calls
+        image_service: Service for file I/O
+        concurrency: Maximum requests in flight at once (defaults to config.concurrency)
+        cache: Optional response cache consulted before each API call
+        executor: Worker pool to run slots on (default: a pool of this run's own,
+            or the calling thread when concurrency is 1)
+        directory: Directory for default-named outputs (default: the working
+            directory)
+
+    Yields:
+        One GenerationResult per attempt (both success and failure), in completion order
+    """
+    max_workers = concurrency if concurrency is not None else config.concurrency
+
+    # Load and downsample input images once per batch (if any); every slot waits on it
+    timer = StageTimer()
+    input_parts = _prepare_inputs(config, image_service)
+    input_load = timer.elapsed
+
+    allocator = PathAllocator()
+    output_paths: list[Path] = []
+
+    def run_slot(i: int) -> GenerationResult:
+        return _generate_one(
+            i,
+            output_paths[i],
+            config,
+            input_parts,
+            gemini_service,
+            image_service,
+            cache,
+            input_load,
+            allocator,
+        )
+
+    def finish(result: GenerationResult) -> GenerationResult:
+        # The image is written (or never will be), so the name's reservation can go
+        allocator.release(result.output_path)
+        return result
+
+    pending: set[Future[GenerationResult]] = set()
+    try:
+        output_paths = resolve_batch_output_paths(config, allocator, directory)
+        if executor is None and (max_workers <= 1 or config.batch_count == 1):
+            for i in range(config.batch_count):
+                yield finish(run_slot(i))
+        else:
+            # Each slot catches its own exceptions, so one failure never cancels the others
+            workers = max(min(max_workers, config.batch_count), 1)
+            pool = executor if executor is not None else ThreadPoolExecutor(max_workers=workers)
+            try:
+                for i in range(config.batch_count):
+                    if len(pending) >= workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from (finish(future.result()) for future in done)
+                    pending.add(pool.submit(run_slot, i))
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from (finish(future.result()) for future in done)
+            finally:
+                if executor is None:
+                    pool.shutdown()
+    finally:
+        # Even when abandoned early: images still being written land before the flush
+        wait(pending)
+        allocator.close()
+        image_service.flush()
+
+
+def generate_batch(
+    config: GenerationConfig,
+    gemini_service: GeminiService,
+    image_service: ImageService,
+    concurrency: int | None = None,
+    cache: ResponseCache | None = None,
+) -> list[GenerationResult]:
+    """Generate batch of images.
+
+    Args:
+        config: Generation configuration
+        gemini_service: Service for API calls
+        image_service: Service for file I/O
+        concurrency: Maximum requests in flight at once (defaults to config.concurrency)
+        cache: Optional response cache consulted before each API call
+
+    Returns:
+        List of GenerationResult for each attempt (both success and failure), in index order
+    """
+    results = iter_batch_results(config, gemini_service, image_service, concurrency, cache)
+    return sorted(results, key=lambda r: r.index)
+
+
+async def _generate_one_async(
+    index: int,
+    output_path: Path,
+    config: GenerationConfig,
+    input_images: list[Any],
+    gemini_service: AsyncGeminiService,
+    image_service: ImageService,
+    semaphore: asyncio.Semaphore,
+    cache: ResponseCache | None = None,
+    input_load: float = 0.0,
+    allocator: PathAllocator | None = None,
+) -> GenerationResult:
+    """Run a single batch slot on the event loop, converting any failure into a failed result."""
+    allocator = allocator if allocator is not None else PathAllocator()
+    loop = asyncio.get_running_loop()
+    timer = StageTimer()
+    timer.add(INPUT_LOAD, input_load)
+
+    try:
+        # Hashing and cache file I/O are blocking, so they run in the executor
+        cache_key = ""
+        with timer.stage(REQUEST_BUILD):
+            request = _build_request(config, input_images)
+            if cache is not None:
+                cache_key = await loop.run_in_executor(None, cache.key_for, request, index)
+        if cache is not None:
+            with timer.stage(WRITE):
+                hit = await loop.run_in_executor(
+                    None,
+                    _serve_from_cache,
+                    index,
+                    output_path,
+                    cache_key,
+                    config,
+                    image_service,
+                    cache,
+                    allocator,
                 )
-            else:
-                # Record API failure
-                results.append(
-                    GenerationResult(
-                        index=i,
-                        output_path=output_path,
-                        success=False,
-                        error_message=response.error_message,
+            if hit is not None:
+                return _timed(hit, timer)
+
+        async with semaphore:
+            response = await gemini_service.generate_image(request)
+        timer.timings.update(response.timings)
+
+        if not response.success:
+            return GenerationResult(
+                index=index,
+                output_path=output_path,
+                success=False,
+                error_message=response.error_message,
+                attempts=response.attempts,
+                retry_wait=response.retry_wait,
+                timings=timer.timings,
+                duration=timer.elapsed,
+            )
+
+        # Path reservation and the file write block, so both run off the event loop
+        with timer.stage(WRITE):
+            output_mime_type = image_service.output_mime_type(response.mime_type)
+            output_path = await asyncio.to_thread(
+                _final_output_path,
+                output_path,
+                output_mime_type,
+                config.output_path is not None,
+                allocator,
+            )
+            await loop.run_in_executor(
+                None, image_service.save_image, response.image_data, output_path, response.mime_type
+            )
+
+            if cache is not None:
+                await loop.run_in_executor(None, _store_in_cache, cache, cache_key, response)
+
+        return GenerationResult(
+            index=index,
+            output_path=output_path,
+            success=True,
+            error_message=None,
+            attempts=response.attempts,
+            retry_wait=response.retry_wait,
+            ttfb=response.ttfb,
+            time_to_image=response.time_to_image,
+            timings=timer.timings,
+            duration=timer.elapsed,
+        )
+
+    except Exception as e:
+        return GenerationResult(
+            index=index,
+            output_path=output_path,
+            success=False,
+            error_message=str(e),
+            attempts=e.attempts if isinstance(e, APIError) else 1,
+            retry_wait=e.retry_wait if isinstance(e, APIError) else 0.0,
+            timings=timer.timings,
+            duration=timer.elapsed,
+        )
+
+
+async def generate_batch_async(
+    config: GenerationConfig,
+    gemini_service: AsyncGeminiService,
+    image_service: ImageService,
+    concurrency: int | None = None,
+    cache: ResponseCache | None = None,
+) -> list[GenerationResult]:
+    """Generate batch of images on the running event loop.
+
+    All slots are scheduled at once; a semaphore bounds how many API requests
+    are in flight, so hundreds of requests can share one loop without a thread each.
+
+    Args:
+        config: Generation configuration
+        gemini_service: Async service for API calls
+        image_service: Service for file I/O
+        concurrency: Maximum requests in flight at once (defaults to config.concurrency)
+        cache: Optional response cache consulted before each API call
+
+    Returns:
+        List of GenerationResult for each attempt (both success and failure), in index order
+    """
+    max_in_flight = concurrency if concurrency is not None else config.concurrency
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+    loop = asyncio.get_running_loop()
+
+    # Load and downsample input images once per batch (if any); every slot waits on it
+    timer = StageTimer()
+    input_parts = await loop.run_in_executor(None, _prepare_inputs, config, image_service)
+    input_load = timer.elapsed
+
+    allocator = PathAllocator()
+    try:
+        # Reserving every slot's path touches the filesystem once per slot
+        output_paths = await asyncio.to_thread(resolve_batch_output_paths, config, allocator)
+        results = list(
+            await asyncio.gather(
+                *(
+                    _generate_one_async(
+                        i,
+                        output_paths[i],
+                        config,
+                        input_parts,
+                        gemini_service,
+                        image_service,
+                        semaphore,
+                        cache,
+                        input_load,
+                        allocator,
                     )
+                    for i in range(config.batch_count)
                 )
+            )
+        )
+    finally:
+        allocator.close()
+        await loop.run_in_executor(None, image_service.flush)
+    return results
 
-        except Exception as e:
-            # Record exception
-            results.append(
-                GenerationResult(
-                    index=i,
-                    output_path=output_path,
-                    success=False,
-                    error_message=str(e),
-                )
+
+def _row_output_path(
+    row: PromptRow, output_dir: Path, mime_type: str, image_service: ImageService
+) -> Path:
+    """Pick the path for a prompt row's image: its own output, else ``<key><ext>``.
+
+    With an output format set, its extension replaces the one the path would have.
+    """
+    extension = extension_for_mime_type(image_service.output_mime_type(mime_type))
+    if row.output_path is None:
+        return output_dir / f"{row.key}{extension}"
+    if image_service.encode_options is not None:
+        return row.output_path.with_suffix(extension)
+    return row.output_path
+
+
+def _generate_row(
+    index: int,
+    row: PromptRow,
+    output_path: Path,
+    input_images: list[Any],
+    gemini_service: GeminiService,
+    image_service: ImageService,
+    timer: StageTimer,
+    allocator: PathAllocator,
+) -> GenerationResult:
+    """Generate one prompt row's image, converting any failure into a failed result."""
+    try:
+        with timer.stage(REQUEST_BUILD):
+            request = ImageGenerationRequest(
+                prompt=row.prompt,
+                input_images=input_images,
+                aspect_ratio=row.aspect_ratio,
+                resolution=row.resolution,
             )
-            # Continue with next iteration (don't abort batch)
+        response = gemini_service.generate_image(request)
+        timer.timings.update(response.timings)
 
-    return results
+        if not response.success:
+            return GenerationResult(
+                index=index,
+                key=row.key,
+                output_path=output_path,
+                success=False,
+                error_message=response.error_message,
+                attempts=response.attempts,
+                retry_wait=response.retry_wait,
+                timings=timer.timings,
+                duration=timer.elapsed,
+            )
+
+        with timer.stage(WRITE):
+            output_mime_type = image_service.output_mime_type(response.mime_type)
+            output_path = _final_output_path(
+                output_path, output_mime_type, row.output_path is not None, allocator
+            )
+            image_service.save_image(response.image_data, output_path, response.mime_type)
+
+        return GenerationResult(
+            index=index,
+            key=row.key,
+            output_path=output_path,
+            success=True,
+            attempts=response.attempts,
+            retry_wait=response.retry_wait,
+            ttfb=response.ttfb,
+            time_to_image=response.time_to_image,
+            timings=timer.timings,
+            duration=timer.elapsed,
+        )
+
+    except Exception as e:
+        return GenerationResult(
+            index=index,
+            key=row.key,
+            output_path=output_path,
+            success=False,
+            error_message=str(e),
+            attempts=e.attempts if isinstance(e, APIError) else 1,
+            retry_wait=e.retry_wait if isinstance(e, APIError) else 0.0,
+            timings=timer.timings,
+            duration=timer.elapsed,
+        )
+
+
+def iter_prompt_row_results(
+    rows: Iterable[PromptRow],
+    gemini_service: GeminiService,
+    image_service: ImageService,
+    output_dir: Path,
+    concurrency: int = 1,
+    input_max_edge: int = 2048,
+    input_quality: int = 90,
+    executor: Executor | None = None,
+) -> Iterator[GenerationResult]:
+    """Generate one image per prompt row inline, yielding results as rows complete.
+
+    Rows are read lazily and run through one shared worker pool; at most twice
+    ``concurrency`` rows are held at once, so a prompts file of any length streams
+    through in bounded memory. Each row's image is written by its worker before its
+    result is yielded, and the image service is flushed once every row is done.
+    Reference images are prepared once per distinct path, however many rows use them.
+    Output paths are claimed as rows are read, so an existing file or another row's
+    image is never overwritten: the later one gets a ``_N`` suffix.
+
+    Args:
+        rows: Prompt rows (list or iterator, e.g. from iter_prompt_rows)
+        gemini_service: Service for API calls
+        image_service: Service for file I/O
+        output_dir: Directory for rows without their own output path
+        concurrency: Maximum requests in flight at once
+        input_max_edge: Downsample reference images above this edge (0 disables)
+        input_quality: JPEG quality for downsampled reference images
+        executor: Worker pool to run rows on, at most ``concurrency`` at a time
+            (default: a pool of this run's own)
+
+    Yields:
+        One GenerationResult per row, in completion order (``index`` is the row's
+        position)
+    """
+    prepared: dict[Path, Any] = {}
+
+    def inputs_for(row: PromptRow) -> list[Any] | FileSystemError:
+        for path in row.input_images:
+            if path not in prepared:
+                try:
+                    [prepared[path]] = image_service.prepare_input_images(
+                        [path], max_edge=input_max_edge, quality=input_quality
+                    )
+                except FileSystemError as e:
+                    prepared[path] = e
+            if isinstance(prepared[path], FileSystemError):
+                return prepared[path]
+        return [prepared[path] for path in row.input_images]
+
+    allocator = PathAllocator()
+
+    def run_row(
+        index: int,
+        row: PromptRow,
+        output_path: Path,
+        inputs: list[Any] | FileSystemError,
+        input_load: float,
+    ) -> GenerationResult:
+        timer = StageTimer()
+        timer.add(INPUT_LOAD, input_load)
+        if isinstance(inputs, FileSystemError):
+            return GenerationResult(
+                index=index,
+                key=row.key,
+                output_path=output_path,
+                success=False,
+                error_message=str(inputs),
+                timings=timer.timings,
+                duration=timer.elapsed,
+            )
+        return _generate_row(
+            index, row, output_path, inputs, gemini_service, image_service, timer, allocator
+        )
+
+    def finish(result: GenerationResult) -> GenerationResult:
+        allocator.release(result.output_path)
+        return result
+
+    workers = max(concurrency, 1)
+    pending: set[Future[GenerationResult]] = set()
+    pool = executor if executor is not None else ThreadPoolExecutor(max_workers=workers)
+    # A shared pool gets only this run's share; an own pool also queues a row per worker
+    window = workers if executor is not None else workers * 2
+
+    try:
+        for index, row in enumerate(rows):
+            # Keep the pool fed without reading the whole file ahead of it
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (finish(future.result()) for future in done)
+            # Claimed in row order, so a duplicate output renames the later row
+            output_path = allocator.allocate(
+                _row_output_path(row, output_dir, "image/png", image_service)
+            )
+            # Inputs load here, once per distinct path; the row that first needs one pays
+            load_timer = StageTimer()
+            inputs = inputs_for(row)
+            pending.add(pool.submit(run_row, index, row, output_path, inputs, load_timer.elapsed))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (finish(future.result()) for future in done)
+    finally:
+        # Even when abandoned early: images still being written land before the flush
+        if executor is None:
+            pool.shutdown()
+        else:
+            wait(pending)
+        allocator.close()
+        image_service.flush()
+
+
+def generate_prompt_rows(
+    rows: list[PromptRow],
+    gemini_service: GeminiService,
+    image_service: ImageService,
+    output_dir: Path,
+    concurrency: int = 1,
+    input_max_edge: int = 2048,
+    input_quality: int = 90,
+) -> list[GenerationResult]:
+    """Generate one image per prompt row inline and collect the results.
+
+    Args:
+        rows: Prompt rows
+        gemini_service: Service for API calls
+        image_service: Service for file I/O
+        output_dir: Directory for rows without their own output path
+        concurrency: Maximum requests in flight at once
+        input_max_edge: Downsample reference images above this edge (0 disables)
+        input_quality: JPEG quality for downsampled reference images
+
+    Returns:
+        One GenerationResult per row, in row order
+    """
+    results = iter_prompt_row_results(
+        rows, gemini_service, image_service, output_dir, concurrency, input_max_edge, input_quality
+    )
+    return sorted(results, key=lambda r: r.index)
@@ -0,0 +1,254 @@
+"""Asyncio watcher that tracks many Batch API jobs from one event loop."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+from google.genai import errors as genai_errors
+
+from src.models.batch_shard import BatchShard
+from src.models.exceptions import (
+    AnyImgError,
+    APIError,
+    APIRateLimitError,
+    APIServerError,
+    APITimeoutError,
+)
+from src.models.job_outcome import JobOutcome
+from src.models.retry import RetryPolicy
+from src.services.batch_api_service import (
+    SUBMIT_FAILED,
+    BatchAPIError,
+    BatchAPIService,
+    job_age,
+)
+from src.services.retry_service import Retrier
+
+# Final state reported for a job whose state could not be read
+UNKNOWN_STATE = "JOB_STATE_UNSPECIFIED"
+
+
+def _map_poll_error(e: Exception) -> Exception:
+    """Classify a status-poll failure so the retrier can tell transient errors apart."""
+    if isinstance(e, (TimeoutError, httpx.TimeoutException)):
+        return APITimeoutError()
+    if isinstance(e, genai_errors.APIError):
+        if e.code == 429:
+            return APIRateLimitError()
+        if e.code == 408:
+            return APITimeoutError()
+        if e.code >= 500:
+            return APIServerError(e.code, e.message or str(e))
+    return e
+
+
+class BatchJobWatcher:
+    """Polls batch jobs concurrently and fetches each job's results as soon as it completes.
+
+    Every job gets its own polling coroutine that backs off according to the service's
+    PollPolicy, so dozens of jobs cost one event loop rather than one process each.
+    Downloads run in worker threads, bounded by max_concurrent_fetches. A job whose
+    polling or fetching fails ends with an outcome carrying the error, without
+    disturbing the jobs watched alongside it.
+    """
+
+    def __init__(
+        self,
+        batch_api: BatchAPIService,
+        max_concurrent_fetches: int = 4,
+        retry_policy: RetryPolicy | None = None,
+    ) -> None:
+        """Initialize batch job watcher.
+
+        Args:
+            batch_api: Batch API service providing the client, ledger and poll policy
+            max_concurrent_fetches: Jobs whose results may download at once
+            retry_policy: Retries for status polls hitting rate limits, timeouts or 5xx
+                errors (default: no retries). Its retry budget is shared by every job.
+        """
+        self.batch_api = batch_api
+        self.max_concurrent_fetches = max_concurrent_fetches
+        self.retrier = Retrier(retry_policy)
+
+    async def watch(
+        self,
+        job_names: list[str],
+        output_dir: Path,
+        request_counts: dict[str, int] | None = None,
+        on_complete: Callable[[JobOutcome], None] | None = None,
+        timeout: float | None = None,
+    ) -> list[JobOutcome]:
+        """Watch jobs until all of them complete, fetching results along the way.
+
+        Args:
+            job_names: Batch job names
+            output_dir: Directory to save images into
+            request_counts: Requests per job, used to size polling intervals
+            on_complete: Called with each job's outcome as soon as it is known
+            timeout: Maximum seconds to wait (None for no timeout)
+
+        Returns:
+            One JobOutcome per job, in job_names order; a job that could not be
+            watched to completion (including one still running at the timeout) has
+            an error_message
+        """
+        fetch_slots = asyncio.Semaphore(self.max_concurrent_fetches)
+        deadline = time.time() + timeout if timeout else None
+        counts = request_counts or {}
+
+        outcomes = await asyncio.gather(
+            *(
+                self._watch_one(
+                    job_name,
+                    output_dir,
+                    counts.get(job_name, 1),
+                    fetch_slots,
+                    deadline,
+                    on_complete,
+                )
+                for job_name in job_names
+            )
+        )
+        return list(outcomes)
+
+    async def watch_shards(
+        self,
+        shards: list[BatchShard],
+        output_dir: Path,
+        max_resubmits: int = 2,
+        on_complete: Callable[[JobOutcome], None] | None = None,
+        timeout: float | None = None,
+    ) -> list[JobOutcome]:
+        """Watch submitted shards, fetching each one's results as soon as it succeeds.
+
+        A shard whose job failed (or could not be created) is resubmitted on its own,
+        at most max_resubmits times; shards that succeeded are never rerun. Each shard's
+        job_name, state, submissions and error_message are updated in place.
+
+        Args:
+            shards: Shards already passed to BatchAPIService.submit_shards
+            output_dir: Directory to save images into
+            max_resubmits: Resubmissions allowed per shard
+            on_complete: Called with each shard's final outcome as soon as it is known
+            timeout: Maximum seconds to wait (None for no timeout)
+
+        Returns:
+            One JobOutcome per shard, in shards order
+        """
+        fetch_slots = asyncio.Semaphore(self.max_concurrent_fetches)
+        deadline = time.time() + timeout if timeout else None
+
+        outcomes = await asyncio.gather(
+            *(
+                self._watch_shard(
+                    shard, output_dir, max_resubmits, fetch_slots, deadline, on_complete
+                )
+                for shard in shards
+            )
+        )
+        return list(outcomes)
+
+    async def _watch_shard(
+        self,
+        shard: BatchShard,
+        output_dir: Path,
+        max_resubmits: int,
+        fetch_slots: asyncio.Semaphore,
+        deadline: float | None,
+        on_complete: Callable[[JobOutcome], None] | None,
+    ) -> JobOutcome:
+        """Watch one shard's job to the end, resubmitting it while it fails."""
+        batch_api = self.batch_api
+        while True:
+            if shard.job_name is None or shard.state == SUBMIT_FAILED:
+                outcome = JobOutcome(
+                    job_name=shard.job_name or shard.path.name,
+                    state=SUBMIT_FAILED,
+                    error_message=shard.error_message,
+                )
+            else:
+                outcome = await self._watch_one(
+                    shard.job_name, output_dir, shard.request_count, fetch_slots, deadline, None
+                )
+                shard.state = outcome.state
+                shard.error_message = outcome.error_message
+
+            if shard.state in batch_api.FAILED_STATES and shard.submissions <= max_resubmits:
+                await asyncio.to_thread(batch_api.submit_shards, [shard])
+                continue
+
+            if on_complete is not None:
+                on_complete(outcome)
+            return outcome
+
+    async def _watch_one(
+        self,
+        job_name: str,
+        output_dir: Path,
+        request_count: int,
+        fetch_slots: asyncio.Semaphore,
+        deadline: float | None,
+        on_complete: Callable[[JobOutcome], None] | None,
+    ) -> JobOutcome:
+        """Poll one job until it completes, then fetch its results if it succeeded."""
+        batch_api = self.batch_api
+        start_time = time.time()
+        last_state = None
+
+        try:
+            while True:
+                batch_job = await self._get_job(job_name)
+                state: str = batch_job.state.name
+                error = batch_job.error
+
+                if state != last_state:
+                    # Ledger writes are blocking SQLite calls
+                    await asyncio.to_thread(batch_api.record_state, job_name, state, error)
+                    last_state = state
+
+                if state in batch_api.COMPLETED_STATES:
+                    break
+
+                if deadline is not None and time.time() > deadline:
+                    raise BatchAPIError(f"Batch job {job_name} still {state} at the timeout")
+
+                age = job_age(batch_job, start_time)
+                await asyncio.sleep(batch_api.poll_policy.interval(age, request_count))
+        except Exception as e:
+            message = e.message if isinstance(e, AnyImgError) else str(e)
+            outcome = JobOutcome(
+                job_name=job_name, state=last_state or UNKNOWN_STATE, error_message=message
+            )
+        else:
+            outcome = JobOutcome(job_name=job_name, state=state)
+            if state == "JOB_STATE_SUCCEEDED":
+                async with fetch_slots:
+                    try:
+                        outcome.results = await asyncio.to_thread(
+                            batch_api.fetch_results, [job_name], output_dir
+                        )
+                    except APIError as e:
+                        outcome.error_message = e.message
+            elif error is not None:
+                outcome.error_message = str(error)
+
+        if on_complete is not None:
+            on_complete(outcome)
+        return outcome
+
+    async def _get_job(self, job_name: str) -> Any:
+        """Read a job's status, retrying transient failures under the retry policy."""
+
+        async def get_once() -> Any:
+            try:
+                return await self.batch_api.client.aio.batches.get(name=job_name)
+            except Exception as e:
+                mapped = _map_poll_error(e)
+                if mapped is e:
+                    raise
+                raise mapped from e
+
+        batch_job, _, _ = await self.retrier.call_async(get_once)
+        return batch_job
@@ -0,0 +1,205 @@
+"""Content-addressed on-disk cache of generated images with LRU eviction."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Any
+
+from src.models.config import GenerationConfig
+from src.models.exceptions import FileSystemError
+from src.models.request import ImageGenerationRequest
+from src.utils.path_utils import EXTENSION_MIME_TYPES, extension_for_mime_type
+
+
+class ResponseCache:
+    """Stores generated images under a hash of the normalized request.
+
+    Entries live at ``<cache_dir>/<key[:2]>/<key><ext>``. A hit refreshes the entry's
+    mtime, and eviction removes the least recently used entries once the total size
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, read: bool = True) -> None:
+        """Initialize response cache.
+
+        Args:
+            cache_dir: Directory holding cached images
+            max_bytes: Size cap for the whole cache
+            read: Whether lookups may return hits (False to refresh entries)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.read = read
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+        # id(image) -> (weak reference to image, digest); an entry is dropped when its
+        # image is freed, so the memo never keeps input images alive
+        self._image_digests: dict[int, tuple[weakref.ref[Any], str]] = {}
+
+    @classmethod
+    def from_config(cls, config: GenerationConfig) -> "ResponseCache | None":
+        """Build a cache from config, or None when caching is disabled."""
+        if config.cache_dir is None or config.no_cache:
+            return None
+        return cls(
+            cache_dir=config.cache_dir,
+            max_bytes=config.cache_max_mb * 1024 * 1024,
+            read=not config.refresh_cache,
+        )
+
+    def key_for(self, request: ImageGenerationRequest, variant: int = 0) -> str:
+        """Compute the cache key for a request.
+
+        Args:
+            request: Generation request
+            variant: Batch index, so ``--batch N`` maps to N distinct cached images
+
+        Returns:
+            Hex SHA-256 digest identifying the request
+        """
+        normalized = {
+            "model": request.model,
+            "prompt": request.prompt.strip(),
+            "aspect_ratio": request.aspect_ratio,
+            "resolution": request.resolution,
+            "input_images": [self._image_digest(img) for img in request.input_images],
+            "variant": variant,
+        }
+        encoded = json.dumps(normalized, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def lookup(self, key: str) -> Path | None:
+        """Find a cached image and mark it as recently used.
+
+        Args:
+            key: Cache key from key_for
+
+        Returns:
+            Path of the cached image, or None on a miss (always None when refreshing)
+        """
+        if not self.read:
+            return None
+
+        shard = self.cache_dir / key[:2]
+        for extension in EXTENSION_MIME_TYPES:
+            candidate = shard / f"{key}{extension}"
+            try:
+                os.utime(candidate)
+            except FileNotFoundError:
+                continue
+            return candidate
+
+        return None
+
+    def store(self, key: str, image_data: bytes, mime_type: str) -> Path:
+        """Add an image to the cache, evicting old entries if over the size cap.
+
+        Args:
+            key: Cache key from key_for
+            image_data: Encoded image bytes as returned by the API
+            mime_type: MIME type of image_data
+
+        Returns:
+            Path of the cached image
+
+        Raises:
+            FileSystemError: If the entry cannot be written
+        """
+        shard = self.cache_dir / key[:2]
+        entry = shard / f"{key}{extension_for_mime_type(mime_type)}"
+
+        try:
+            shard.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_name = tempfile.mkstemp(dir=shard, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(image_data)
+            # A refresh (or a concurrent store of the key) replaces an existing entry
+            try:
+                replaced_bytes = entry.stat().st_size
+            except FileNotFoundError:
+                replaced_bytes = 0
+            os.replace(tmp_name, entry)
+        except OSError as e:
+            raise FileSystemError(
+                f"Failed to write cache entry: {entry}",
+                remediation="Check permissions and free space in --cache-dir",
+            ) from e
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += len(image_data) - replaced_bytes
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+        return entry
+
+    def _image_digest(self, image: Any) -> str:
+        """Hash an input image's content, memoized per image object.
+
+        Prepared parts are hashed by their encoded bytes, PIL images by their pixels.
+        """
+        memo = self._image_digests.get(id(image))
+        if memo is not None and memo[0]() is image:
+            return memo[1]
+
+        digest = hashlib.sha256()
+        inline_data = getattr(image, "inline_data", None)
+        if inline_data is not None:
+            digest.update(f"{inline_data.mime_type}:".encode())
+            digest.update(inline_data.data)
+        else:
+            digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+            digest.update(image.tobytes())
+        hex_digest = digest.hexdigest()
+
+        key = id(image)
+        digests = self._image_digests
+        try:
+            ref = weakref.ref(image, lambda _: digests.pop(key, None))
+        except TypeError:
+            return hex_digest  # Not weakly referenceable; hash it again next time
+        digests[key] = (ref, hex_digest)
+        return hex_digest
+
+    def _scan(self) -> list[tuple[float, int, str]]:
+        """List (mtime, size, path) for every cache entry."""
+        entries: list[tuple[float, int, str]] = []
+        if not self.cache_dir.exists():
+            return entries
+
+        with os.scandir(self.cache_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as files:
+                    for f in files:
+                        if f.name.startswith(".tmp-") or not f.is_file():
+                            continue
+                        stat = f.stat()
+                        entries.append((stat.st_mtime, stat.st_size, f.path))
+
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass  # Evicted concurrently by another process
+            total -= size
+
+        self._total_bytes = total
@@ -0,0 +1,153 @@
+"""Process-wide Gemini API client with a tuned, pre-warmable connection pool."""
+
+import os
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import certifi
+import httpx
+from google import genai
+from google.genai import types
+
+from src.models.client_options import ClientOptions
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/"
+
+
+class ClientFactory:
+    """Builds one genai.Client on first use and hands the same instance to every caller.
+
+    The client's sync requests go through an httpx connection pool owned by the
+    factory, sized and kept alive per ClientOptions, which ``prewarm`` can fill with
+    open connections before a run starts. The SDK's asyncio client gets the same
+    pool limits.
+    """
+
+    def __init__(self, options: ClientOptions | None = None) -> None:
+        """Initialize client factory.
+
+        Args:
+            options: Connection pool options (defaults to ClientOptions())
+        """
+        self.options = options if options is not None else ClientOptions()
+        self._client: genai.Client | None = None
+        self._http_client: httpx.Client | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> genai.Client:
+        """Return the shared client, creating it on first call.
+
+        Returns:
+            The factory's genai.Client
+        """
+        with self._lock:
+            if self._client is None:
+                self._client = self._build()
+            return self._client
+
+    @property
+    def http_client(self) -> httpx.Client | None:
+        """The pooled httpx client behind sync requests (None until the client is built)."""
+        return self._http_client
+
+    def prewarm(self, connections: int | None = None) -> int:
+        """Open pooled connections in parallel before the first real request.
+
+        Each connection is opened by a concurrent HEAD request to the API endpoint, so
+        its TCP and TLS handshakes are done before generation starts and the first wave
+        of requests finds warm sockets. Failures are ignored: an unwarmed connection is
+        simply opened on first use instead.
+
+        Args:
+            connections: Connections to open (defaults to the pool size, and is capped
+                by it)
+
+        Returns:
+            Number of connections that were opened successfully
+        """
+        self.get()
+        http_client = self._http_client
+        if http_client is None:
+            return 0  # Closed meanwhile
+
+        count = min(connections or self.options.pool_size, self.options.pool_size)
+        url = self.options.base_url or DEFAULT_BASE_URL
+        # Every request must be in flight at once, or later ones reuse earlier sockets
+        barrier = threading.Barrier(count)
+
+        def warm(_: int) -> bool:
+            try:
+                barrier.wait(timeout=10)
+                http_client.head(url, timeout=10)
+                return True
+            except (httpx.HTTPError, threading.BrokenBarrierError):
+                return False
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return sum(executor.map(warm, range(count)))
+
+    def close(self) -> None:
+        """Close the factory's pooled connections."""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._client = None
+            self._http_client = None
+
+    def _build(self) -> genai.Client:
+        limits = httpx.Limits(
+            max_connections=self.options.pool_size,
+            max_keepalive_connections=self.options.pool_size,
+            keepalive_expiry=self.options.keepalive_expiry,
+        )
+        # Same trust store the SDK builds for its own clients
+        verify = ssl.create_default_context(
+            cafile=os.environ.get("SSL_CERT_FILE", certifi.where()),
+            capath=os.environ.get("SSL_CERT_DIR"),
+        )
+        self._http_client = httpx.Client(limits=limits, verify=verify, follow_redirects=True)
+
+        http_options = types.HttpOptions(
+            httpx_client=self._http_client,
+            async_client_args={"limits": limits},
+        )
+        if self.options.base_url:
+            http_options.base_url = self.options.base_url
+        return genai.Client(http_options=http_options)
+
+
+_factory = ClientFactory()
+_factory_lock = threading.Lock()
+
+
+def shared_client() -> genai.Client:
+    """Return the process-wide Gemini client.
+
+    Returns:
+        The genai.Client shared by every service that was not given its own
+    """
+    with _factory_lock:
+        factory = _factory
+    return factory.get()
+
+
+def configure_client(options: ClientOptions) -> ClientFactory:
+    """Replace the process-wide client factory, closing the previous one's connections.
+
+    Services created afterwards share a client built with the new options. Call this
+    before creating services: ones created earlier hold the previous client, whose
+    sync connection pool is closed.
+
+    Args:
+        options: Connection pool options
+
+    Returns:
+        The new factory (e.g. to prewarm it)
+    """
+    global _factory
+    with _factory_lock:
+        previous, _factory = _factory, ClientFactory(options)
+        factory = _factory
+    previous.close()
+    return factory
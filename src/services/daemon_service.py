@@ -0,0 +1,335 @@
+"""Long-running generation daemon behind ``anyimg serve``."""
+
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator, cast
+
+from src.models.exceptions import AnyImgError, ConfigurationError
+from src.models.prompt_row import PromptRow
+from src.models.result import GenerationResult
+from src.models.retry import RetryPolicy
+from src.models.server_job import ServerJob
+from src.services.batch_service import iter_batch_results, iter_prompt_row_results
+from src.services.cache_service import ResponseCache
+from src.services.encoder_service import ImageEncoder
+from src.services.gemini_service import GeminiService
+from src.services.image_service import ImageService
+from src.services.quota_service import QuotaLimiter
+from src.services.remote_service import token_path
+from src.utils.prompts_file import iter_prompt_rows
+
+
+def error_payload(e: Exception) -> dict[str, Any]:
+    """Describe a job's error for the client, with the exit code the CLI would return.
+
+    Args:
+        e: Exception raised while running a job
+
+    Returns:
+        JSON-serializable error description
+    """
+    if isinstance(e, AnyImgError):
+        return {"message": e.message, "remediation": e.remediation, "exit_code": e.exit_code}
+    # Pydantic validation errors are ValueErrors, which the CLI reports with exit code 2
+    exit_code = 2 if isinstance(e, ValueError) else 1
+    return {"message": str(e), "remediation": "", "exit_code": exit_code}
+
+
+class _JobHandler(BaseHTTPRequestHandler):
+    """Accepts ``POST /jobs`` and streams one JSON line per result back."""
+
+    @property
+    def daemon(self) -> "GenerationDaemon":
+        return cast(_DaemonHTTPServer, self.server).daemon
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            error = ConfigurationError(
+                "Missing or invalid anyimg server token",
+                remediation="Run the client as the user who started anyimg serve",
+            )
+            self._send_events(401, [{"error": error_payload(error)}])
+            return
+        if self.path != "/jobs":
+            self._send_events(404, [{"error": error_payload(ValueError("Unknown path"))}])
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            job = ServerJob.model_validate_json(self.rfile.read(length))
+        except ValueError as e:
+            self._send_events(400, [{"error": error_payload(e)}])
+            return
+
+        self._send_events(200, self._stream(job))
+
+    def _stream(self, job: ServerJob) -> Iterator[dict[str, Any]]:
+        try:
+            for result in self.daemon.run_job(job):
+                yield {"result": result.model_dump(mode="json")}
+        except Exception as e:
+            yield {"error": error_payload(e)}
+            return
+        yield {"done": True}
+
+    def _send_events(self, status: int, events: Iterator[dict[str, Any]] | list[Any]) -> None:
+        # HTTP/1.0 without a length: the stream ends when the connection closes
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for event in events:
+                self.wfile.write(json.dumps(event).encode() + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away; images already in progress are still written
+
+    def _authorized(self) -> bool:
+        token = self.daemon.token
+        if token is None:
+            return True  # Unix socket: only its owner can connect
+        received = self.headers.get("Authorization", "")
+        return hmac.compare_digest(received.encode(), f"Bearer {token}".encode())
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return "local" if self.daemon.socket_path is not None else self.client_address[0]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Clients report their own results
+
+
+class _DaemonHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server that hands every request to its daemon."""
+
+    daemon: "GenerationDaemon"
+
+
+class _UnixDaemonHTTPServer(_DaemonHTTPServer):
+    """Threaded HTTP server on a Unix domain socket."""
+
+    address_family = socket.AF_UNIX
+
+    def __init__(self, socket_path: Path, handler: type[BaseHTTPRequestHandler]) -> None:
+        # The stubs only allow a (host, port) address; AF_UNIX servers take a path
+        address: Any = str(socket_path)
+        socketserver.TCPServer.__init__(self, address, handler)
+
+    def server_bind(self) -> None:
+        # HTTPServer.server_bind expects a (host, port) address
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+class GenerationDaemon:
+    """Runs CLI generation jobs in one warm, long-lived process.
+
+    Every job shares the process-wide API client and its open connections, one thread
+    pool for API requests and one encoder process pool, so a job sent by ``anyimg
+    --server`` skips interpreter start, SDK import, client construction and TLS
+    handshakes, and pays only for its API calls. Jobs arrive as ``POST /jobs`` on a
+    Unix socket (only the owner may connect) or a port on 127.0.0.1, and each result
+    is streamed back as a JSON line as soon as its image is written. On a port, any
+    local user could connect, so jobs must carry a random per-daemon token, written
+    to a file only the owner can read (see ``token_path``).
+    """
+
+    def __init__(
+        self,
+        socket_path: Path | None = None,
+        port: int | None = None,
+        concurrency: int = 8,
+        api_key: str | None = None,
+    ) -> None:
+        """Initialize daemon and bind its listening socket.
+
+        Args:
+            socket_path: Unix socket to listen on
+            port: TCP port on 127.0.0.1 to listen on instead (0 for any free port)
+            concurrency: Worker threads shared by every job; caps the API requests in
+                flight across all jobs
+            api_key: Gemini API key jobs run with (default: GEMINI_API_KEY)
+
+        Raises:
+            ConfigurationError: If the socket is in use or cannot be bound, or the token
+                file cannot be written
+        """
+        self.api_key = api_key if api_key is not None else os.getenv("GEMINI_API_KEY", "")
+        self.socket_path = socket_path if port is None else None
+        self.token: str | None = None
+        self.token_file: Path | None = None
+
+        try:
+            if self.socket_path is not None:
+                self._remove_stale_socket(self.socket_path)
+                self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+                # Created owner-only: no moment where others could connect
+                umask = os.umask(0o077)
+                try:
+                    self._server: _DaemonHTTPServer = _UnixDaemonHTTPServer(
+                        self.socket_path, _JobHandler
+                    )
+                finally:
+                    os.umask(umask)
+            else:
+                self._server = _DaemonHTTPServer(("127.0.0.1", port or 0), _JobHandler)
+        except OSError as e:
+            where = self.socket_path or f"port {port}"
+            raise ConfigurationError(
+                f"Cannot listen on {where}: {e.strerror}",
+                remediation="Choose another --socket or --port",
+            ) from e
+        self._server.daemon = self
+
+        if self.socket_path is None:
+            self.token = secrets.token_urlsafe(32)
+            self.token_file = token_path(self._server.server_address[1])
+            try:
+                self._write_token(self.token_file, self.token)
+            except OSError as e:
+                self._server.server_close()
+                raise ConfigurationError(
+                    f"Cannot write server token to {self.token_file}: {e.strerror}",
+                    remediation="Check permissions of the directory",
+                ) from e
+
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.encoder = ImageEncoder()
+
+    @property
+    def address(self) -> str:
+        """Address clients pass to --server."""
+        if self.socket_path is not None:
+            return str(self.socket_path)
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def serve_forever(self) -> None:
+        """Accept jobs until shutdown() is called or the thread is interrupted."""
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread."""
+        self._server.shutdown()
+
+    def close(self) -> None:
+        """Close the listening socket and wait for running jobs' workers to finish."""
+        self._server.server_close()
+        if self.socket_path is not None:
+            self.socket_path.unlink(missing_ok=True)
+        if self.token_file is not None:
+            self.token_file.unlink(missing_ok=True)
+        self.executor.shutdown()
+        self.encoder.close()
+
+    def run_job(self, job: ServerJob) -> Iterator[GenerationResult]:
+        """Run one job on the shared pools, yielding results as images are written.
+
+        Args:
+            job: Job sent by a client
+
+        Yields:
+            One GenerationResult per image, in completion order
+
+        Raises:
+            ConfigurationError: If the job is a Batch API run, or is misconfigured
+            ValidationError: If an input image or the prompts file is invalid
+            ValueError: If an option is invalid
+        """
+        config = job.to_config(self.api_key)
+        if config.output_path and str(config.output_path).endswith(".jsonl"):
+            raise ConfigurationError(
+                "anyimg serve runs inline generation only",
+                remediation="Run --batch-file jobs without --server",
+            )
+
+        image_service = ImageService.from_config(config, encoder=self.encoder)
+
+        if config.prompts_file is not None:
+            prompts_file = config.prompts_file
+
+            def read_rows() -> Iterator[PromptRow]:
+                return iter_prompt_rows(
+                    prompts_file,
+                    aspect_ratio=config.aspect_ratio,
+                    resolution=config.resolution,
+                    base_dir=job.working_dir,
+                )
+
+            # Validate every row before any request, then stream rows as they run
+            row_count = sum(1 for _ in read_rows())
+            budget = config.retry_budget
+            if budget is None:
+                budget = max(config.max_retries, row_count)
+            gemini_service = GeminiService(
+                quota_limiter=QuotaLimiter.from_config(config),
+                retry_policy=RetryPolicy(max_retries=config.max_retries, retry_budget=budget),
+                stream=config.stream,
+            )
+            yield from iter_prompt_row_results(
+                read_rows(),
+                gemini_service,
+                image_service,
+                config.output_path or job.working_dir,
+                concurrency=config.concurrency,
+                input_max_edge=config.input_max_edge,
+                input_quality=config.input_quality,
+                executor=self.executor,
+            )
+            return
+
+        gemini_service = GeminiService(
+            quota_limiter=QuotaLimiter.from_config(config),
+            retry_policy=RetryPolicy.from_config(config),
+            stream=config.stream,
+        )
+        yield from iter_batch_results(
+            config,
+            gemini_service,
+            image_service,
+            cache=ResponseCache.from_config(config),
+            executor=self.executor,
+            directory=job.working_dir,
+        )
+
+    @staticmethod
+    def _write_token(path: Path, token: str) -> None:
+        """Write the token to a fresh file only the owner can read."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)  # Left by a daemon that died; may have other modes
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            os.write(fd, token.encode())
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _remove_stale_socket(path: Path) -> None:
+        """Remove a socket left by a daemon that died, refusing to evict a live one."""
+        if not path.exists():
+            return
+        if not stat.S_ISSOCK(path.stat().st_mode):
+            raise ConfigurationError(
+                f"{path} exists and is not a socket",
+                remediation="Choose another --socket",
+            )
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+        except OSError:
+            path.unlink()  # Nobody is listening
+            return
+        finally:
+            probe.close()
+        raise ConfigurationError(
+            f"Another anyimg server is already listening on {path}",
+            remediation="Use that server, or stop it first",
+        )
@@ -0,0 +1,209 @@
+"""Output image encoding in a pool of worker processes."""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Any
+
+from PIL import Image, features
+
+from src.models.encode_options import EncodeOptions
+from src.models.exceptions import ConfigurationError, FileSystemError
+
+# Pillow format name per output format
+_PIL_FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP", "avif": "AVIF"}
+# Quality used when none is given, per lossy format
+_DEFAULT_QUALITY = {"jpeg": 90, "webp": 85, "avif": 75}
+
+
+def _save_params(options: EncodeOptions) -> dict[str, Any]:
+    """Pillow save() arguments for the options' format."""
+    quality = options.quality or _DEFAULT_QUALITY.get(options.format)
+    effort = options.effort
+
+    if options.format == "png":
+        return {"compress_level": min(effort, 9)} if effort is not None else {}
+    if options.format == "jpeg":
+        return {"quality": quality, "optimize": True, "progressive": True}
+    if options.format == "webp":
+        params: dict[str, Any] = {"quality": quality}
+        if effort is not None:
+            params["method"] = min(effort, 6)
+        return params
+    # AVIF: speed 0 is the slowest, smallest encode
+    params = {"quality": quality}
+    if effort is not None:
+        params["speed"] = 10 - effort
+    return params
+
+
+def check_output_format(options: EncodeOptions) -> None:
+    """Fail early if this Pillow build cannot write the options' format.
+
+    Args:
+        options: Output format and encoder settings
+
+    Raises:
+        ConfigurationError: If this Pillow build cannot write the format
+    """
+    if options.format in ("webp", "avif") and not features.check(options.format):
+        raise ConfigurationError(
+            f"This Pillow build cannot write {options.format.upper()} images",
+            remediation="Upgrade Pillow (pip install -U pillow) or choose another --format",
+        )
+
+
+def _fit(size: tuple[int, int], edge: int) -> tuple[int, int]:
+    """Scale size down so its longest side is at most edge (never up)."""
+    width, height = size
+    scale = min(1.0, edge / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _encode(img: Image.Image, options: EncodeOptions) -> bytes:
+    """Encode a decoded image per options."""
+    pil_format = _PIL_FORMATS[options.format]
+    if pil_format == "JPEG":
+        img = img.convert("RGB")  # JPEG has no alpha channel
+    elif img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+    buffer = BytesIO()
+    img.save(buffer, pil_format, **_save_params(options))
+    return buffer.getvalue()
+
+
+def encode_image(image_data: bytes, options: EncodeOptions) -> bytes:
+    """Decode image bytes and re-encode them per options.
+
+    Args:
+        image_data: Encoded image bytes
+        options: Target format and encoder settings
+
+    Returns:
+        Image bytes in options.format
+    """
+    encoded, _ = render_image(image_data, options, reencode=True)
+    return encoded or image_data
+
+
+def render_image(
+    image_data: bytes,
+    options: EncodeOptions,
+    reencode: bool,
+    edges: tuple[int, ...] = (),
+) -> tuple[bytes | None, list[bytes]]:
+    """Decode image bytes once and produce the re-encoded image and its derivatives.
+
+    Runs in worker processes, so it only touches Pillow and its arguments. When the
+    full-size image isn't needed, a JPEG is decoded straight at a reduced scale (the
+    decoder's draft mode) just large enough for the biggest derivative. Each size is
+    then resized from that one decode, with a fast integer reduce before the final
+    Lanczos pass.
+
+    Args:
+        image_data: Encoded image bytes
+        options: Format and encoder settings for everything produced
+        reencode: Whether to return the full-size image re-encoded
+        edges: Longest-edge sizes of derivatives to produce (never upscaled)
+
+    Returns:
+        (re-encoded image or None if not requested, one encoded derivative per edge)
+    """
+    with Image.open(BytesIO(image_data)) as img:
+        if not reencode and edges:
+            img.draft("RGB", _fit(img.size, max(edges)))
+        img.load()
+
+        encoded = _encode(img, options) if reencode else None
+        derivatives: list[bytes] = []
+        for edge in edges:
+            size = _fit(img.size, edge)
+            if size == img.size:
+                derivatives.append(_encode(img, options))
+            else:
+                # Pillow's stubs leave part of resize's size parameter untyped
+                resized = img.resize(  # pyright: ignore[reportUnknownMemberType]
+                    size, Image.Resampling.LANCZOS, reducing_gap=2.0
+                )
+                derivatives.append(_encode(resized, options))
+        return encoded, derivatives
+
+
+class ImageEncoder:
+    """Re-encodes images and renders their derivatives in a process pool.
+
+    Encoding a 4K image to WebP or AVIF takes far longer than the write, and holds
+    the GIL if done in-process; here each image is handled by a worker process, so
+    API requests and writes on other threads carry on meanwhile. The pool starts on
+    first use. Workers are spawned rather than forked, since the parent runs HTTP
+    client threads.
+    """
+
+    def __init__(
+        self, options: EncodeOptions | None = None, max_workers: int | None = None
+    ) -> None:
+        """Initialize encoder.
+
+        Args:
+            options: Output format and encoder settings (None to only render
+                derivatives, in each image's own format)
+            max_workers: Encoding processes (default: CPU count)
+
+        Raises:
+            ConfigurationError: If this Pillow build cannot write the format
+        """
+        if options is not None:
+            check_output_format(options)
+
+        self.options = options
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        image_data: bytes,
+        options: EncodeOptions,
+        reencode: bool,
+        edges: tuple[int, ...] = (),
+    ) -> tuple[bytes | None, list[bytes]]:
+        """Run render_image in a worker process, blocking the calling thread only.
+
+        Args:
+            image_data: Encoded image bytes
+            options: Format and encoder settings for everything produced
+            reencode: Whether to return the full-size image re-encoded
+            edges: Longest-edge sizes of derivatives to produce
+
+        Returns:
+            (re-encoded image or None, one encoded derivative per edge)
+
+        Raises:
+            FileSystemError: If the image cannot be decoded or encoded
+        """
+        future = self._executor().submit(render_image, image_data, options, reencode, edges)
+        try:
+            return future.result()
+        except Exception as e:
+            raise FileSystemError(
+                f"Failed to encode image as {options.format.upper()}",
+                remediation="Check the --quality/--effort settings or choose another --format",
+            ) from e
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
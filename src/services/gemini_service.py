@@ -1,31 +1,238 @@
 """Gemini API service for image generation."""
 
-from typing import Any
+import re
+import time
+from typing import Any, cast
 
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
 from src.models.exceptions import (
+    AnyImgError,
     APIError,
     APIRateLimitError,
     APIResponseError,
+    APIServerError,
     APITimeoutError,
     ConfigurationError,
 )
+from src.models.metrics import API, EXTRACT
 from src.models.request import ImageGenerationRequest
 from src.models.response import ImageGenerationResponse
+from src.models.retry import RetryPolicy
+from src.services.client_service import shared_client
+from src.services.quota_service import QuotaLimiter
+from src.services.retry_service import Retrier
+
+
+def _build_contents(request: ImageGenerationRequest) -> Any:
+    """Prepare contents: prompt + optional input images."""
+    if request.input_images:
+        return [request.prompt] + request.input_images
+    return request.prompt
+
+
+def _build_generate_config(request: ImageGenerationRequest) -> types.GenerateContentConfig:
+    """Build generation config with image options."""
+    # Add image config if aspect_ratio or resolution is specified
+    if request.aspect_ratio or request.resolution:
+        return types.GenerateContentConfig(
+            response_modalities=["TEXT", "IMAGE"],
+            image_config=types.ImageConfig(
+                aspect_ratio=request.aspect_ratio,
+                image_size=request.resolution,
+            ),
+        )
+
+    return types.GenerateContentConfig(
+        response_modalities=["TEXT", "IMAGE"],
+    )
+
+
+def _as_dict(value: object) -> dict[str, Any]:
+    """Return value if it is a JSON object, else an empty one."""
+    return cast(dict[str, Any], value) if isinstance(value, dict) else {}
+
+
+def _retry_after(e: genai_errors.APIError) -> float | None:
+    """Read the server's retry hint from a Retry-After header or a RetryInfo detail.
+
+    Args:
+        e: Typed SDK error
+
+    Returns:
+        Seconds to wait, or None if the server gave no hint
+    """
+    # The SDK leaves these attributes loosely typed
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    if headers is not None:
+        value = headers.get("retry-after")
+        if value is not None:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass  # HTTP-date form is not used by the Gemini API
+
+    details = _as_dict(getattr(e, "details", None))
+    details = _as_dict(details.get("error", details))
+    entries = details.get("details")
+    for detail in cast(list[Any], entries) if isinstance(entries, list) else []:
+        delay = _as_dict(detail).get("retryDelay")
+        if isinstance(delay, str) and (match := re.fullmatch(r"([\d.]+)s", delay)):
+            return float(match.group(1))
+
+    return None
+
+
+def _map_exception(e: Exception, request: ImageGenerationRequest) -> AnyImgError:
+    """Map SDK exceptions to custom exceptions.
+
+    Typed SDK errors are classified by status code; untyped exceptions fall back
+    to matching their message.
+
+    Args:
+        e: Exception raised while calling the API
+        request: Request that was being processed
+
+    Returns:
+        Custom exception to raise in place of the original
+    """
+    if isinstance(e, (TimeoutError, httpx.TimeoutException)):
+        return APITimeoutError(timeout=request.timeout)
+    if isinstance(e, APIResponseError):
+        # Our own exception, raise as-is
+        return e
+
+    if isinstance(e, genai_errors.APIError):
+        if e.code in (401, 403):
+            return ConfigurationError(
+                message="Authentication failed",
+                remediation="Check your GEMINI_API_KEY environment variable",
+            )
+        elif e.code == 429:
+            return APIRateLimitError(retry_after=_retry_after(e))
+        elif e.code == 408:
+            return APITimeoutError(timeout=request.timeout)
+        elif e.code >= 500:
+            return APIServerError(e.code, e.message or str(e), retry_after=_retry_after(e))
+        else:
+            return APIError(
+                message=f"API request failed: {str(e)}",
+                remediation="Check your request parameters and retry",
+            )
+
+    error_msg = str(e).lower()
+
+    if "401" in error_msg or "unauthorized" in error_msg or "auth" in error_msg:
+        return ConfigurationError(
+            message="Authentication failed",
+            remediation="Check your GEMINI_API_KEY environment variable",
+        )
+    elif "429" in error_msg or "rate limit" in error_msg:
+        return APIRateLimitError()
+    elif "timeout" in error_msg:
+        return APITimeoutError(timeout=request.timeout)
+    else:
+        return APIError(
+            message=f"API request failed: {str(e)}",
+            remediation="Check your internet connection and retry",
+        )
+
+
+def _find_image_part(response: Any) -> tuple[bytes, str] | None:
+    """Return the first final image part of a response or stream chunk, if any.
+
+    Args:
+        response: Raw response (or streamed chunk) from Gemini API
+
+    Returns:
+        Tuple of (image bytes, MIME type), or None if the response holds no image
+
+    Raises:
+        APIResponseError: If the response structure is unexpected
+    """
+    try:
+        parts: list[types.Part] = response.parts or []
+        for part in parts:
+            if part.text is not None or part.thought is True:
+                # Text response or interim "thinking" image, ignore
+                continue
+
+            inline_data = part.inline_data
+            if inline_data is not None and inline_data.data:
+                return inline_data.data, inline_data.mime_type or "image/png"
+
+        return None
+
+    except (IndexError, AttributeError, TypeError) as e:
+        raise APIResponseError(
+            message="Invalid API response structure",
+            remediation="The API response format is unexpected",
+        ) from e
+
+
+def _extract_image_data(response: Any) -> tuple[bytes, str]:
+    """Extract image data from Gemini API response.
+
+    The encoded bytes are returned exactly as the API sent them; nothing is decoded.
+
+    Args:
+        response: Raw response from Gemini API
+
+    Returns:
+        Tuple of (image bytes, MIME type)
+
+    Raises:
+        APIResponseError: If no image data found in response
+    """
+    image = _find_image_part(response)
+    if image is None:
+        raise APIResponseError(
+            message="No image data in API response",
+            remediation="The API returned a response but no image was generated",
+        )
+    return image
+
+
+def _timings(started: float, received: float) -> dict[str, float]:
+    """Split one attempt into API round trip (until the image arrived) and extraction."""
+    return {API: received - started, EXTRACT: time.perf_counter() - received}
+
+
+def _no_image_in_stream() -> APIResponseError:
+    return APIResponseError(
+        message="No image data in API response stream",
+        remediation="The API returned a response but no image was generated",
+    )
 
 
 class GeminiService:
     """Service for generating images via Gemini API."""
 
-    def __init__(self, client: genai.Client | None = None) -> None:
+    def __init__(
+        self,
+        client: genai.Client | None = None,
+        quota_limiter: QuotaLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        stream: bool = False,
+    ) -> None:
         """Initialize Gemini service.
 
         Args:
-            client: Optional genai.Client instance for testing. If None, creates new client.
+            client: Optional genai.Client instance for testing. If None, uses the shared
+                process-wide client.
+            quota_limiter: Optional limiter consulted before every generate_content call
+            retry_policy: Optional retry policy for transient errors (default: no retries).
+                Its retry budget is shared by every request made through this service.
+            stream: Use generate_content_stream and return as soon as the image part
+                arrives, without waiting for trailing text
         """
-        self.client = client if client is not None else genai.Client()
+        self.client = client if client is not None else shared_client()
+        self.quota_limiter = quota_limiter
+        self.retrier = Retrier(retry_policy)
+        self.stream = stream
 
     def generate_image(self, request: ImageGenerationRequest) -> ImageGenerationResponse:
         """Generate image using Gemini API.
@@ -43,110 +250,192 @@ class GeminiService:
             APIResponseError: If response is invalid
             APIError: For other API failures
         """
-        try:
-            # Prepare contents: prompt + optional input images
-            if request.input_images:
-                contents = [request.prompt] + request.input_images
-            else:
-                contents = request.prompt
-
-            # Build generation config with image options
-            generate_config = types.GenerateContentConfig(
-                response_modalities=["TEXT", "IMAGE"],
-            )
+        (image_data, mime_type, ttfb, timings), attempts, retry_wait = self.retrier.call(
+            lambda: self._generate_once(request)
+        )
+
+        return ImageGenerationResponse(
+            image_data=image_data,
+            mime_type=mime_type,
+            success=True,
+            error_message=None,
+            attempts=attempts,
+            retry_wait=retry_wait,
+            ttfb=ttfb,
+            time_to_image=sum(timings.values()),
+            timings=timings,
+        )
 
-            # Add image config if aspect_ratio or resolution is specified
-            if request.aspect_ratio or request.resolution:
-                generate_config = types.GenerateContentConfig(
-                    response_modalities=["TEXT", "IMAGE"],
-                    image_config=types.ImageConfig(
-                        aspect_ratio=request.aspect_ratio,
-                        image_size=request.resolution,
-                    ),
-                )
+    def _generate_once(
+        self, request: ImageGenerationRequest
+    ) -> tuple[bytes, str, float | None, dict[str, float]]:
+        """Make a single API attempt; return image bytes, MIME type, TTFB and stage timings."""
+        if self.quota_limiter is not None:
+            self.quota_limiter.acquire(requests=1, images=1)
+
+        # Timed from after the quota wait, so latency reflects the API alone
+        started = time.perf_counter()
+
+        try:
+            if self.stream:
+                return self._stream_once(request, started)
 
             # Call Gemini API
             response = self.client.models.generate_content(
                 model=request.model,
-                contents=contents,  # type: ignore[arg-type]
-                config=generate_config,
+                contents=_build_contents(request),
+                config=_build_generate_config(request),
             )
+            received = time.perf_counter()
 
             # Extract image data from response
-            image_data = self._extract_image_data(response)
-
-            return ImageGenerationResponse(
-                image_data=image_data,
-                success=True,
-                error_message=None,
-            )
+            image_data, mime_type = _extract_image_data(response)
+            return image_data, mime_type, None, _timings(started, received)
 
-        except TimeoutError as e:
-            raise APITimeoutError(timeout=request.timeout) from e
-        except APIResponseError:
-            # Re-raise our custom exception as-is
-            raise
         except Exception as e:
-            # Map SDK exceptions to custom exceptions
-            error_msg = str(e).lower()
-
-            if "401" in error_msg or "unauthorized" in error_msg or "auth" in error_msg:
-                raise ConfigurationError(
-                    message="Authentication failed",
-                    remediation="Check your GEMINI_API_KEY environment variable",
-                ) from e
-            elif "429" in error_msg or "rate limit" in error_msg:
-                raise APIRateLimitError() from e
-            elif "timeout" in error_msg:
-                raise APITimeoutError(timeout=request.timeout) from e
-            else:
-                raise APIError(
-                    message=f"API request failed: {str(e)}",
-                    remediation="Check your internet connection and retry",
-                ) from e
-
-    def _extract_image_data(self, response: Any) -> bytes:
-        """Extract image data from Gemini API response.
+            mapped = _map_exception(e, request)
+            if mapped is e:
+                raise
+            raise mapped from e
+
+    def _stream_once(
+        self, request: ImageGenerationRequest, started: float
+    ) -> tuple[bytes, str, float | None, dict[str, float]]:
+        """Stream one response, stopping at the first image part."""
+        stream = self.client.models.generate_content_stream(
+            model=request.model,
+            contents=_build_contents(request),
+            config=_build_generate_config(request),
+        )
+        ttfb = None
+        try:
+            for chunk in stream:
+                received = time.perf_counter()
+                if ttfb is None:
+                    ttfb = received - started
+                image = _find_image_part(chunk)
+                if image is not None:
+                    return image[0], image[1], ttfb, _timings(started, received)
+        finally:
+            # Drop the connection's remaining chunks (trailing text) instead of reading them
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+        raise _no_image_in_stream()
+
+
+class AsyncGeminiService:
+    """Service for generating images via the Gemini API's asyncio client."""
+
+    def __init__(
+        self,
+        client: genai.Client | None = None,
+        quota_limiter: QuotaLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        stream: bool = False,
+    ) -> None:
+        """Initialize async Gemini service.
+
+        Args:
+            client: Optional genai.Client instance for testing. If None, uses the shared
+                process-wide client. Requests are issued through its ``client.aio``
+                interface.
+            quota_limiter: Optional limiter awaited before every generate_content call
+            retry_policy: Optional retry policy for transient errors (default: no retries).
+                Its retry budget is shared by every request made through this service.
+            stream: Use generate_content_stream and return as soon as the image part
+                arrives, without waiting for trailing text
+        """
+        self.client = client if client is not None else shared_client()
+        self.quota_limiter = quota_limiter
+        self.retrier = Retrier(retry_policy)
+        self.stream = stream
+
+    async def generate_image(self, request: ImageGenerationRequest) -> ImageGenerationResponse:
+        """Generate image using the async Gemini API client.
 
         Args:
-            response: Raw response from Gemini API
+            request: Image generation request configuration
 
         Returns:
-            Image data as bytes
+            ImageGenerationResponse with success/failure status
 
         Raises:
-            APIResponseError: If no image data found in response
+            APITimeoutError: If request times out
+            APIRateLimitError: If rate limit exceeded
+            ConfigurationError: If authentication fails
+            APIResponseError: If response is invalid
+            APIError: For other API failures
         """
+        (
+            (image_data, mime_type, ttfb, timings),
+            attempts,
+            retry_wait,
+        ) = await self.retrier.call_async(lambda: self._generate_once(request))
+
+        return ImageGenerationResponse(
+            image_data=image_data,
+            mime_type=mime_type,
+            success=True,
+            error_message=None,
+            attempts=attempts,
+            retry_wait=retry_wait,
+            ttfb=ttfb,
+            time_to_image=sum(timings.values()),
+            timings=timings,
+        )
+
+    async def _generate_once(
+        self, request: ImageGenerationRequest
+    ) -> tuple[bytes, str, float | None, dict[str, float]]:
+        """Make a single async API attempt; return image bytes, MIME type, TTFB and timings."""
+        if self.quota_limiter is not None:
+            await self.quota_limiter.acquire_async(requests=1, images=1)
+
+        started = time.perf_counter()
+
         try:
-            # Navigate response structure to find image data
-            for part in response.parts:
-                if part.text is not None:
-                    # Text response, ignore
-                    continue
-                elif (image := part.as_image()) is not None:
-                    # Convert PIL image to bytes
-                    from io import BytesIO
-
-                    img_bytes = BytesIO()
-
-                    # Handle Google GenAI Image wrapper vs direct PIL Image
-                    if hasattr(image, "_pil_image"):
-                        # Google GenAI Image wrapper - use underlying PIL image
-                        image._pil_image.save(img_bytes, "PNG")
-                    else:
-                        # Direct PIL Image object
-                        image.save(img_bytes, "PNG")
-
-                    return img_bytes.getvalue()
-
-            # No image data found
-            raise APIResponseError(
-                message="No image data in API response",
-                remediation="The API returned a response but no image was generated",
+            if self.stream:
+                return await self._stream_once(request, started)
+
+            response = await self.client.aio.models.generate_content(
+                model=request.model,
+                contents=_build_contents(request),
+                config=_build_generate_config(request),
             )
+            received = time.perf_counter()
+
+            image_data, mime_type = _extract_image_data(response)
+            return image_data, mime_type, None, _timings(started, received)
+
+        except Exception as e:
+            mapped = _map_exception(e, request)
+            if mapped is e:
+                raise
+            raise mapped from e
+
+    async def _stream_once(
+        self, request: ImageGenerationRequest, started: float
+    ) -> tuple[bytes, str, float | None, dict[str, float]]:
+        """Stream one response through the async client, stopping at the first image part."""
+        stream = await self.client.aio.models.generate_content_stream(
+            model=request.model,
+            contents=_build_contents(request),
+            config=_build_generate_config(request),
+        )
+        ttfb = None
+        try:
+            async for chunk in stream:
+                received = time.perf_counter()
+                if ttfb is None:
+                    ttfb = received - started
+                image = _find_image_part(chunk)
+                if image is not None:
+                    return image[0], image[1], ttfb, _timings(started, received)
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
 
-        except (IndexError, AttributeError) as e:
-            raise APIResponseError(
-                message="Invalid API response structure",
-                remediation="The API response format is unexpected",
-            ) from e
+        raise _no_image_in_stream()
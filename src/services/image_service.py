@@ -1,16 +1,115 @@
 """Image I/O service for loading and saving images."""
 
+import hashlib
+import os
+import tempfile
+from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from google.genai import types
 from PIL import Image
 from PIL.Image import Image as PILImage
 
+from src.models.encode_options import EncodeOptions
 from src.models.exceptions import DirectoryCreationError, FileSystemError
+from src.services.encoder_service import ImageEncoder, check_output_format
+from src.utils.atomic_write import DurableWriter
+from src.utils.path_utils import (
+    EXTENSION_MIME_TYPES,
+    OUTPUT_FORMATS,
+    derivative_path,
+    extension_for_mime_type,
+    mime_type_for_path,
+)
+
+if TYPE_CHECKING:
+    from src.models.config import GenerationConfig
+
+# Pillow format names for the MIME types we can write
+PIL_FORMATS = {
+    "image/png": "PNG",
+    "image/jpeg": "JPEG",
+    "image/webp": "WEBP",
+    "image/avif": "AVIF",
+}
+
+# MIME types mapped back to their --format names
+MIME_TYPE_FORMATS = {mime_type: name for name, mime_type in OUTPUT_FORMATS.items()}
 
 
 class ImageService:
     """Service for image file operations."""
 
+    def __init__(
+        self,
+        durability: str = "none",
+        durability_group: int = 64,
+        encode_options: EncodeOptions | None = None,
+        derivatives: list[int] | None = None,
+        encoder: ImageEncoder | None = None,
+    ) -> None:
+        """Initialize image service.
+
+        Args:
+            durability: How saved images are flushed to disk: "none", "file" (fsync
+                each image) or "group" (images staged and committed together)
+            durability_group: Images per commit in "group" mode
+            encode_options: Output format every saved image is re-encoded to in a
+                process pool (None to keep images as returned)
+            derivatives: Longest-edge sizes of smaller copies saved next to every
+                image, e.g. [256, 1024]
+            encoder: Shared encoder to use instead of starting one; close() leaves it
+                running
+
+        Raises:
+            ValueError: If durability is not a known mode
+            ConfigurationError: If this Pillow build cannot write the output format
+        """
+        self.writer = DurableWriter(durability, durability_group)
+        self.encode_options = encode_options
+        self.derivatives = tuple(sorted(set(derivatives or ()), reverse=True))
+        self._owns_encoder = encoder is None
+        if encoder is None and (encode_options or self.derivatives):
+            encoder = ImageEncoder(encode_options)
+        elif encoder is not None and encode_options is not None:
+            check_output_format(encode_options)
+        self.encoder = encoder
+
+    @classmethod
+    def from_config(
+        cls, config: "GenerationConfig", encoder: ImageEncoder | None = None
+    ) -> "ImageService":
+        """Create an image service with the config's durability settings.
+
+        Args:
+            config: Generation configuration
+            encoder: Shared encoder to use instead of starting one
+
+        Returns:
+            Image service
+        """
+        return cls(
+            durability=config.durability,
+            durability_group=config.durability_group,
+            encode_options=EncodeOptions.from_config(config),
+            derivatives=config.derivatives,
+            encoder=encoder,
+        )
+
+    def output_mime_type(self, mime_type: str) -> str:
+        """MIME type an image of mime_type is saved as (the output format, if one is set).
+
+        Args:
+            mime_type: MIME type the image was returned in
+
+        Returns:
+            MIME type to pick the output extension from
+        """
+        if self.encode_options is not None:
+            return self.encode_options.mime_type
+        return mime_type
+
     @staticmethod
     def load_input_images(paths: list[Path]) -> list[PILImage]:
         """Load input images from file paths.
@@ -28,6 +127,8 @@ class ImageService:
         for path in paths:
             try:
                 img = Image.open(path)
+                # Decode eagerly so the image can be shared safely across worker threads
+                img.load()
                 images.append(img)
             except Exception as e:
                 raise FileSystemError(
@@ -37,12 +138,147 @@ class ImageService:
         return images
 
     @staticmethod
-    def save_image(image_data: bytes, output_path: Path) -> None:
+    def prepare_input_images(
+        paths: list[Path],
+        max_edge: int | None = 2048,
+        quality: int = 90,
+        cache_dir: Path | None = None,
+    ) -> list[types.Part]:
+        """Load input images as upload-ready parts, downsampling oversized ones.
+
+        Images whose longest edge fits within max_edge are passed through byte-for-byte.
+        Larger images are resized and re-encoded (JPEG at quality, or PNG when they have
+        an alpha channel). The encoded parts are reused by every request in a batch, so
+        the SDK never re-encodes them per request.
+
+        Args:
+            paths: List of image file paths
+            max_edge: Longest allowed edge in pixels (None or 0 to upload originals)
+            quality: JPEG quality for re-encoded images
+            cache_dir: Optional directory caching re-encoded images across runs,
+                keyed by file content hash and settings
+
+        Returns:
+            List of inline image parts, in input order
+
+        Raises:
+            FileSystemError: If image cannot be loaded
+        """
+        parts: list[types.Part] = []
+        for path in paths:
+            try:
+                data, mime_type = ImageService._prepare_input_image(
+                    path.read_bytes(), path, max_edge, quality, cache_dir
+                )
+            except Exception as e:
+                raise FileSystemError(
+                    f"Failed to load image: {path}",
+                    remediation=f"Ensure {path} is a valid image file",
+                ) from e
+            parts.append(types.Part.from_bytes(data=data, mime_type=mime_type))
+        return parts
+
+    @staticmethod
+    def _prepare_input_image(
+        original: bytes,
+        path: Path,
+        max_edge: int | None,
+        quality: int,
+        cache_dir: Path | None,
+    ) -> tuple[bytes, str]:
+        """Return (bytes, MIME type) to upload for one input image."""
+        original_mime_type = mime_type_for_path(path) or "image/png"
+
+        key = hashlib.sha256(original).hexdigest() + f"-{max_edge}-{quality}"
+        cache_root = cache_dir / "inputs" if cache_dir is not None else None
+        if cache_root is not None:
+            for extension, mime_type in EXTENSION_MIME_TYPES.items():
+                cached = cache_root / f"{key}{extension}"
+                if cached.exists():
+                    # Mark as recently used for the response cache's LRU eviction
+                    os.utime(cached)
+                    return cached.read_bytes(), mime_type
+
+        with Image.open(BytesIO(original)) as img:
+            if not max_edge or max(img.size) <= max_edge:
+                return original, original_mime_type
+
+            has_alpha = img.mode in ("RGBA", "LA", "PA") or (
+                img.mode == "P" and "transparency" in img.info
+            )
+
+            # thumbnail() uses the JPEG decoder's draft mode to downscale while decoding
+            img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+            buffer = BytesIO()
+            if has_alpha:
+                img.save(buffer, "PNG")
+                mime_type = "image/png"
+            else:
+                img.convert("RGB").save(buffer, "JPEG", quality=quality, optimize=True)
+                mime_type = "image/jpeg"
+
+        data = buffer.getvalue()
+
+        if cache_root is not None:
+            # Best-effort: a failed cache write only costs a re-encode next run
+            try:
+                cache_root.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(dir=cache_root, prefix=".tmp-")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_name, cache_root / f"{key}{extension_for_mime_type(mime_type)}")
+            except OSError:
+                pass
+
+        return data, mime_type
+
+    @staticmethod
+    def transcode(image_data: bytes, mime_type: str) -> bytes:
+        """Re-encode image bytes into another format.
+
+        Args:
+            image_data: Encoded image bytes
+            mime_type: Target MIME type (see PIL_FORMATS)
+
+        Returns:
+            Image bytes encoded as mime_type
+
+        Raises:
+            FileSystemError: If the image cannot be decoded or encoded
+        """
+        try:
+            with Image.open(BytesIO(image_data)) as img:
+                target_format = PIL_FORMATS[mime_type]
+                # JPEG has no alpha channel
+                converted = img.convert("RGB") if target_format == "JPEG" else img
+                buffer = BytesIO()
+                converted.save(buffer, target_format)
+                return buffer.getvalue()
+        except Exception as e:
+            raise FileSystemError(
+                f"Failed to convert image to {mime_type}",
+                remediation="Use an output extension matching the generated format",
+            ) from e
+
+    def save_image(
+        self, image_data: bytes, output_path: Path, mime_type: str | None = None
+    ) -> None:
         """Save image data to file.
 
+        Bytes are written as-is. They are re-encoded (in the encoder's process pool)
+        when the output path has the output format's extension, and otherwise only
+        transcoded when mime_type is given and the output path's extension explicitly
+        names a different image format. Derivatives are rendered from the same single
+        decode, in the output's format, and saved as ``<stem>_<edge>px<ext>`` beside
+        it. Each file is written to a temporary name and renamed into place, so
+        readers never see a partial image, then flushed to disk per the service's
+        durability mode.
+
         Args:
-            image_data: Raw image bytes
+            image_data: Encoded image bytes
             output_path: Where to save the image
+            mime_type: MIME type of image_data, if known
 
         Raises:
             DirectoryCreationError: If output directory cannot be created
@@ -58,11 +294,93 @@ class ImageService:
                 remediation="Check directory permissions",
             ) from e
 
+        target_mime_type = mime_type_for_path(output_path)
+        saved_mime_type = target_mime_type or mime_type or "image/png"
+        reencode = self._needs_encode(mime_type, target_mime_type)
+        transcode = not reencode and mime_type is not None and saved_mime_type != mime_type
+        derived: list[bytes] = []
+
+        if self.encoder is not None and (reencode or self.derivatives):
+            # One decode in a worker serves the re-encode and every derivative
+            options = self.encode_options if reencode else None
+            if options is None:
+                options = EncodeOptions(format=MIME_TYPE_FORMATS[saved_mime_type])
+            encoded, derived = self.encoder.render(
+                image_data, options, reencode or transcode, self.derivatives
+            )
+            image_data = encoded or image_data
+        elif transcode:
+            image_data = ImageService.transcode(image_data, saved_mime_type)
+
+        files = [(output_path, image_data)]
+        files += [
+            (derivative_path(output_path, edge), data)
+            for edge, data in zip(self.derivatives, derived)
+        ]
+        for path, data in files:
+            try:
+                self.writer.write(path, data)
+            except Exception as e:
+                raise FileSystemError(
+                    f"Failed to save image: {path}",
+                    remediation="Check file permissions and disk space",
+                ) from e
+
+    def link_image(self, source: Path, output_path: Path) -> None:
+        """Save an image that is already on disk by hardlinking it (copying if needed).
+
+        The link replaces output_path atomically and is flushed per the durability
+        mode, like save_image; no re-encoding or derivatives are applied.
+
+        Args:
+            source: Existing image file, e.g. a response cache entry
+            output_path: Where to save the image
+
+        Raises:
+            DirectoryCreationError: If output directory cannot be created
+            FileSystemError: If image cannot be linked or copied
+        """
         try:
-            # Write image data
-            output_path.write_bytes(image_data)
+            if output_path.parent != Path("."):
+                output_path.parent.mkdir(parents=True, exist_ok=True)
         except Exception as e:
+            raise DirectoryCreationError(
+                f"Failed to create directory: {output_path.parent}",
+                remediation="Check directory permissions",
+            ) from e
+
+        try:
+            self.writer.link(source, output_path)
+        except OSError as e:
             raise FileSystemError(
-                f"Failed to save image: {output_path}",
+                f"Failed to copy cached image to {output_path}",
                 remediation="Check file permissions and disk space",
             ) from e
+
+    def _needs_encode(self, mime_type: str | None, target_mime_type: str | None) -> bool:
+        """Whether the encoder should re-encode an image bound for target_mime_type."""
+        options = self.encode_options
+        if options is None or target_mime_type != options.mime_type:
+            return False
+        # Same format: only re-encode to apply explicit settings
+        explicit = options.quality is not None or options.effort is not None
+        return mime_type != target_mime_type or explicit
+
+    def close(self) -> None:
+        """Stop the encoder's worker processes, if any and not shared."""
+        if self.encoder is not None and self._owns_encoder:
+            self.encoder.close()
+
+    def flush(self) -> None:
+        """Make every image saved so far durable and visible (only needed in "group" mode).
+
+        Raises:
+            FileSystemError: If flushing to disk fails
+        """
+        try:
+            self.writer.flush()
+        except OSError as e:
+            raise FileSystemError(
+                "Failed to flush saved images to disk",
+                remediation="Check disk health and free space",
+            ) from e
@@ -0,0 +1,217 @@
+"""Persistent local ledger of submitted Batch API jobs."""
+
+import os
+import sqlite3
+import statistics
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.models.exceptions import FileSystemError
+from src.models.ledger_entry import LedgerEntry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_name TEXT PRIMARY KEY,
+    source_file TEXT NOT NULL,
+    state TEXT,
+    error_message TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    fetched_at TEXT,
+    output_dir TEXT
+);
+CREATE TABLE IF NOT EXISTS latencies (
+    kind TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "job_name, source_file, state, error_message, created_at, updated_at, fetched_at, output_dir"
+)
+
+
+def default_ledger_file() -> Path:
+    """Return the default location of the job ledger."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "anyimg" / "jobs.db"
+
+
+class JobLedger:
+    """SQLite-backed record of every Batch API job this host has created.
+
+    Jobs are recorded as soon as they are created, so a runner that is killed while
+    polling can reattach to them later (``anyimg batch status|resume|fetch``) instead
+    of resubmitting and paying again. The ledger also keeps recently observed inline
+    and batch latencies for the workload router. SQLite's own locking makes the ledger
+    safe to share between threads and concurrent ``anyimg`` processes.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Initialize job ledger.
+
+        Args:
+            path: Ledger database file (defaults to ~/.cache/anyimg/jobs.db)
+        """
+        self.path = path if path is not None else default_ledger_file()
+
+    def record(self, job_name: str, source_file: Path, state: str | None = None) -> None:
+        """Record a newly created job.
+
+        Args:
+            job_name: Batch job name
+            source_file: JSONL file the job was created from
+            state: Initial job state, if known
+
+        Raises:
+            FileSystemError: If the ledger cannot be written
+        """
+        now = datetime.now().isoformat()
+        self._execute(
+            "INSERT OR REPLACE INTO jobs (job_name, source_file, state, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (job_name, str(source_file.resolve()), state, now, now),
+        )
+
+    def update_state(self, job_name: str, state: str, error_message: str | None = None) -> None:
+        """Store a job's latest known state.
+
+        Args:
+            job_name: Batch job name
+            state: Job state reported by the API
+            error_message: Job error, if it failed
+
+        Raises:
+            FileSystemError: If the ledger cannot be written
+        """
+        self._execute(
+            "UPDATE jobs SET state = ?, error_message = ?, updated_at = ? WHERE job_name = ?",
+            (state, error_message, datetime.now().isoformat(), job_name),
+        )
+
+    def mark_fetched(self, job_name: str, output_dir: Path) -> None:
+        """Record that a job's results have been downloaded.
+
+        Args:
+            job_name: Batch job name
+            output_dir: Directory the results were saved to
+
+        Raises:
+            FileSystemError: If the ledger cannot be written
+        """
+        self._execute(
+            "UPDATE jobs SET fetched_at = ?, output_dir = ? WHERE job_name = ?",
+            (datetime.now().isoformat(), str(output_dir.resolve()), job_name),
+        )
+
+    def get(self, job_name: str) -> LedgerEntry | None:
+        """Look up one job.
+
+        Args:
+            job_name: Batch job name
+
+        Returns:
+            The ledger entry, or None if the job was never recorded
+
+        Raises:
+            FileSystemError: If the ledger cannot be read
+        """
+        rows = self._query(f"SELECT {_COLUMNS} FROM jobs WHERE job_name = ?", (job_name,))
+        return _entry_from_row(rows[0]) if rows else None
+
+    def list_jobs(self, include_fetched: bool = True) -> list[LedgerEntry]:
+        """List recorded jobs, oldest first.
+
+        Args:
+            include_fetched: Also list jobs whose results were already downloaded
+
+        Returns:
+            Ledger entries
+
+        Raises:
+            FileSystemError: If the ledger cannot be read
+        """
+        where = "" if include_fetched else " WHERE fetched_at IS NULL"
+        rows = self._query(f"SELECT {_COLUMNS} FROM jobs{where} ORDER BY created_at", ())
+        return [_entry_from_row(row) for row in rows]
+
+    def record_latency(self, kind: str, seconds: float) -> None:
+        """Store one observed latency for a generation path.
+
+        Args:
+            kind: Path the latency was observed on ("inline" or "batch")
+            seconds: Observed latency
+
+        Raises:
+            FileSystemError: If the ledger cannot be written
+        """
+        self._execute(
+            "INSERT INTO latencies (kind, seconds, recorded_at) VALUES (?, ?, ?)",
+            (kind, seconds, datetime.now().isoformat()),
+        )
+
+    def typical_latency(self, kind: str, window: int = 20) -> float | None:
+        """Median of the most recent latencies observed for a generation path.
+
+        Args:
+            kind: Path to look up ("inline" or "batch")
+            window: Number of recent observations considered
+
+        Returns:
+            Median latency in seconds, or None if nothing was observed yet
+
+        Raises:
+            FileSystemError: If the ledger cannot be read
+        """
+        rows = self._query(
+            "SELECT seconds FROM latencies WHERE kind = ? ORDER BY recorded_at DESC LIMIT ?",
+            (kind, window),
+        )
+        if not rows:
+            return None
+        return statistics.median(row[0] for row in rows)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Wait on other processes' write locks rather than failing immediately
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def _execute(self, sql: str, params: tuple[Any, ...]) -> None:
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(sql, params)
+        except (OSError, sqlite3.Error) as e:
+            raise FileSystemError(
+                f"Failed to update job ledger: {self.path}",
+                remediation="Check permissions or pass a writable --ledger-file",
+            ) from e
+
+    def _query(self, sql: str, params: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        try:
+            with closing(self._connect()) as connection:
+                return connection.execute(sql, params).fetchall()
+        except (OSError, sqlite3.Error) as e:
+            raise FileSystemError(
+                f"Failed to read job ledger: {self.path}",
+                remediation="Check permissions or pass a readable --ledger-file",
+            ) from e
+
+
+def _entry_from_row(row: tuple[Any, ...]) -> LedgerEntry:
+    """Convert a ``jobs`` row (in _COLUMNS order) into a LedgerEntry."""
+    job_name, source_file, state, error_message, created_at, updated_at, fetched_at, out = row
+    return LedgerEntry(
+        job_name=job_name,
+        source_file=Path(source_file),
+        state=state,
+        error_message=error_message,
+        created_at=datetime.fromisoformat(created_at),
+        updated_at=datetime.fromisoformat(updated_at),
+        fetched_at=datetime.fromisoformat(fetched_at) if fetched_at else None,
+        output_dir=Path(out) if out else None,
+    )
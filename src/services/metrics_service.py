@@ -0,0 +1,181 @@
+"""Summarize run timings and export them as JSON or a Prometheus textfile."""
+
+import math
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from src.models.exceptions import FileSystemError
+from src.models.metrics import STAGES, LatencySummary, RunMetrics
+from src.models.result import GenerationResult
+
+# Quantiles reported for every timing, as (summary field, Prometheus label)
+_QUANTILES = (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99"))
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Linearly interpolated percentile of a sorted, non-empty list."""
+    position = (len(ordered) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: Iterable[float]) -> LatencySummary | None:
+    """Summarize a set of observations.
+
+    Args:
+        values: Observations in seconds
+
+    Returns:
+        Count, total, mean, p50/p95/p99 and max, or None if there are no observations
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    total = sum(ordered)
+    return LatencySummary(
+        count=len(ordered),
+        total=total,
+        mean=total / len(ordered),
+        p50=_percentile(ordered, 0.50),
+        p95=_percentile(ordered, 0.95),
+        p99=_percentile(ordered, 0.99),
+        max=ordered[-1],
+    )
+
+
+def summarize_run(
+    results: list[GenerationResult], started_at: datetime, wall_time: float
+) -> RunMetrics:
+    """Build run metrics from a run's results.
+
+    Args:
+        results: Every result the run produced
+        started_at: When the run started
+        wall_time: Seconds from start to the last result
+
+    Returns:
+        Per-stage and end-to-end latency summaries plus throughput
+    """
+    succeeded = sum(1 for r in results if r.success)
+
+    stages: dict[str, LatencySummary] = {}
+    for stage in STAGES:
+        summary = summarize(r.timings[stage] for r in results if stage in r.timings)
+        if summary is not None:
+            stages[stage] = summary
+
+    latency: dict[str, LatencySummary] = {}
+    for name, values in (
+        ("request", [r.duration for r in results]),
+        ("time_to_image", [r.time_to_image for r in results]),
+        ("ttfb", [r.ttfb for r in results]),
+    ):
+        summary = summarize(v for v in values if v is not None)
+        if summary is not None:
+            latency[name] = summary
+
+    return RunMetrics(
+        started_at=started_at,
+        wall_time=wall_time,
+        requests=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        cached=sum(1 for r in results if r.cached),
+        images_per_second=succeeded / wall_time if wall_time > 0 else 0.0,
+        stages=stages,
+        latency=latency,
+    )
+
+
+def render_prometheus(metrics: RunMetrics) -> str:
+    """Render run metrics in the Prometheus text exposition format.
+
+    Timings are exported as summaries with 0.5/0.95/0.99 quantiles, ready for
+    node_exporter's textfile collector.
+
+    Args:
+        metrics: Run metrics
+
+    Returns:
+        Textfile contents
+    """
+    lines = [
+        "# HELP anyimg_requests_total Requests attempted in the last run, by outcome.",
+        "# TYPE anyimg_requests_total counter",
+        f'anyimg_requests_total{{outcome="success"}} {metrics.succeeded - metrics.cached}',
+        f'anyimg_requests_total{{outcome="cached"}} {metrics.cached}',
+        f'anyimg_requests_total{{outcome="failure"}} {metrics.failed}',
+        "# HELP anyimg_run_duration_seconds Wall time of the last run.",
+        "# TYPE anyimg_run_duration_seconds gauge",
+        f"anyimg_run_duration_seconds {metrics.wall_time}",
+        "# HELP anyimg_images_per_second Images produced per wall second in the last run.",
+        "# TYPE anyimg_images_per_second gauge",
+        f"anyimg_images_per_second {metrics.images_per_second}",
+        "# HELP anyimg_last_run_timestamp_seconds Start time of the last run.",
+        "# TYPE anyimg_last_run_timestamp_seconds gauge",
+        f"anyimg_last_run_timestamp_seconds {metrics.started_at.timestamp()}",
+    ]
+
+    for name, label, help_text, summaries in (
+        (
+            "anyimg_stage_seconds",
+            "stage",
+            "Per-request time spent in each pipeline stage in the last run.",
+            metrics.stages,
+        ),
+        (
+            "anyimg_latency_seconds",
+            "kind",
+            "End-to-end per-request latency in the last run.",
+            metrics.latency,
+        ),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} summary")
+        for key, summary in summaries.items():
+            for field, quantile in _QUANTILES:
+                value = getattr(summary, field)
+                lines.append(f'{name}{{{label}="{key}",quantile="{quantile}"}} {value}')
+            lines.append(f'{name}_sum{{{label}="{key}"}} {summary.total}')
+            lines.append(f'{name}_count{{{label}="{key}"}} {summary.count}')
+
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(metrics: RunMetrics, path: Path) -> None:
+    """Write run metrics, as a Prometheus textfile for ``.prom`` paths and JSON otherwise.
+
+    The file is replaced atomically, so a collector never reads a half-written file.
+
+    Args:
+        metrics: Run metrics
+        path: Destination file
+
+    Raises:
+        FileSystemError: If the file cannot be written
+    """
+    if path.suffix == ".prom":
+        content = render_prometheus(metrics)
+    else:
+        content = metrics.model_dump_json(indent=2) + "\n"
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    except OSError as e:
+        raise FileSystemError(
+            f"Failed to write metrics: {path}",
+            remediation="Check the --metrics-out directory exists and is writable",
+        ) from e
@@ -0,0 +1,186 @@
+"""Client-side request/image quota limiter shared across processes on one host."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Callable
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+from src.models.config import GenerationConfig
+from src.models.exceptions import FileSystemError
+
+
+def default_quota_file() -> Path:
+    """Return the default location of the shared quota state file."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "anyimg" / "quota.json"
+
+
+class QuotaLimiter:
+    """Token-bucket limiter for requests-per-minute and images-per-minute quotas.
+
+    Bucket state lives in a small JSON file guarded by an exclusive ``flock``, so every
+    ``anyimg`` process on the host that points at the same file draws from one budget.
+    Each bucket holds at most one minute of quota and refills continuously.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        images_per_minute: int | None = None,
+        state_path: Path | None = None,
+    ) -> None:
+        """Initialize quota limiter.
+
+        Args:
+            requests_per_minute: Maximum API calls per minute (None for unlimited)
+            images_per_minute: Maximum generated images per minute (None for unlimited)
+            state_path: Shared state file (defaults to ~/.cache/anyimg/quota.json)
+        """
+        self.rates: dict[str, int] = {}
+        if requests_per_minute:
+            self.rates["requests"] = requests_per_minute
+        if images_per_minute:
+            self.rates["images"] = images_per_minute
+
+        self.state_path = state_path if state_path is not None else default_quota_file()
+        # flock serializes processes; this lock serializes threads within one process
+        self._thread_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: GenerationConfig) -> "QuotaLimiter | None":
+        """Build a limiter from config, or None when no quota is configured."""
+        if config.requests_per_minute is None and config.images_per_minute is None:
+            return None
+        return cls(
+            requests_per_minute=config.requests_per_minute,
+            images_per_minute=config.images_per_minute,
+            state_path=config.quota_file,
+        )
+
+    def try_acquire(self, requests: int = 1, images: int = 0) -> float:
+        """Take tokens from every bucket if all of them can cover the cost.
+
+        Args:
+            requests: Number of API calls about to be made
+            images: Number of images those calls will generate
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds to wait before retrying
+
+        Raises:
+            FileSystemError: If the shared state file cannot be opened
+        """
+        cost = {"requests": requests, "images": images}
+        needed = {name: cost[name] for name in self.rates if cost[name] > 0}
+        if not needed:
+            return 0.0
+
+        with self._thread_lock, _LockedState(self.state_path) as (state, save):
+            now = time.time()
+            wait = 0.0
+
+            for name, rate in self.rates.items():
+                bucket = state.get(name) or {"tokens": float(rate), "updated": now}
+                elapsed = max(0.0, now - float(bucket["updated"]))
+                tokens = min(float(rate), float(bucket["tokens"]) + elapsed * rate / 60.0)
+                state[name] = {"tokens": tokens, "updated": now}
+
+                # A cost above the bucket size could never be met; cap it to a full bucket
+                amount = min(needed.get(name, 0), rate)
+                if tokens < amount:
+                    wait = max(wait, (amount - tokens) * 60.0 / rate)
+
+            if wait == 0.0:
+                for name, amount in needed.items():
+                    state[name]["tokens"] -= min(amount, self.rates[name])
+
+            save(state)
+            return wait
+
+    def acquire(self, requests: int = 1, images: int = 0) -> float:
+        """Block until the quota allows the call.
+
+        Args:
+            requests: Number of API calls about to be made
+            images: Number of images those calls will generate
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while (wait := self.try_acquire(requests, images)) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    async def acquire_async(self, requests: int = 1, images: int = 0) -> float:
+        """Wait on the event loop until the quota allows the call.
+
+        The state file lock and I/O run in a worker thread, so another process holding
+        the lock never stalls the event loop.
+
+        Args:
+            requests: Number of API calls about to be made
+            images: Number of images those calls will generate
+
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while (wait := await asyncio.to_thread(self.try_acquire, requests, images)) > 0:
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+
+class _LockedState:
+    """Context manager yielding the parsed state file while holding an exclusive lock."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: IO[str] | None = None
+
+    def __enter__(self) -> tuple[dict[str, Any], Callable[[dict[str, Any]], None]]:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a+", encoding="utf-8")
+        except OSError as e:
+            raise FileSystemError(
+                f"Failed to open quota state file: {self.path}",
+                remediation="Check permissions or pass a writable --quota-file",
+            ) from e
+
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+        self._file.seek(0)
+        raw = self._file.read()
+        try:
+            state: dict[str, Any] = json.loads(raw) if raw else {}
+        except json.JSONDecodeError:
+            # Corrupt or partially written state: start from full buckets
+            state = {}
+
+        return state, self._save
+
+    def _save(self, state: dict[str, Any]) -> None:
+        assert self._file is not None
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(state))
+        self._file.flush()
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._file is not None:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
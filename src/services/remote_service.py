@@ -0,0 +1,167 @@
+"""Thin client that runs generation jobs on an ``anyimg serve`` daemon."""
+
+import http.client
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Iterator
+
+from src.models.config import GenerationConfig
+from src.models.exceptions import (
+    AnyImgError,
+    APIError,
+    ConfigurationError,
+    FileSystemError,
+    ValidationError,
+)
+from src.models.result import GenerationResult
+from src.models.server_job import ServerJob
+
+# Error class per exit code, to re-raise daemon errors as the CLI would have
+_ERRORS_BY_EXIT_CODE: dict[int, type[AnyImgError]] = {
+    1: ConfigurationError,
+    2: ValidationError,
+    3: APIError,
+    4: FileSystemError,
+}
+
+
+def default_socket_path() -> Path:
+    """Return the default location of the daemon's Unix socket."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "anyimg" / "server.sock"
+
+
+def token_path(port: int) -> Path:
+    """Return the file holding the token a daemon on a TCP port requires.
+
+    The daemon writes it (readable only by its owner) when it starts listening, and
+    clients on the same machine send it with every job.
+    """
+    return default_socket_path().with_name(f"server-{port}.token")
+
+
+def parse_server_address(address: str | None) -> Path | tuple[str, int]:
+    """Parse a daemon address: a Unix socket path, ``host:port`` or ``port``.
+
+    Args:
+        address: Address given to --server (None or empty for the default socket)
+
+    Returns:
+        Socket path, or (host, port) for a TCP address
+    """
+    if not address:
+        return default_socket_path()
+    host, _, port = address.rpartition(":")
+    if port.isdigit() and "/" not in address:
+        return host or "127.0.0.1", int(port)
+    return Path(address).expanduser()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class RemoteGenerator:
+    """Forwards runs to a daemon that holds a warm API client and worker pools.
+
+    The client only parses arguments and prints results, so it never imports the SDK
+    or Pillow; each image costs the daemon's API call and write, and nothing else.
+    """
+
+    def __init__(self, address: str | None = None) -> None:
+        """Initialize remote generator.
+
+        Args:
+            address: Daemon address: Unix socket path, ``host:port`` or ``port``
+                (default: ~/.cache/anyimg/server.sock)
+        """
+        self.address = parse_server_address(address)
+
+    def run(
+        self, config: GenerationConfig, working_dir: Path | None = None
+    ) -> Iterator[GenerationResult]:
+        """Run a generation on the daemon, yielding results as it streams them back.
+
+        Relative paths in config are resolved against working_dir on the daemon's
+        side, and images are written there by the daemon.
+
+        Args:
+            config: Validated run configuration
+            working_dir: Directory the run is started from (default: the current one)
+
+        Yields:
+            One GenerationResult per image, in completion order
+
+        Raises:
+            ConfigurationError: If the daemon cannot be reached, or its token can't be read
+            APIError: If the daemon stops before the run finishes
+            AnyImgError: The daemon's error, with the exit code the CLI would return
+        """
+        job = ServerJob.from_config(config, working_dir or Path.cwd())
+        headers = {"Content-Type": "application/json"}
+        if not isinstance(self.address, Path):
+            headers["Authorization"] = f"Bearer {self._read_token(self.address[1])}"
+
+        connection = self._connect()
+        try:
+            try:
+                connection.request("POST", "/jobs", body=job.model_dump_json(), headers=headers)
+                response = connection.getresponse()
+            except OSError as e:
+                raise ConfigurationError(
+                    f"Cannot reach anyimg server at {self._describe()}: {e}",
+                    remediation="Start one with: anyimg serve, or run without --server",
+                ) from e
+
+            for line in response:
+                event = json.loads(line)
+                if "error" in event:
+                    error = event["error"]
+                    error_class = _ERRORS_BY_EXIT_CODE.get(error["exit_code"], AnyImgError)
+                    raise error_class(error["message"], remediation=error["remediation"])
+                if event.get("done"):
+                    return
+                yield GenerationResult.model_validate(event["result"])
+        finally:
+            connection.close()
+
+        raise APIError(
+            f"anyimg server at {self._describe()} stopped before the run finished",
+            remediation="Check the server's output and retry",
+        )
+
+    def _read_token(self, port: int) -> str:
+        path = token_path(port)
+        try:
+            return path.read_text().strip()
+        except OSError as e:
+            raise ConfigurationError(
+                f"Cannot read the token of the anyimg server at {self._describe()}: {e.strerror}",
+                remediation=f"Start one with: anyimg serve --port {port}, as the same user",
+            ) from e
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if isinstance(self.address, Path):
+            return _UnixHTTPConnection(self.address)
+        host, port = self.address
+        return http.client.HTTPConnection(host, port)
+
+    def _describe(self) -> str:
+        if isinstance(self.address, Path):
+            return str(self.address)
+        return f"{self.address[0]}:{self.address[1]}"
@@ -0,0 +1,136 @@
+"""Retry loop with exponential backoff, full jitter and a shared retry budget."""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from src.models.exceptions import (
+    APIError,
+    APIRateLimitError,
+    APIServerError,
+    APITimeoutError,
+)
+from src.models.retry import RetryPolicy
+
+T = TypeVar("T")
+
+# Errors worth retrying: everything else (auth, bad request, empty response) is permanent
+RETRYABLE_ERRORS = (APIRateLimitError, APITimeoutError, APIServerError)
+
+
+class Retrier:
+    """Runs calls under a RetryPolicy; one instance shares its budget across a run."""
+
+    def __init__(self, policy: RetryPolicy | None = None) -> None:
+        """Initialize retrier.
+
+        Args:
+            policy: Retry policy (defaults to no retries)
+        """
+        self.policy = policy if policy is not None else RetryPolicy()
+        self._budget_remaining = self.policy.retry_budget
+        self._lock = threading.Lock()
+
+    def next_delay(self, error: Exception, attempt: int) -> float | None:
+        """Decide whether to retry after a failed attempt.
+
+        Consumes one unit of the run's retry budget when a retry is granted. A server
+        asking to wait longer than max_delay (Retry-After or retryDelay) is not retried:
+        the request fails now instead of holding a worker for the whole wait.
+
+        Args:
+            error: Exception raised by the attempt
+            attempt: Number of attempts made so far (1-based)
+
+        Returns:
+            Seconds to wait before the next attempt, or None to give up
+        """
+        if not isinstance(error, RETRYABLE_ERRORS):
+            return None
+        if attempt > self.policy.max_retries:
+            return None
+
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None and retry_after > self.policy.max_delay:
+            return None
+
+        with self._lock:
+            if self._budget_remaining is not None:
+                if self._budget_remaining <= 0:
+                    return None
+                self._budget_remaining -= 1
+
+        # Full jitter: uniform over [0, min(cap, base * 2^(attempt-1))]
+        ceiling = min(self.policy.max_delay, self.policy.base_delay * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+
+        # Never retry sooner than the server asked us to
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+    def call(self, fn: Callable[[], T]) -> tuple[T, int, float]:
+        """Call fn until it succeeds or the policy gives up.
+
+        Args:
+            fn: Zero-argument callable making one attempt
+
+        Returns:
+            Tuple of (result, attempts made, total seconds waited between attempts)
+
+        Raises:
+            Exception: The last attempt's exception; APIError instances carry
+                ``attempts`` and ``retry_wait``
+        """
+        attempt = 0
+        waited = 0.0
+
+        while True:
+            attempt += 1
+            try:
+                return fn(), attempt, waited
+            except Exception as e:
+                delay = self.next_delay(e, attempt)
+                if delay is None:
+                    _record_attempts(e, attempt, waited)
+                    raise
+                time.sleep(delay)
+                waited += delay
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]]) -> tuple[T, int, float]:
+        """Await fn until it succeeds or the policy gives up.
+
+        Args:
+            fn: Zero-argument coroutine function making one attempt
+
+        Returns:
+            Tuple of (result, attempts made, total seconds waited between attempts)
+
+        Raises:
+            Exception: The last attempt's exception; APIError instances carry
+                ``attempts`` and ``retry_wait``
+        """
+        attempt = 0
+        waited = 0.0
+
+        while True:
+            attempt += 1
+            try:
+                return await fn(), attempt, waited
+            except Exception as e:
+                delay = self.next_delay(e, attempt)
+                if delay is None:
+                    _record_attempts(e, attempt, waited)
+                    raise
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+def _record_attempts(error: Exception, attempts: int, waited: float) -> None:
+    """Attach retry statistics to an exception that is about to propagate."""
+    if isinstance(error, APIError):
+        error.attempts = attempts
+        error.retry_wait = waited
@@ -0,0 +1,288 @@
+"""Cost/latency router splitting a workload between inline generation and the Batch API."""
+
+import asyncio
+import math
+import os
+import time
+from pathlib import Path
+
+from src.models.exceptions import AnyImgError
+from src.models.prompt_row import PromptRow
+from src.models.result import GenerationResult
+from src.models.route_plan import RoutePlan
+from src.services.batch_api_service import BatchAPIService
+from src.services.batch_builder_service import BatchBuilder
+from src.services.batch_service import generate_prompt_rows
+from src.services.batch_watcher_service import BatchJobWatcher
+from src.services.gemini_service import GeminiService
+from src.services.image_service import ImageService
+from src.services.ledger_service import JobLedger
+from src.utils.path_utils import mime_type_for_path
+
+# Latency assumptions used until the ledger has observations of its own
+DEFAULT_INLINE_LATENCY = 30.0
+DEFAULT_BATCH_LATENCY = 3600.0
+
+
+def inline_finish_time(
+    position: int,
+    inline_latency: float,
+    concurrency: int = 4,
+    requests_per_minute: int | None = None,
+) -> float:
+    """Estimate when the position-th (1-based) inline request of a run finishes.
+
+    Requests run in waves of concurrency, each taking inline_latency. With a quota, the
+    bucket starts with one minute's worth of requests and then refills steadily, so
+    later requests can't start before their share of quota has accrued.
+
+    Args:
+        position: Request's place in the inline queue
+        inline_latency: Expected seconds per inline request
+        concurrency: Inline requests in flight at once
+        requests_per_minute: Quota on inline requests (None for unlimited)
+
+    Returns:
+        Estimated seconds from the start of the run
+    """
+    finish = math.ceil(position / max(concurrency, 1)) * inline_latency
+    if requests_per_minute:
+        start = max(0, position - requests_per_minute) * 60 / requests_per_minute
+        finish = max(finish, start + inline_latency)
+    return finish
+
+
+def plan_routes(
+    rows: list[PromptRow],
+    deadline: float | None,
+    inline_latency: float = DEFAULT_INLINE_LATENCY,
+    batch_latency: float = DEFAULT_BATCH_LATENCY,
+    min_batch_size: int = 20,
+    concurrency: int = 4,
+    requests_per_minute: int | None = None,
+) -> RoutePlan:
+    """Decide which rows run inline and which go to the (cheaper, slower) Batch API.
+
+    Rows whose deadline (their own, else the workload's) is shorter than the expected
+    batch turnaround are candidates for inline generation, tightest deadline first.
+    Each one goes inline while the inline queue, given concurrency and quota, would
+    still finish it before a batch job would; once the queue is that long, the rest
+    ride the Batch API along with every row that has time for it. When fewer than
+    min_batch_size rows would go to batch, they run inline instead, since a job that
+    small saves little and adds a long tail.
+
+    Args:
+        rows: Workload rows
+        deadline: Default seconds until results are needed (None for no deadline)
+        inline_latency: Expected seconds per inline request
+        batch_latency: Expected seconds from batch job creation to results
+        min_batch_size: Fewest rows worth a batch job
+        concurrency: Inline requests in flight at once
+        requests_per_minute: Quota on inline requests (None for unlimited)
+
+    Returns:
+        The route plan
+    """
+    urgent: list[tuple[float, PromptRow]] = []
+    for row in rows:
+        row_deadline = row.deadline if row.deadline is not None else deadline
+        if row_deadline is not None and row_deadline < batch_latency:
+            urgent.append((row_deadline, row))
+
+    inline: list[PromptRow] = []
+    for _, row in sorted(urgent, key=lambda item: item[0]):
+        finish = inline_finish_time(
+            len(inline) + 1, inline_latency, concurrency, requests_per_minute
+        )
+        if finish >= batch_latency:
+            break  # Every later row would finish even later
+        inline.append(row)
+
+    inline_keys = {row.key for row in inline}
+    batch = [row for row in rows if row.key not in inline_keys]
+
+    if batch and len(batch) < min_batch_size:
+        inline.extend(batch)
+        batch = []
+
+    return RoutePlan(
+        inline=inline,
+        batch=batch,
+        order=[row.key for row in rows],
+        inline_latency=inline_latency,
+        batch_latency=batch_latency,
+        inline_duration=(
+            inline_finish_time(len(inline), inline_latency, concurrency, requests_per_minute)
+            if inline
+            else 0.0
+        ),
+    )
+
+
+class WorkloadRouter:
+    """Plans a workload from observed latencies and runs both paths concurrently."""
+
+    def __init__(
+        self,
+        gemini_service: GeminiService,
+        image_service: ImageService,
+        batch_api: BatchAPIService,
+        ledger: JobLedger | None = None,
+        builder: BatchBuilder | None = None,
+        concurrency: int = 4,
+        min_batch_size: int = 20,
+    ) -> None:
+        """Initialize workload router.
+
+        Args:
+            gemini_service: Service for inline API calls
+            image_service: Service for file I/O
+            batch_api: Service for batch jobs
+            ledger: Optional ledger supplying and receiving observed latencies
+            builder: Batch request builder (defaults to one sharing batch_api's client)
+            concurrency: Inline requests in flight at once
+            min_batch_size: Fewest rows worth a batch job
+        """
+        self.gemini_service = gemini_service
+        self.image_service = image_service
+        self.batch_api = batch_api
+        self.ledger = ledger
+        self.builder = builder if builder is not None else BatchBuilder(client=batch_api.client)
+        self.concurrency = concurrency
+        self.min_batch_size = min_batch_size
+
+    def plan(self, rows: list[PromptRow], deadline: float | None) -> RoutePlan:
+        """Plan a workload using the latencies observed in recent runs.
+
+        Args:
+            rows: Workload rows
+            deadline: Default seconds until results are needed (None for no deadline)
+
+        Returns:
+            The route plan
+        """
+        inline_latency = batch_latency = None
+        if self.ledger is not None:
+            inline_latency = self.ledger.typical_latency("inline")
+            batch_latency = self.ledger.typical_latency("batch")
+
+        # Each inline row is one request for one image, so the tighter quota binds
+        limiter = self.gemini_service.quota_limiter
+        rates = list(limiter.rates.values()) if limiter is not None else []
+
+        return plan_routes(
+            rows,
+            deadline,
+            inline_latency=inline_latency or DEFAULT_INLINE_LATENCY,
+            batch_latency=batch_latency or DEFAULT_BATCH_LATENCY,
+            min_batch_size=self.min_batch_size,
+            concurrency=self.concurrency,
+            requests_per_minute=min(rates) if rates else None,
+        )
+
+    async def run(self, plan: RoutePlan, output_dir: Path) -> list[GenerationResult]:
+        """Run the inline and batch parts of a plan at the same time.
+
+        Args:
+            plan: Route plan from plan()
+            output_dir: Directory for images of rows without their own output path
+
+        Returns:
+            One GenerationResult per row, in workload order
+        """
+        try:
+            inline_results, batch_results = await asyncio.gather(
+                asyncio.to_thread(self._run_inline, plan.inline, output_dir),
+                self._run_batch(plan.batch, output_dir),
+            )
+        finally:
+            await asyncio.to_thread(self.image_service.flush)
+
+        by_key = {r.key: r for r in [*inline_results, *batch_results]}
+        merged: list[GenerationResult] = []
+        for index, key in enumerate(plan.order):
+            result = by_key[key]
+            result.index = index
+            merged.append(result)
+        return merged
+
+    def _run_inline(self, rows: list[PromptRow], output_dir: Path) -> list[GenerationResult]:
+        """Generate rows inline and record the observed per-request latency."""
+        if not rows:
+            return []
+
+        start = time.monotonic()
+        results = generate_prompt_rows(
+            rows, self.gemini_service, self.image_service, output_dir, self.concurrency
+        )
+
+        # Requests ran in waves of `concurrency`; one wave approximates one request
+        waves = math.ceil(len(rows) / max(self.concurrency, 1))
+        self._record_latency("inline", (time.monotonic() - start) / waves)
+        return results
+
+    async def _run_batch(self, rows: list[PromptRow], output_dir: Path) -> list[GenerationResult]:
+        """Submit rows as one batch job, wait for it and fetch its results.
+
+        Failures to build, submit or watch the job become failed results for its rows,
+        so they never discard the inline half of the workload.
+        """
+        if not rows:
+            return []
+
+        try:
+            job_name = await self._submit_batch(rows, output_dir)
+            start = time.monotonic()
+            watcher = BatchJobWatcher(
+                self.batch_api, retry_policy=self.gemini_service.retrier.policy
+            )
+            [outcome] = await watcher.watch([job_name], output_dir, {job_name: len(rows)})
+        except AnyImgError as e:
+            return [self._failed_row(i, row, output_dir, e.message) for i, row in enumerate(rows)]
+
+        if outcome.state == "JOB_STATE_SUCCEEDED":
+            self._record_latency("batch", time.monotonic() - start)
+
+        by_key = {r.key: r for r in outcome.results}
+        results: list[GenerationResult] = []
+        for index, row in enumerate(rows):
+            result = by_key.get(row.key)
+            if result is None:
+                message = outcome.error_message or f"Batch job ended with state {outcome.state}"
+                result = self._failed_row(index, row, output_dir, message)
+            elif result.success and row.output_path is not None:
+                result.output_path = self._move_to(result.output_path, row.output_path)
+            results.append(result)
+        return results
+
+    async def _submit_batch(self, rows: list[PromptRow], output_dir: Path) -> str:
+        """Build a request file for rows and create a batch job from it."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        jsonl_path = output_dir / f".routed-{os.getpid()}-{int(time.time())}.jsonl"
+        try:
+            await asyncio.to_thread(self.builder.build, rows, jsonl_path)
+            return await asyncio.to_thread(self.batch_api.create_batch_from_file, jsonl_path)
+        finally:
+            jsonl_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _failed_row(index: int, row: PromptRow, output_dir: Path, message: str) -> GenerationResult:
+        """Result for a batch-routed row that produced no image."""
+        return GenerationResult(
+            index=index,
+            key=row.key,
+            output_path=row.output_path or output_dir / f"{row.key}.png",
+            success=False,
+            error_message=message,
+        )
+
+    def _move_to(self, source: Path, destination: Path) -> Path:
+        """Move a batch image to a row's own output path, converting if its extension asks."""
+        self.image_service.save_image(source.read_bytes(), destination, mime_type_for_path(source))
+        source.unlink(missing_ok=True)
+        return destination
+
+    def _record_latency(self, kind: str, seconds: float) -> None:
+        """Feed an observed latency back into the ledger, if one is configured."""
+        if self.ledger is not None:
+            self.ledger.record_latency(kind, seconds)
@@ -1,9 +1,38 @@
 """Path utility functions for file handling."""
 
+import os
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
 
-from src.models.exceptions import InvalidInputImageError
+from src.models.exceptions import FileSystemError, InvalidInputImageError
+from src.utils.atomic_write import pending_path
+
+# Image MIME types the API returns, mapped to the extension we write them with
+MIME_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+}
+
+# --format values mapped to the MIME type they encode to
+OUTPUT_FORMATS = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+# Extensions recognised on user-supplied output paths
+EXTENSION_MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+}
 
 
 def validate_input_image(path: Path) -> None:
@@ -35,13 +64,58 @@ def validate_input_image(path: Path) -> None:
         )
 
 
-def generate_timestamp_filename() -> str:
+def extension_for_mime_type(mime_type: str) -> str:
+    """Get file extension for an image MIME type.
+
+    Args:
+        mime_type: MIME type reported by the API (e.g. "image/jpeg")
+
+    Returns:
+        Extension including the dot (".png" for unknown types)
+    """
+    return MIME_TYPE_EXTENSIONS.get(mime_type.lower(), ".png")
+
+
+def mime_type_for_path(path: Path) -> str | None:
+    """Get the image MIME type implied by a path's extension.
+
+    Args:
+        path: Output path
+
+    Returns:
+        MIME type, or None if the extension is not a recognised image format
+    """
+    return EXTENSION_MIME_TYPES.get(path.suffix.lower())
+
+
+def derivative_path(path: Path, edge: int) -> Path:
+    """Get the path of an image's downsized copy, saved next to it.
+
+    Args:
+        path: Path of the full-size image
+        edge: Longest edge of the copy in pixels
+
+    Returns:
+        ``<stem>_<edge>px<suffix>`` in the same directory
+    """
+    return path.with_name(f"{path.stem}_{edge}px{path.suffix}")
+
+
+def generate_timestamp_filename(index: int | None = None, now: datetime | None = None) -> str:
     """Generate timestamped filename.
 
+    Args:
+        index: Optional 1-based position within a batch, appended after the timestamp
+        now: Time to stamp (defaults to the current time)
+
     Returns:
-        Filename in format "anyimg_YYYYMMDD_HHMMSS.png"
+        Filename in format "anyimg_YYYYMMDD_HHMMSS_mmm.png" (milliseconds), or
+        "anyimg_YYYYMMDD_HHMMSS_mmm_<index>.png" when an index is given
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    now = now or datetime.now()
+    timestamp = f"{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}"
+    if index is not None:
+        return f"anyimg_{timestamp}_{index}.png"
     return f"anyimg_{timestamp}.png"
 
 
@@ -59,26 +133,184 @@ def resolve_output_path(path: Path | None) -> Path:
     return path
 
 
-def auto_rename_if_exists(path: Path) -> Path:
-    """Auto-rename path with suffix if it exists.
+# "<stem>_<n><suffix>": a name produced by numeric-suffix renaming
+_NUMBERED_NAME = re.compile(r"^(?P<stem>.+)_(?P<number>\d+)(?P<suffix>\.[^.]*)?$")
+# ".<name>.reserve": a claim on <name> held by a running allocator
+_RESERVATION_NAME = re.compile(r"^\.(?P<name>.+)\.reserve$")
+# ".<name>.pending": an image written for <name> that a group commit has yet to place
+_PENDING_NAME = re.compile(r"^\.(?P<name>.+)\.pending$")
 
-    Args:
-        path: Desired output path
 
-    Returns:
-        Available path (original or with _1, _2, etc. suffix)
+def reservation_path(path: Path) -> Path:
+    """Return the hidden file that claims path while its image is being generated."""
+    return path.parent / f".{path.name}.reserve"
+
+
+def _reservation_is_stale(reservation: Path) -> bool:
+    """Whether a reservation was left by a process that is no longer running."""
+    if os.name == "nt":
+        return False  # os.kill can't probe a process there without ending it
+    try:
+        pid = int(reservation.read_text())
+    except (OSError, ValueError):
+        return False  # Gone, or just created and not written yet
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # Alive, owned by another user
+    return False
+
+
+class _DirectoryIndex:
+    """Names present or reserved in one directory, plus the next free suffix per stem."""
+
+    def __init__(self, directory: Path) -> None:
+        self.names: set[str] = set()
+        self.next_number: dict[tuple[str, str], int] = {}
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    reserved = _RESERVATION_NAME.match(entry.name)
+                    staged = _PENDING_NAME.match(entry.name)
+                    if staged is not None:
+                        self.note(staged["name"])
+                    elif reserved is None:
+                        self.note(entry.name)
+                    elif _reservation_is_stale(Path(entry.path)):
+                        Path(entry.path).unlink(missing_ok=True)
+                    else:
+                        self.note(reserved["name"])
+        except (FileNotFoundError, NotADirectoryError):
+            pass  # Created on first reservation
+
+    def note(self, name: str) -> None:
+        """Record a taken name and move its stem's counter past it."""
+        self.names.add(name)
+        match = _NUMBERED_NAME.match(name)
+        if match:
+            key = (match["stem"], match["suffix"] or "")
+            number = int(match["number"])
+            if number >= self.next_number.get(key, 1):
+                self.next_number[key] = number + 1
+
+
+class PathAllocator:
+    """Hands out output paths that never overwrite an existing or already-claimed file.
+
+    Each directory is listed once with ``os.scandir``; after that, checking a name is a
+    set lookup and each stem's next ``_N`` suffix is tracked, so allocation stays
+    constant-time however many files the directory holds. A returned path is claimed
+    with a hidden ``.<name>.reserve`` file created exclusively (``O_EXCL``) beside it,
+    so concurrent writers and other processes can't be handed the same name, while the
+    output name itself stays absent until its image is written. A name taken since the
+    scan, or whose image is staged for a ``group`` durability commit, is skipped.
+    Reservations record the owner's PID; one left by a process that died is removed
+    when its directory is next scanned.
+
+    Call ``release`` once a path's image is written (or never will be), and ``close``
+    when done to drop every reservation still held.
+
+    Renamed paths continue after the highest existing suffix (``art_1``, ``art_2``
+    exist, so the next is ``art_3``) rather than filling gaps.
     """
-    if not path.exists():
-        return path
-
-    # Path exists, find available suffix
-    stem = path.stem
-    suffix = path.suffix
-    parent = path.parent
-
-    counter = 1
-    while True:
-        new_path = parent / f"{stem}_{counter}{suffix}"
-        if not new_path.exists():
-            return new_path
-        counter += 1
+
+    def __init__(self, reserve: bool = True) -> None:
+        """Initialize path allocator.
+
+        Args:
+            reserve: Claim each path on disk with a reservation file (False only tracks
+                claims in memory)
+        """
+        self.reserve = reserve
+        self._directories: dict[Path, _DirectoryIndex] = {}
+        self._reservations: set[Path] = set()
+        self._lock = threading.Lock()
+
+    def allocate(self, path: Path) -> Path:
+        """Claim path, or the next free ``<stem>_<N><suffix>`` beside it.
+
+        Args:
+            path: Desired output path
+
+        Returns:
+            Available path (original or with _1, _2, etc. suffix)
+
+        Raises:
+            FileSystemError: If the reservation cannot be created
+        """
+        with self._lock:
+            index = self._directories.get(path.parent)
+            if index is None:
+                index = self._directories[path.parent] = _DirectoryIndex(path.parent)
+
+            if path.name not in index.names and self._claim(path, index):
+                return path
+
+            key = (path.stem, path.suffix)
+            while True:
+                number = index.next_number.get(key, 1)
+                index.next_number[key] = number + 1
+                candidate = path.parent / f"{path.stem}_{number}{path.suffix}"
+                if candidate.name not in index.names and self._claim(candidate, index):
+                    return candidate
+
+    def release(self, path: Path) -> None:
+        """Drop the reservation for a claimed path whose image is written or abandoned.
+
+        The name stays claimed in memory, so it is not handed out again by this
+        allocator.
+
+        Args:
+            path: Path previously returned by allocate
+        """
+        with self._lock:
+            if path not in self._reservations:
+                return
+            self._reservations.discard(path)
+        try:
+            reservation_path(path).unlink()
+        except OSError:
+            pass  # Already gone; nothing to clean up
+
+    def close(self) -> None:
+        """Drop every reservation still held."""
+        with self._lock:
+            held = list(self._reservations)
+        for path in held:
+            self.release(path)
+
+    def _claim(self, path: Path, index: _DirectoryIndex) -> bool:
+        """Mark path as taken; with reserve, reserve it exclusively (False if taken)."""
+        index.note(path.name)
+        if not self.reserve:
+            return True
+
+        reservation = reservation_path(path)
+        try:
+            if path.parent != Path("."):
+                path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(reservation, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            try:
+                os.write(fd, str(os.getpid()).encode())
+            finally:
+                os.close(fd)
+        except FileExistsError:
+            return False  # Reserved by someone else since the directory was scanned
+        except OSError as e:
+            raise FileSystemError(
+                f"Failed to reserve output path: {path}",
+                remediation="Check directory permissions and disk space",
+            ) from e
+
+        if os.path.lexists(path) or os.path.lexists(pending_path(path)):
+            # Written by someone else since the directory was scanned
+            reservation.unlink(missing_ok=True)
+            return False
+
+        self._reservations.add(path)
+        return True
@@ -0,0 +1,106 @@
+"""Streaming reader for prompts files (plain text or JSONL)."""
+
+import json
+from pathlib import Path
+from typing import Any, Iterator, cast
+
+from pydantic import ValidationError as PydanticValidationError
+
+from src.models.exceptions import AnyImgError, InvalidPromptsFileError
+from src.models.prompt_row import PromptRow
+
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+def iter_prompt_rows(
+    path: Path,
+    aspect_ratio: str | None = None,
+    resolution: str | None = None,
+    base_dir: Path | None = None,
+) -> Iterator[PromptRow]:
+    """Read a prompts file one row at a time.
+
+    Plain text files hold one prompt per line; blank lines and lines starting with
+    ``#`` are skipped. JSONL files (``.jsonl``/``.ndjson``) hold one object per line
+    with a ``prompt`` and optional ``key``, ``aspect_ratio``, ``resolution``,
+    ``images`` (list of paths), ``output`` and ``deadline`` (seconds) fields.
+
+    Args:
+        path: Prompts file
+        aspect_ratio: Default aspect ratio for rows that don't set one
+        resolution: Default resolution for rows that don't set one
+        base_dir: Directory relative ``images`` and ``output`` paths are resolved
+            against (default: the working directory)
+
+    Yields:
+        Validated PromptRow per prompt, in file order
+
+    Raises:
+        InvalidPromptsFileError: If the file cannot be read or a row is invalid
+    """
+    is_jsonl = path.suffix.lower() in JSONL_SUFFIXES
+    seen_keys: set[str] = set()
+    row_number = 0
+
+    try:
+        f = open(path, encoding="utf-8")
+    except OSError as e:
+        raise InvalidPromptsFileError(f"cannot read {path}: {e.strerror}") from e
+
+    with f:
+        for line_number, line in enumerate(f, start=1):
+            stripped = line.strip()
+            if not stripped or (not is_jsonl and stripped.startswith("#")):
+                continue
+
+            row_number += 1
+            fields: dict[str, Any]
+            if is_jsonl:
+                try:
+                    loaded: object = json.loads(stripped)
+                except json.JSONDecodeError as e:
+                    raise InvalidPromptsFileError(f"invalid JSON: {e.msg}", line_number) from e
+                if not isinstance(loaded, dict):
+                    raise InvalidPromptsFileError("row must be a JSON object", line_number)
+                fields = cast(dict[str, Any], loaded)
+            else:
+                fields = {"prompt": stripped}
+
+            row = _build_row(fields, row_number, line_number, aspect_ratio, resolution, base_dir)
+
+            if row.key in seen_keys:
+                raise InvalidPromptsFileError(f"duplicate key '{row.key}'", line_number)
+            seen_keys.add(row.key)
+
+            yield row
+
+
+def _build_row(
+    fields: dict[str, Any],
+    row_number: int,
+    line_number: int,
+    aspect_ratio: str | None,
+    resolution: str | None,
+    base_dir: Path | None = None,
+) -> PromptRow:
+    """Validate one row's fields, applying defaults."""
+    images: list[str] | str = fields.get("images") or []
+    if isinstance(images, str):
+        images = [p.strip() for p in images.split(",") if p.strip()]
+    base = base_dir or Path(".")
+
+    try:
+        return PromptRow(
+            key=str(fields.get("key") or f"request-{row_number}"),
+            prompt=fields.get("prompt", ""),
+            aspect_ratio=fields.get("aspect_ratio") or aspect_ratio,
+            resolution=fields.get("resolution") or resolution,
+            input_images=[base / p for p in images],
+            output_path=base / fields["output"] if fields.get("output") else None,
+            deadline=fields.get("deadline"),
+        )
+    except AnyImgError as e:
+        raise InvalidPromptsFileError(e.message, line_number) from e
+    except PydanticValidationError as e:
+        first_error = e.errors()[0]
+        raise InvalidPromptsFileError(str(first_error["msg"]), line_number) from e
@@ -0,0 +1,39 @@
+"""Stage timing helper for per-request instrumentation."""
+
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Accumulates wall time per named stage of one request."""
+
+    def __init__(self) -> None:
+        """Initialize timer; the request's duration is measured from now."""
+        self.started = time.perf_counter()
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None]:
+        """Time the enclosed block and add it to stage ``name``.
+
+        Args:
+            name: Stage name
+
+        Yields:
+            Nothing; the block is timed even if it raises
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time measured elsewhere to stage ``name``."""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the timer was created."""
+        return time.perf_counter() - self.started
@@ -0,0 +1,16 @@
+"""Fixtures shared by every test suite."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from src.models.client_options import ClientOptions
+from src.services.client_service import configure_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_shared_client() -> Iterator[None]:
+    """Give each test its own process-wide client, so a patched genai.Client never leaks."""
+    factory = configure_client(ClientOptions())
+    yield
+    factory.close()
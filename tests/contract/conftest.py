@@ -1,5 +1,6 @@
 """Pytest fixtures for contract tests."""
 
+from io import BytesIO
 from unittest.mock import MagicMock
 
 import pytest
@@ -17,12 +18,16 @@ def mock_genai_client() -> MagicMock:
 def mock_success_response() -> MagicMock:
     """Valid Response with PNG bytes."""
     img = Image.new("RGB", (100, 100), color="blue")
+    img_bytes = BytesIO()
+    img.save(img_bytes, "PNG")
 
     # Mock response structure with new API (parts property)
     response = MagicMock()
     part = MagicMock()
     part.text = None
-    part.as_image.return_value = img
+    part.thought = None
+    part.inline_data.data = img_bytes.getvalue()
+    part.inline_data.mime_type = "image/png"
 
     response.parts = [part]
 
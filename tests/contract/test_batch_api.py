@@ -0,0 +1,151 @@
+"""Contract tests for Gemini Batch API integration."""
+
+import base64
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.services.batch_api_service import BatchAPIError, BatchAPIService
+
+
+def _result_line(key: str, data: bytes) -> str:
+    """Build one JSONL result line carrying inline image data."""
+    return json.dumps(
+        {
+            "key": key,
+            "response": {
+                "candidates": [
+                    {
+                        "content": {
+                            "parts": [
+                                {"text": "Here you go"},
+                                {
+                                    "inlineData": {
+                                        "mimeType": "image/png",
+                                        "data": base64.b64encode(data).decode("ascii"),
+                                    }
+                                },
+                            ]
+                        }
+                    }
+                ]
+            },
+        }
+    )
+
+
+@pytest.fixture
+def succeeded_batch_client(mock_genai_client: MagicMock) -> MagicMock:
+    """Client whose batch job succeeded with a two-line results file."""
+    job = MagicMock()
+    job.state.name = "JOB_STATE_SUCCEEDED"
+    job.dest.file_name = "files/results"
+    mock_genai_client.batches.get.return_value = job
+
+    content = "\n".join([_result_line("req-1", b"one"), _result_line("req-2", b"two")]) + "\n"
+
+    def download(file: str, destination: str | None = None) -> Any:
+        assert destination is not None, "results must be streamed to disk"
+        Path(destination).write_text(content)
+        return None
+
+    mock_genai_client.files.download.side_effect = download
+    return mock_genai_client
+
+
+def test_iter_batch_results_streams_from_disk(succeeded_batch_client: MagicMock) -> None:
+    """Test ID: test_iter_batch_results_streams_from_disk.
+
+    Mock: files.download writes the results file to the given destination
+    Assert: results are yielded lazily, one parsed line at a time
+    """
+    service = BatchAPIService(client=succeeded_batch_client)
+
+    results = service.iter_batch_results("batches/123")
+    succeeded_batch_client.files.download.assert_not_called()
+
+    assert next(results)["key"] == "req-1"
+    assert next(results)["key"] == "req-2"
+    assert next(results, None) is None
+
+
+def test_save_batch_images_from_stream(succeeded_batch_client: MagicMock, tmp_path: Path) -> None:
+    """Test ID: test_save_batch_images_from_stream.
+
+    Mock: succeeded job with two image results
+    Assert: each image is decoded and written under its request key
+    """
+    service = BatchAPIService(client=succeeded_batch_client)
+
+    saved = service.save_batch_images(service.iter_batch_results("batches/123"), tmp_path)
+
+    assert [r.output_path for r in saved] == [tmp_path / "req-1.png", tmp_path / "req-2.png"]
+    assert all(r.success for r in saved)
+    assert (tmp_path / "req-1.png").read_bytes() == b"one"
+    assert (tmp_path / "req-2.png").read_bytes() == b"two"
+
+
+def test_iter_batch_results_rejects_failed_job(mock_genai_client: MagicMock) -> None:
+    """Test ID: test_iter_batch_results_rejects_failed_job.
+
+    Mock: batch job in JOB_STATE_FAILED
+    Assert: raises BatchAPIError without downloading anything
+    """
+    job = MagicMock()
+    job.state.name = "JOB_STATE_FAILED"
+    mock_genai_client.batches.get.return_value = job
+
+    service = BatchAPIService(client=mock_genai_client)
+
+    with pytest.raises(BatchAPIError):
+        list(service.iter_batch_results("batches/123"))
+    mock_genai_client.files.download.assert_not_called()
+
+
+def test_save_batch_images_collects_item_errors(tmp_path: Path) -> None:
+    """Test ID: test_save_batch_images_collects_item_errors.
+
+    Input: mix of good results, an error result and a malformed result
+    Assert: failures are reported per item, others still saved, order preserved
+    """
+    results: list[dict[str, Any]] = [json.loads(_result_line(f"req-{i}", b"img")) for i in range(6)]
+    results[1] = {"key": "req-1", "error": {"code": 400, "message": "Bad prompt"}}
+    results[4]["response"]["candidates"][0]["content"]["parts"][1]["inlineData"]["data"] = "!!"
+
+    service = BatchAPIService(client=MagicMock())
+    saved = service.save_batch_images(results, tmp_path, max_workers=3, max_in_flight=2)
+
+    assert [r.index for r in saved] == list(range(6))
+    assert [r.success for r in saved] == [True, False, True, True, False, True]
+    assert "Bad prompt" in (saved[1].error_message or "")
+    assert (tmp_path / "req-5.png").read_bytes() == b"img"
+
+
+def test_shard_results_are_merged_by_key(tmp_path: Path, mock_genai_client: MagicMock) -> None:
+    """Test: results of all succeeded shards are saved into one directory by key."""
+    contents = {
+        "files/a": _result_line("req-1", b"one") + "\n",
+        "files/b": _result_line("req-2", b"two") + "\n",
+    }
+
+    def get(name: str) -> MagicMock:
+        job = MagicMock()
+        job.state.name = "JOB_STATE_SUCCEEDED"
+        job.dest.file_name = "files/a" if name == "batches/a" else "files/b"
+        return job
+
+    def download(file: str, destination: str) -> None:
+        Path(destination).write_text(contents[file])
+
+    mock_genai_client.batches.get.side_effect = get
+    mock_genai_client.files.download.side_effect = download
+
+    service = BatchAPIService(client=mock_genai_client)
+
+    saved = service.fetch_results(["batches/a", "batches/b"], tmp_path / "out")
+
+    assert [r.output_path.name for r in saved] == ["req-1.png", "req-2.png"]
+    assert (tmp_path / "out" / "req-2.png").read_bytes() == b"two"
@@ -0,0 +1,100 @@
+"""Contract tests for compiling prompts files into Batch API JSONL."""
+
+import json
+import shutil
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from src.cli.main import main
+from src.models.prompt_row import PromptRow
+from src.services.batch_builder_service import BatchBuilder
+
+
+@pytest.fixture
+def upload_client(mock_genai_client: MagicMock) -> MagicMock:
+    """Client whose Files API returns a distinct URI per upload."""
+
+    def upload(file: str, config: object) -> MagicMock:
+        uploaded = MagicMock()
+        uploaded.uri = f"https://files/{mock_genai_client.files.upload.call_count}"
+        uploaded.mime_type = "image/png"
+        return uploaded
+
+    mock_genai_client.files.upload.side_effect = upload
+    return mock_genai_client
+
+
+def test_reference_images_are_uploaded_once_per_content(
+    tmp_path: Path, upload_client: MagicMock
+) -> None:
+    """Test: identical images (even under different paths) share one upload."""
+    style = tmp_path / "style.png"
+    Image.new("RGB", (10, 10), color="red").save(style)
+    copy = tmp_path / "copy.png"
+    shutil.copyfile(style, copy)
+    other = tmp_path / "other.png"
+    Image.new("RGB", (10, 10), color="blue").save(other)
+
+    rows = [
+        PromptRow(key="a", prompt="A", input_images=[style]),
+        PromptRow(key="b", prompt="B", input_images=[copy, other]),
+        PromptRow(key="c", prompt="C", input_images=[style], aspect_ratio="16:9"),
+    ]
+    output = tmp_path / "batch.jsonl"
+
+    count = BatchBuilder(client=upload_client).build(rows, output)
+
+    assert count == 3
+    assert upload_client.files.upload.call_count == 2
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line["key"] for line in lines] == ["a", "b", "c"]
+
+    uris = [
+        [p["fileData"]["fileUri"] for p in line["request"]["contents"][0]["parts"][1:]]
+        for line in lines
+    ]
+    assert uris == [
+        ["https://files/1"],
+        ["https://files/1", "https://files/2"],
+        ["https://files/1"],
+    ]
+    assert lines[2]["request"]["generationConfig"]["imageConfig"] == {"aspectRatio": "16:9"}
+
+
+def test_text_only_rows_need_no_client(tmp_path: Path) -> None:
+    """Test: prompts without reference images never create a client."""
+    output = tmp_path / "batch.jsonl"
+    builder = BatchBuilder()
+
+    builder.build([PromptRow(key="a", prompt="A", resolution="2K")], output)
+
+    assert builder._client is None  # pyright: ignore[reportPrivateUsage]
+    [line] = [json.loads(line) for line in output.read_text().splitlines()]
+    assert line["request"]["contents"][0]["parts"] == [{"text": "A"}]
+    assert line["request"]["generationConfig"]["imageConfig"] == {"imageSize": "2K"}
+
+
+def test_batch_build_command(tmp_path: Path) -> None:
+    """Test: `anyimg batch build` compiles a text prompts file."""
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("A fox\nA bird\n")
+    output = tmp_path / "batch.jsonl"
+
+    exit_code = main(["batch", "build", str(prompts), "--out", str(output), "--resolution", "1K"])
+
+    assert exit_code == 0
+    assert len(output.read_text().splitlines()) == 2
+
+
+def test_batch_build_command_reports_invalid_rows(tmp_path: Path) -> None:
+    """Test: an invalid prompts file exits with the validation exit code."""
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text('{"prompt": ""}\n')
+
+    exit_code = main(["batch", "build", str(prompts), "--out", str(tmp_path / "b.jsonl")])
+
+    assert exit_code == 2
@@ -0,0 +1,222 @@
+"""Contract tests for the asyncio multi-job batch watcher."""
+
+import asyncio
+import base64
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from google.genai import errors as genai_errors
+
+from src.models.batch_shard import BatchShard
+from src.models.job_outcome import JobOutcome
+from src.models.poll import PollPolicy
+from src.models.retry import RetryPolicy
+from src.services.batch_api_service import BatchAPIService, split_batch_file
+from src.services.batch_watcher_service import BatchJobWatcher
+
+
+def _watched_client(mock_genai_client: MagicMock, polls_until_done: dict[str, int]) -> MagicMock:
+    """Client whose jobs succeed (or fail, for names containing 'bad') after N polls."""
+    polls = {name: 0 for name in polls_until_done}
+
+    async def get(name: str) -> MagicMock:
+        polls[name] += 1
+        job = MagicMock()
+        job.create_time = None
+        job.error = None
+        if polls[name] < polls_until_done[name]:
+            job.state.name = "JOB_STATE_RUNNING"
+        elif "bad" in name:
+            job.state.name = "JOB_STATE_FAILED"
+            job.error = "invalid request"
+        else:
+            job.state.name = "JOB_STATE_SUCCEEDED"
+        job.dest.file_name = f"files/{name.split('/')[1]}"
+        return job
+
+    def sync_get(name: str) -> MagicMock:
+        job = MagicMock()
+        job.state.name = "JOB_STATE_SUCCEEDED"
+        job.dest.file_name = f"files/{name.split('/')[1]}"
+        return job
+
+    def download(file: str, destination: str) -> None:
+        key = file.split("/")[1]
+        part = {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(b"x").decode()}}
+        line = {"key": key, "response": {"candidates": [{"content": {"parts": [part]}}]}}
+        Path(destination).write_text(json.dumps(line) + "\n")
+
+    mock_genai_client.aio.batches.get = AsyncMock(side_effect=get)
+    mock_genai_client.batches.get.side_effect = sync_get
+    mock_genai_client.files.download.side_effect = download
+    return mock_genai_client
+
+
+def test_results_are_fetched_as_each_job_completes(
+    tmp_path: Path, mock_genai_client: MagicMock
+) -> None:
+    """Test: a fast job's images are saved before a slow job finishes."""
+    client = _watched_client(mock_genai_client, {"batches/fast": 1, "batches/slow": 5})
+    service = BatchAPIService(
+        client=client, poll_policy=PollPolicy(min_interval=0.01, age_fraction=0)
+    )
+    completed: list[str] = []
+    slow_image = tmp_path / "slow.png"
+
+    def on_complete(outcome: JobOutcome) -> None:
+        if outcome.job_name == "batches/fast":
+            assert not slow_image.exists()
+        completed.append(outcome.job_name)
+
+    outcomes = asyncio.run(
+        BatchJobWatcher(service).watch(
+            ["batches/slow", "batches/fast"], tmp_path, on_complete=on_complete
+        )
+    )
+
+    assert completed == ["batches/fast", "batches/slow"]
+    assert [o.job_name for o in outcomes] == ["batches/slow", "batches/fast"]
+    assert all(o.results[0].success for o in outcomes)
+    assert slow_image.exists()
+
+
+def test_failed_jobs_report_their_error(tmp_path: Path, mock_genai_client: MagicMock) -> None:
+    """Test: a failed job yields an outcome with its error and no fetch."""
+    client = _watched_client(mock_genai_client, {"batches/bad": 2})
+    service = BatchAPIService(client=client, poll_policy=PollPolicy(min_interval=0.01))
+
+    [outcome] = asyncio.run(BatchJobWatcher(service).watch(["batches/bad"], tmp_path))
+
+    assert outcome.state == "JOB_STATE_FAILED"
+    assert outcome.error_message == "invalid request"
+    assert outcome.results == []
+    assert client.files.download.call_count == 0
+
+
+def test_one_job_failing_does_not_abort_the_others(
+    tmp_path: Path, mock_genai_client: MagicMock
+) -> None:
+    """Test: a job whose polls fail ends with an error; transient errors are retried."""
+    client = _watched_client(mock_genai_client, {"batches/flaky": 2, "batches/gone": 1})
+    get = client.aio.batches.get.side_effect
+    unavailable = genai_errors.ServerError(503, {"error": {"message": "unavailable"}})
+    flaky_failures = [unavailable]
+
+    async def failing_get(name: str) -> MagicMock:
+        if name == "batches/gone":
+            raise genai_errors.ClientError(404, {"error": {"message": "not found"}})
+        if flaky_failures:
+            raise flaky_failures.pop()
+        return await get(name)
+
+    client.aio.batches.get = AsyncMock(side_effect=failing_get)
+    service = BatchAPIService(client=client, poll_policy=PollPolicy(min_interval=0.01))
+    watcher = BatchJobWatcher(service, retry_policy=RetryPolicy(max_retries=2, base_delay=0.01))
+
+    flaky, gone = asyncio.run(watcher.watch(["batches/flaky", "batches/gone"], tmp_path))
+
+    assert flaky.state == "JOB_STATE_SUCCEEDED"
+    assert flaky.error_message is None
+    assert flaky.results[0].success
+    assert gone.state == "JOB_STATE_UNSPECIFIED"
+    assert "not found" in (gone.error_message or "")
+
+
+def _shard_client(mock_genai_client: MagicMock, job_states: dict[str, list[str]]) -> MagicMock:
+    """Client whose jobs report the given sequence of states, one per poll."""
+    created: list[str] = []
+
+    def create(model: str, src: str, config: dict[str, Any]) -> MagicMock:
+        job = MagicMock()
+        job.name = f"batches/{config['display_name']}-{len(created)}"
+        created.append(job.name)
+        return job
+
+    async def get(name: str) -> MagicMock:
+        display_name = name.split("/", 1)[1].rsplit("-", 1)[0]
+        job = MagicMock()
+        job.create_time = None
+        states = job_states[display_name]
+        job.state.name = states.pop(0) if len(states) > 1 else states[0]
+        job.error = "boom" if job.state.name == "JOB_STATE_FAILED" else None
+        job.dest.file_name = f"files/{display_name}"
+        return job
+
+    def sync_get(name: str) -> MagicMock:
+        job = MagicMock()
+        job.state.name = "JOB_STATE_SUCCEEDED"
+        job.dest.file_name = f"files/{name.split('/', 1)[1].rsplit('-', 1)[0]}"
+        return job
+
+    def upload(file: str, config: dict[str, Any]) -> MagicMock:
+        return MagicMock(name=file)
+
+    def download(file: str, destination: str) -> None:
+        key = file.split("/")[1]
+        part = {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(b"x").decode()}}
+        line = {"key": key, "response": {"candidates": [{"content": {"parts": [part]}}]}}
+        Path(destination).write_text(json.dumps(line) + "\n")
+
+    mock_genai_client.files.upload.side_effect = upload
+    mock_genai_client.batches.create.side_effect = create
+    mock_genai_client.aio.batches.get = AsyncMock(side_effect=get)
+    mock_genai_client.batches.get.side_effect = sync_get
+    mock_genai_client.files.download.side_effect = download
+    return mock_genai_client
+
+
+def test_failed_shard_is_resubmitted_alone(tmp_path: Path, mock_genai_client: MagicMock) -> None:
+    """Test: only the failed shard is resubmitted, and each shard is fetched on success."""
+    path = tmp_path / "batch.jsonl"
+    path.write_text("".join(json.dumps({"key": f"k{i}", "request": {}}) + "\n" for i in range(4)))
+    shards = split_batch_file(path, max_requests=2, max_bytes=1024 * 1024)
+
+    client = _shard_client(
+        mock_genai_client,
+        {
+            "batch.shard-0000.jsonl": ["JOB_STATE_RUNNING", "JOB_STATE_SUCCEEDED"],
+            "batch.shard-0001.jsonl": ["JOB_STATE_FAILED", "JOB_STATE_SUCCEEDED"],
+        },
+    )
+    service = BatchAPIService(client=client, poll_policy=PollPolicy(min_interval=0.01))
+    completed: list[str] = []
+
+    service.submit_shards(shards)
+    outcomes = asyncio.run(
+        BatchJobWatcher(service).watch_shards(
+            shards, tmp_path / "out", on_complete=lambda o: completed.append(o.job_name)
+        )
+    )
+
+    assert [s.state for s in shards] == ["JOB_STATE_SUCCEEDED", "JOB_STATE_SUCCEEDED"]
+    assert [s.submissions for s in shards] == [1, 2]
+    assert client.batches.create.call_count == 3
+    assert sorted(completed) == sorted(o.job_name for o in outcomes)
+    assert all(o.results[0].success for o in outcomes)
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == [
+        "batch.shard-0000.jsonl.png",
+        "batch.shard-0001.jsonl.png",
+    ]
+
+
+def test_shard_gives_up_after_max_resubmits(tmp_path: Path, mock_genai_client: MagicMock) -> None:
+    """Test: a shard that keeps failing stops after max_resubmits resubmissions."""
+    path = tmp_path / "batch.jsonl"
+    path.write_text("{}\n")
+    shard = BatchShard(index=0, path=path, request_count=1, size_bytes=3)
+
+    client = _shard_client(mock_genai_client, {"batch.jsonl": ["JOB_STATE_FAILED"]})
+    service = BatchAPIService(client=client, poll_policy=PollPolicy(min_interval=0.01))
+
+    service.submit_shards([shard])
+    [outcome] = asyncio.run(
+        BatchJobWatcher(service).watch_shards([shard], tmp_path / "out", max_resubmits=1)
+    )
+
+    assert shard.state == "JOB_STATE_FAILED"
+    assert shard.submissions == 2
+    assert shard.error_message == "boom"
+    assert outcome.error_message == "boom"
+    assert client.files.download.call_count == 0
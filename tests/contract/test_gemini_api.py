@@ -209,3 +209,144 @@ def test_generate_max_input_images(
     assert len(contents) == 4  # prompt + 3 images
 
     assert response.success is True
+
+
+def test_gemini_service_acquires_before_generate(
+    mock_genai_client: MagicMock, mock_success_response: MagicMock
+) -> None:
+    """Test ID: test_gemini_service_acquires_before_generate.
+
+    Mock: QuotaLimiter passed to GeminiService
+    Assert: one request and one image token taken per generate_content call
+    """
+    from src.services.quota_service import QuotaLimiter
+
+    mock_genai_client.models.generate_content.return_value = mock_success_response
+    limiter = MagicMock(spec=QuotaLimiter)
+
+    GeminiService(client=mock_genai_client, quota_limiter=limiter).generate_image(
+        ImageGenerationRequest(prompt="Test")
+    )
+
+    limiter.acquire.assert_called_once_with(requests=1, images=1)
+
+
+def test_generate_typed_server_error_is_retried(
+    mock_genai_client: MagicMock, mock_success_response: MagicMock
+) -> None:
+    """Test ID: test_generate_typed_server_error_is_retried.
+
+    Mock: API raises the SDK's typed 503 ServerError, then succeeds
+    Assert: request is retried and the response records two attempts
+    """
+    from unittest.mock import patch
+
+    from google.genai import errors as genai_errors
+
+    from src.models.retry import RetryPolicy
+
+    server_error = genai_errors.ServerError(
+        503, {"error": {"code": 503, "message": "Overloaded", "status": "UNAVAILABLE"}}
+    )
+    mock_genai_client.models.generate_content.side_effect = [server_error, mock_success_response]
+
+    service = GeminiService(
+        client=mock_genai_client,
+        retry_policy=RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01),
+    )
+
+    with patch("src.services.retry_service.time.sleep"):
+        response = service.generate_image(ImageGenerationRequest(prompt="Test"))
+
+    assert response.success is True
+    assert response.attempts == 2
+    assert mock_genai_client.models.generate_content.call_count == 2
+
+
+def test_generate_typed_rate_limit_reads_retry_delay(mock_genai_client: MagicMock) -> None:
+    """Test ID: test_generate_typed_rate_limit_reads_retry_delay.
+
+    Mock: API raises the SDK's typed 429 ClientError with a RetryInfo detail
+    Assert: raises APIRateLimitError carrying the server's retry hint
+    """
+    from google.genai import errors as genai_errors
+
+    from src.models.exceptions import APIRateLimitError
+
+    rate_limit_error = genai_errors.ClientError(
+        429,
+        {
+            "error": {
+                "code": 429,
+                "message": "Quota exceeded",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [
+                    {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"}
+                ],
+            }
+        },
+    )
+    mock_genai_client.models.generate_content.side_effect = rate_limit_error
+
+    service = GeminiService(client=mock_genai_client)
+
+    with pytest.raises(APIRateLimitError) as exc_info:
+        service.generate_image(ImageGenerationRequest(prompt="Test"))
+
+    assert exc_info.value.retry_after == 17.0
+
+
+def _text_chunk(text: str) -> MagicMock:
+    chunk = MagicMock()
+    part = MagicMock()
+    part.text = text
+    chunk.parts = [part]
+    return chunk
+
+
+def test_stream_returns_at_image_part_and_skips_trailing_text(
+    mock_genai_client: MagicMock, mock_success_response: MagicMock
+) -> None:
+    """Test ID: test_stream_returns_at_image_part_and_skips_trailing_text.
+
+    Mock: generate_content_stream yields text, the image, then more text
+    Assert: the image is returned without consuming the trailing chunk
+    Assert: time-to-first-byte and time-to-image are both recorded
+    """
+    consumed: list[str] = []
+
+    def stream(**kwargs: object) -> object:
+        consumed.append("intro")
+        yield _text_chunk("Here is your image")
+        consumed.append("image")
+        yield mock_success_response
+        consumed.append("trailing")
+        yield _text_chunk("Hope you like it")
+
+    mock_genai_client.models.generate_content_stream.side_effect = stream
+
+    service = GeminiService(client=mock_genai_client, stream=True)
+    response = service.generate_image(ImageGenerationRequest(prompt="A blue sky"))
+
+    mock_genai_client.models.generate_content.assert_not_called()
+    assert response.image_data == mock_success_response.parts[0].inline_data.data
+    assert consumed == ["intro", "image"]
+    assert response.ttfb is not None
+    assert response.time_to_image is not None
+    assert 0 <= response.ttfb <= response.time_to_image
+
+
+def test_stream_without_image_raises(mock_genai_client: MagicMock) -> None:
+    """Test ID: test_stream_without_image_raises.
+
+    Mock: generate_content_stream yields only text
+    Assert: raises APIResponseError
+    """
+    mock_genai_client.models.generate_content_stream.return_value = iter(
+        [_text_chunk("I can't draw that")]
+    )
+
+    service = GeminiService(client=mock_genai_client, stream=True)
+
+    with pytest.raises(APIResponseError):
+        service.generate_image(ImageGenerationRequest(prompt="Something"))
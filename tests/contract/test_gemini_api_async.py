@@ -0,0 +1,82 @@
+"""Contract tests for the async Gemini API integration."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.models.exceptions import APIRateLimitError
+from src.models.request import ImageGenerationRequest
+from src.services.gemini_service import AsyncGeminiService
+
+
+def test_async_generate_single_image_success(
+    mock_genai_client: MagicMock, mock_success_response: MagicMock
+) -> None:
+    """Test ID: test_async_generate_single_image_success.
+
+    Mock: client.aio.models.generate_content resolves to a valid PNG response
+    Assert: the async client (not the blocking one) is called with model and prompt
+    Assert: returns ImageGenerationResponse(success=True) with valid image_data
+    """
+    mock_genai_client.aio.models.generate_content = AsyncMock(return_value=mock_success_response)
+
+    service = AsyncGeminiService(client=mock_genai_client)
+    request = ImageGenerationRequest(prompt="A blue sky")
+
+    response = asyncio.run(service.generate_image(request))
+
+    mock_genai_client.aio.models.generate_content.assert_awaited_once()
+    mock_genai_client.models.generate_content.assert_not_called()
+    call_kwargs = mock_genai_client.aio.models.generate_content.call_args.kwargs
+    assert call_kwargs["model"] == "gemini-3-pro-image-preview"
+    assert "A blue sky" in str(call_kwargs["contents"])
+
+    assert response.success is True
+    assert len(response.image_data) > 0
+
+
+def test_async_generate_rate_limit_error(mock_genai_client: MagicMock) -> None:
+    """Test ID: test_async_generate_rate_limit_error.
+
+    Mock: async API raises 429 rate limit error
+    Assert: raises APIRateLimitError, same mapping as the blocking service
+    """
+    mock_genai_client.aio.models.generate_content = AsyncMock(
+        side_effect=Exception("429 Too Many Requests")
+    )
+
+    service = AsyncGeminiService(client=mock_genai_client)
+    request = ImageGenerationRequest(prompt="An image")
+
+    with pytest.raises(APIRateLimitError):
+        asyncio.run(service.generate_image(request))
+
+
+def test_async_stream_returns_first_image(
+    mock_genai_client: MagicMock, mock_success_response: MagicMock
+) -> None:
+    """Test ID: test_async_stream_returns_first_image.
+
+    Mock: client.aio.models.generate_content_stream resolves to an async chunk iterator
+    Assert: the image chunk is returned with time-to-first-byte and time-to-image
+    """
+    closed: list[bool] = []
+
+    async def chunks() -> AsyncIterator[MagicMock]:
+        try:
+            yield mock_success_response
+            yield MagicMock()  # trailing text, never read
+        finally:
+            closed.append(True)
+
+    mock_genai_client.aio.models.generate_content_stream = AsyncMock(return_value=chunks())
+
+    service = AsyncGeminiService(client=mock_genai_client, stream=True)
+    response = asyncio.run(service.generate_image(ImageGenerationRequest(prompt="A blue sky")))
+
+    assert response.image_data == mock_success_response.parts[0].inline_data.data
+    assert response.ttfb is not None
+    assert response.time_to_image is not None
+    assert closed == [True]
@@ -1,5 +1,6 @@
 """Shared fixtures for integration tests."""
 
+from io import BytesIO
 from pathlib import Path
 from typing import Any
 from unittest.mock import MagicMock
@@ -25,12 +26,16 @@ def mock_gemini_success() -> Any:
     """Mock successful Gemini API response."""
     # Create a valid PNG image
     img = Image.new("RGB", (100, 100), color="blue")
+    img_bytes = BytesIO()
+    img.save(img_bytes, "PNG")
 
     # Mock response structure with new API (parts property)
     response = MagicMock()
     part = MagicMock()
     part.text = None
-    part.as_image.return_value = img
+    part.thought = None
+    part.inline_data.data = img_bytes.getvalue()
+    part.inline_data.mime_type = "image/png"
 
     response.parts = [part]
 
@@ -0,0 +1,84 @@
+"""Integration test: asyncio batch generation."""
+
+import asyncio
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.models.config import GenerationConfig
+from src.models.exceptions import APIError
+from src.services.batch_service import generate_batch_async
+from src.services.gemini_service import AsyncGeminiService
+from src.services.image_service import ImageService
+from src.utils.path_utils import PathAllocator
+
+
+def test_async_batch_bounds_in_flight_requests(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test that generate_batch_async respects the semaphore and keeps index order."""
+    in_flight = 0
+    peak_in_flight = 0
+    call_count = 0
+
+    async def fake_generate_content(*args: object, **kwargs: object) -> MagicMock:
+        nonlocal in_flight, peak_in_flight, call_count
+        call_count += 1
+        current = call_count
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if current == 2:
+            raise APIError("Simulated API failure")
+        return mock_gemini_success
+
+    mock_client = MagicMock()
+    mock_client.aio.models.generate_content = fake_generate_content
+
+    config = GenerationConfig(
+        prompt="Test",
+        output_path=tmp_path / "img.png",
+        batch_count=10,
+        api_key="test_key",
+    )
+
+    results = asyncio.run(
+        generate_batch_async(
+            config, AsyncGeminiService(client=mock_client), ImageService(), concurrency=4
+        )
+    )
+
+    assert peak_in_flight == 4
+    assert [r.index for r in results] == list(range(10))
+    assert sum(1 for r in results if not r.success) == 1
+    assert all(r.output_path.exists() for r in results if r.success)
+
+
+def test_async_batch_reserves_paths_off_the_event_loop(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mock_gemini_success: MagicMock
+) -> None:
+    """Test that slot and final-extension path reservations don't block the loop thread."""
+    monkeypatch.chdir(tmp_path)
+    # A JPEG response renames each default-named .png slot, reserving a second path
+    mock_gemini_success.parts[0].inline_data.mime_type = "image/jpeg"
+    mock_client = MagicMock()
+    mock_client.aio.models.generate_content = AsyncMock(return_value=mock_gemini_success)
+    config = GenerationConfig(prompt="Test", batch_count=3, api_key="test_key")
+    allocate = PathAllocator.allocate
+    threads: list[threading.Thread] = []
+
+    def record_thread(self: PathAllocator, path: Path) -> Path:
+        threads.append(threading.current_thread())
+        return allocate(self, path)
+
+    with patch.object(PathAllocator, "allocate", record_thread):
+        results = asyncio.run(
+            generate_batch_async(config, AsyncGeminiService(client=mock_client), ImageService())
+        )
+
+    assert all(r.success and r.output_path.suffix == ".jpg" for r in results)
+    assert len(threads) == 6
+    assert threading.main_thread() not in threads
@@ -0,0 +1,77 @@
+"""Integration test: Concurrent batch generation."""
+
+import os
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.models.config import GenerationConfig
+from src.models.exceptions import APIError
+from src.services.batch_service import generate_batch
+from src.services.gemini_service import GeminiService
+from src.services.image_service import ImageService
+
+
+def test_batch_runs_requests_concurrently(tmp_path: Path, mock_gemini_success: MagicMock) -> None:
+    """Test that --concurrency keeps several requests in flight at once."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    # Both calls must be in flight together for the barrier to release
+    barrier = threading.Barrier(2, timeout=5)
+
+    def side_effect_wait(*args: object, **kwargs: object) -> MagicMock:
+        barrier.wait()
+        return mock_gemini_success
+
+    output_path = tmp_path / "art.png"
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.side_effect = side_effect_wait
+        mock_client_class.return_value = mock_client
+
+        exit_code = main(
+            ["--prompt", "Art", "--out", str(output_path), "--batch", "2", "--concurrency", "2"]
+        )
+
+    assert exit_code == 0
+    assert (tmp_path / "art_1.png").exists()
+    assert (tmp_path / "art_2.png").exists()
+
+
+def test_concurrent_batch_preserves_order_and_isolates_failures(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test that results come back in index order and one failure doesn't cancel others."""
+    lock = threading.Lock()
+    call_count = 0
+
+    def side_effect_fail_third(*args: object, **kwargs: object) -> MagicMock:
+        nonlocal call_count
+        with lock:
+            call_count += 1
+            current = call_count
+        if current == 3:
+            raise APIError("Simulated API failure")
+        return mock_gemini_success
+
+    mock_client = MagicMock()
+    mock_client.models.generate_content.side_effect = side_effect_fail_third
+
+    config = GenerationConfig(
+        prompt="Test",
+        output_path=tmp_path / "img.png",
+        batch_count=5,
+        api_key="test_key",
+    )
+
+    results = generate_batch(
+        config, GeminiService(client=mock_client), ImageService(), concurrency=4
+    )
+
+    assert [r.index for r in results] == [0, 1, 2, 3, 4]
+    assert [r.output_path.name for r in results] == [f"img_{i}.png" for i in range(1, 6)]
+    assert sum(1 for r in results if r.success) == 4
+    assert sum(1 for r in results if not r.success) == 1
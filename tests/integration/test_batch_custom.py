@@ -35,3 +35,33 @@ def test_batch_with_custom_path(tmp_path: Path, mock_gemini_success: MagicMock)
         img = Image.open(tmp_path / f"art_{i}.png")
         assert img.format == "PNG"
         img.close()
+
+
+def test_batch_group_durability_places_every_image(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test: group commits, including the final partial group, place every image."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client_class.return_value.models.generate_content.return_value = mock_gemini_success
+
+        exit_code = main(
+            [
+                "--prompt",
+                "Art",
+                "--out",
+                str(tmp_path / "art.png"),
+                "--batch",
+                "3",
+                "--durability",
+                "group",
+                "--durability-group",
+                "2",
+            ]
+        )
+
+    assert exit_code == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["art_1.png", "art_2.png", "art_3.png"]
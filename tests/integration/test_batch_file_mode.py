@@ -0,0 +1,83 @@
+"""Integration test: sharded Batch API runs from a JSONL file."""
+
+import base64
+import json
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.models.poll import PollPolicy
+
+
+def _results_file(key: str) -> str:
+    part = {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(b"png").decode()}}
+    return json.dumps({"key": key, "response": {"candidates": [{"content": {"parts": [part]}}]}})
+
+
+def test_each_shard_is_saved_as_soon_as_it_succeeds(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test: a fast shard's images are written while a slower shard is still running."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+    monkeypatch.chdir(tmp_path)
+    batch_file = tmp_path / "batch.jsonl"
+    batch_file.write_text(
+        "".join(json.dumps({"key": f"k{i}", "request": {}}) + "\n" for i in range(2))
+    )
+    polls = {"batches/0": 0, "batches/1": 0}
+    fast_saved_first: list[bool] = []
+
+    def create(model: str, src: str, config: dict[str, str]) -> MagicMock:
+        job = MagicMock()
+        job.name = f"batches/{config['display_name'][-7]}"
+        return job
+
+    def job(name: str) -> MagicMock:
+        batch_job = MagicMock()
+        batch_job.create_time = None
+        batch_job.error = None
+        slow_running = name == "batches/0" and polls[name] < 3
+        batch_job.state.name = "JOB_STATE_RUNNING" if slow_running else "JOB_STATE_SUCCEEDED"
+        batch_job.dest.file_name = f"files/{name.split('/')[1]}"
+        return batch_job
+
+    async def get(name: str) -> MagicMock:
+        polls[name] += 1
+        if name == "batches/0" and polls[name] == 3:
+            fast_saved_first.append((tmp_path / "batch_results" / "k1.png").exists())
+        return job(name)
+
+    def download(file: str, destination: str) -> None:
+        Path(destination).write_text(_results_file(f"k{file[-1]}") + "\n")
+
+    client = MagicMock()
+    client.batches.create.side_effect = create
+    client.batches.get.side_effect = job
+    client.aio.batches.get = AsyncMock(side_effect=get)
+    client.files.download.side_effect = download
+
+    from src.cli.main import main
+
+    with (
+        patch("src.services.batch_api_service.genai.Client", return_value=client),
+        patch(
+            "src.services.batch_api_service.PollPolicy",
+            return_value=PollPolicy(min_interval=0.01, age_fraction=0),
+        ),
+    ):
+        exit_code = main(
+            [
+                "--batch-file",
+                str(batch_file),
+                "--shard-max-requests",
+                "1",
+                "--ledger-file",
+                str(tmp_path / "jobs.db"),
+            ]
+        )
+
+    assert exit_code == 0
+    assert fast_saved_first == [True]
+    assert sorted(p.name for p in (tmp_path / "batch_results").iterdir()) == ["k0.png", "k1.png"]
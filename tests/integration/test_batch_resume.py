@@ -0,0 +1,72 @@
+"""Integration test: reattaching to batch jobs recorded in the job ledger."""
+
+import base64
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.cli.main import main
+from src.services.batch_api_service import BatchAPIService
+from src.services.ledger_service import JobLedger
+
+
+def _results_file(key: str, data: bytes) -> str:
+    part = {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(data).decode()}}
+    return json.dumps({"key": key, "response": {"candidates": [{"content": {"parts": [part]}}]}})
+
+
+def test_created_jobs_are_recorded_before_polling(tmp_path: Path) -> None:
+    """Test that create_batch_from_file writes the job to the ledger immediately."""
+    client = MagicMock()
+    client.batches.create.return_value.name = "batches/new"
+    ledger = JobLedger(tmp_path / "jobs.db")
+    source = tmp_path / "in.jsonl"
+    source.write_text("{}\n")
+
+    BatchAPIService(client=client, ledger=ledger).create_batch_from_file(source)
+
+    entry = ledger.get("batches/new")
+    assert entry is not None
+    assert entry.state == "JOB_STATE_PENDING"
+    assert entry.source_file == source.resolve()
+
+
+def test_resume_fetches_without_resubmitting(tmp_path: Path) -> None:
+    """Test that `anyimg batch resume` waits for recorded jobs and downloads their results."""
+    ledger_file = tmp_path / "jobs.db"
+    ledger = JobLedger(ledger_file)
+    ledger.record("batches/running", tmp_path / "a.jsonl", state="JOB_STATE_RUNNING")
+    ledger.record("batches/done", tmp_path / "b.jsonl", state="JOB_STATE_SUCCEEDED")
+
+    def get(name: str) -> MagicMock:
+        job = MagicMock()
+        job.state.name = "JOB_STATE_SUCCEEDED"
+        job.error = None
+        job.dest.file_name = f"files/{name.split('/')[1]}"
+        return job
+
+    def download(file: str, destination: str) -> None:
+        key = file.split("/")[1]
+        Path(destination).write_text(_results_file(key, key.encode()) + "\n")
+
+    mock_client = MagicMock()
+    mock_client.batches.get.side_effect = get
+    mock_client.aio.batches.get = AsyncMock(side_effect=get)
+    mock_client.files.download.side_effect = download
+
+    out_dir = tmp_path / "results"
+    with patch("src.services.batch_api_service.genai.Client", return_value=mock_client):
+        exit_code = main(
+            ["batch", "resume", "--ledger-file", str(ledger_file), "--out-dir", str(out_dir)]
+        )
+
+    assert exit_code == 0
+    assert mock_client.batches.create.call_count == 0
+    assert (out_dir / "running.png").read_bytes() == b"running"
+    assert (out_dir / "done.png").read_bytes() == b"done"
+    assert ledger.list_jobs(include_fetched=False) == []
+
+    # A second resume has nothing left to download
+    with patch("src.services.batch_api_service.genai.Client", return_value=mock_client):
+        assert main(["batch", "resume", "--ledger-file", str(ledger_file)]) == 0
+    assert mock_client.files.download.call_count == 2
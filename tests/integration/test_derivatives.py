@@ -0,0 +1,56 @@
+"""Integration test: downsized derivatives saved next to generated images."""
+
+import os
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from src.models.encode_options import EncodeOptions
+from src.services import encoder_service
+from src.services.encoder_service import render_image
+
+
+def test_derivatives_written_next_to_image(tmp_path: Path, mock_gemini_success: MagicMock) -> None:
+    """Test: --derivatives writes one downsized copy per size beside the original."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        exit_code = main(
+            ["--prompt", "Icon", "--out", str(tmp_path / "icon.png"), "--derivatives", "32,64"]
+        )
+
+    assert exit_code == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "icon.png",
+        "icon_32px.png",
+        "icon_64px.png",
+    ]
+    with Image.open(tmp_path / "icon_32px.png") as img:
+        assert img.size == (32, 32)
+    with Image.open(tmp_path / "icon.png") as img:
+        assert img.size == (100, 100)
+
+
+def test_render_decodes_once_at_draft_scale() -> None:
+    """Test: all sizes come from one decode, a JPEG decoded at reduced scale."""
+    source = Image.new("RGB", (2000, 1000), color="teal")
+    buffer = BytesIO()
+    source.save(buffer, "JPEG")
+
+    with patch.object(encoder_service.Image, "open", wraps=Image.open) as image_open:
+        encoded, derived = render_image(
+            buffer.getvalue(), EncodeOptions(format="webp"), reencode=False, edges=(512, 128)
+        )
+
+    assert image_open.call_count == 1
+    assert encoded is None
+    sizes = [Image.open(BytesIO(data)).size for data in derived]
+    assert sizes == [(512, 256), (128, 64)]
@@ -0,0 +1,71 @@
+"""Integration test: API image bytes are written without re-encoding."""
+
+import os
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+
+def _jpeg_response() -> tuple[MagicMock, bytes]:
+    """Build a mock API response carrying JPEG bytes."""
+    img_bytes = BytesIO()
+    Image.new("RGB", (64, 64), color="orange").save(img_bytes, "JPEG")
+    jpeg_data = img_bytes.getvalue()
+
+    response = MagicMock()
+    part = MagicMock()
+    part.text = None
+    part.thought = None
+    part.inline_data.data = jpeg_data
+    part.inline_data.mime_type = "image/jpeg"
+    response.parts = [part]
+
+    return response, jpeg_data
+
+
+def test_default_name_follows_response_mime_type(tmp_path: Path) -> None:
+    """Test that a JPEG response is saved byte-for-byte with a .jpg extension."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    response, jpeg_data = _jpeg_response()
+    original_cwd = Path.cwd()
+    os.chdir(tmp_path)
+
+    try:
+        with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+            mock_client_class.return_value.models.generate_content.return_value = response
+
+            exit_code = main(["--prompt", "Orange square"])
+
+        assert exit_code == 0
+        generated_files = list(tmp_path.glob("anyimg_*"))
+        assert len(generated_files) == 1
+        assert generated_files[0].suffix == ".jpg"
+        assert generated_files[0].read_bytes() == jpeg_data
+
+    finally:
+        os.chdir(original_cwd)
+
+
+def test_explicit_extension_transcodes(tmp_path: Path) -> None:
+    """Test that an explicit --out extension for another format triggers transcoding."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    response, _ = _jpeg_response()
+    output_path = tmp_path / "square.png"
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client_class.return_value.models.generate_content.return_value = response
+
+        exit_code = main(["--prompt", "Orange square", "--out", str(output_path)])
+
+    assert exit_code == 0
+    img = Image.open(output_path)
+    assert img.format == "PNG"
+    img.close()
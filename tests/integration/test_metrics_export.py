@@ -0,0 +1,50 @@
+"""Integration test: exporting run metrics with --metrics-out."""
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+def test_metrics_out_records_every_stage(
+    tmp_path: Path, mock_gemini_success: MagicMock, temp_test_images: list[Path]
+) -> None:
+    """Test that a run's JSON metrics cover each pipeline stage and the run's throughput."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    metrics_path = tmp_path / "metrics" / "run.json"
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        exit_code = main(
+            [
+                "--prompt",
+                "Art",
+                "--in",
+                str(temp_test_images[0]),
+                "--out",
+                str(tmp_path / "art.png"),
+                "--batch",
+                "3",
+                "--concurrency",
+                "3",
+                "--metrics-out",
+                str(metrics_path),
+            ]
+        )
+
+    assert exit_code == 0
+    metrics = json.loads(metrics_path.read_text())
+    assert metrics["requests"] == 3
+    assert metrics["succeeded"] == 3
+    assert metrics["images_per_second"] > 0
+    assert set(metrics["stages"]) == {"input_load", "request_build", "api", "extract", "write"}
+    for stage in metrics["stages"].values():
+        assert stage["count"] == 3
+        assert stage["p50"] <= stage["p95"] <= stage["p99"] <= stage["max"]
+    assert metrics["latency"]["request"]["count"] == 3
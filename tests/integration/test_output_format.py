@@ -0,0 +1,104 @@
+"""Integration test: re-encoding saved images with --format."""
+
+import base64
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from src.models.encode_options import EncodeOptions
+from src.services.batch_api_service import BatchAPIService
+from src.services.encoder_service import encode_image
+from src.services.image_service import ImageService
+
+
+def _noise_png(edge: int = 128) -> bytes:
+    image = Image.frombytes("RGB", (edge, edge), os.urandom(edge * edge * 3))
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_format_flag_reencodes_batch(tmp_path: Path, mock_gemini_success: MagicMock) -> None:
+    """Test: --format webp writes WebP files, renaming a custom path's extension to match."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        exit_code = main(
+            [
+                "--prompt",
+                "Patterns",
+                "--out",
+                str(tmp_path / "art.png"),
+                "--batch",
+                "2",
+                "--format",
+                "webp",
+                "--quality",
+                "60",
+            ]
+        )
+
+    assert exit_code == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["art_1.webp", "art_2.webp"]
+    with Image.open(tmp_path / "art_1.webp") as img:
+        assert img.format == "WEBP"
+
+
+def test_batch_api_results_use_output_format(tmp_path: Path) -> None:
+    """Test: Batch API results are encoded by the same engine as inline ones."""
+    png = _noise_png()
+    result: dict[str, Any] = {
+        "key": "req-1",
+        "response": {
+            "candidates": [
+                {
+                    "content": {
+                        "parts": [
+                            {
+                                "inlineData": {
+                                    "mimeType": "image/png",
+                                    "data": base64.b64encode(png).decode("ascii"),
+                                }
+                            }
+                        ]
+                    }
+                }
+            ]
+        },
+    }
+    image_service = ImageService(encode_options=EncodeOptions(format="jpeg", quality=70))
+    service = BatchAPIService(client=MagicMock(), image_service=image_service)
+
+    try:
+        [saved] = service.save_batch_images([result], tmp_path)
+    finally:
+        image_service.close()
+
+    assert saved.success
+    assert saved.output_path == tmp_path / "req-1.jpg"
+    with Image.open(saved.output_path) as img:
+        assert img.format == "JPEG"
+
+
+def test_quality_and_effort_shrink_output() -> None:
+    """Test: lower quality yields smaller lossy files, and every format round-trips."""
+    png = _noise_png()
+
+    high = encode_image(png, EncodeOptions(format="webp", quality=95, effort=6))
+    low = encode_image(png, EncodeOptions(format="webp", quality=30, effort=6))
+    assert len(low) < len(high)
+
+    for fmt, pil_format in (("png", "PNG"), ("jpeg", "JPEG"), ("avif", "AVIF")):
+        encoded = encode_image(png, EncodeOptions(format=fmt, effort=9))
+        with Image.open(BytesIO(encoded)) as img:
+            assert img.format == pil_format
@@ -0,0 +1,147 @@
+"""Integration test: generating many distinct prompts from one prompts file."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.models.prompt_row import PromptRow
+from src.services.batch_service import iter_prompt_row_results
+from src.services.gemini_service import GeminiService
+from src.services.image_service import ImageService
+
+
+def _prompt_of(call_kwargs: dict[str, object]) -> object:
+    """Prompt text sent in a generate_content call (alone, or first of text + images)."""
+    contents = call_kwargs["contents"]
+    return contents if isinstance(contents, str) else contents[0]  # type: ignore[index]
+
+
+def test_prompts_file_generates_each_row_with_one_client(
+    tmp_path: Path, mock_gemini_success: MagicMock, temp_test_images: list[Path]
+) -> None:
+    """Test that every row gets its own prompt, options and output through one client."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    prompts_file = tmp_path / "prompts.jsonl"
+    rows = [
+        {"key": "hero", "prompt": "Hero shot", "aspect_ratio": "16:9"},
+        {"prompt": "Detail shot", "images": [str(temp_test_images[0])], "resolution": "2K"},
+        {"prompt": "Custom path", "output": str(tmp_path / "custom" / "shot.png")},
+    ]
+    prompts_file.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+    out_dir = tmp_path / "shots"
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        exit_code = main(
+            ["--prompts", str(prompts_file), "--out", str(out_dir), "--concurrency", "2"]
+        )
+
+    assert exit_code == 0
+    assert mock_client_class.call_count == 1
+    assert mock_client.models.generate_content.call_count == 3
+    assert (out_dir / "hero.png").exists()
+    assert (out_dir / "request-2.png").exists()
+    assert (tmp_path / "custom" / "shot.png").exists()
+
+    calls = mock_client.models.generate_content.call_args_list
+    prompts = {_prompt_of(call.kwargs) for call in calls}
+    assert prompts == {"Hero shot", "Detail shot", "Custom path"}
+
+
+def test_prompts_file_rejects_bad_row_before_generating(tmp_path: Path) -> None:
+    """Test that a malformed row fails the run before any request is sent."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    prompts_file = tmp_path / "prompts.jsonl"
+    prompts_file.write_text('{"prompt": "ok"}\n{"prompt": "bad", "aspect_ratio": "7:3"}\n')
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        exit_code = main(["--prompts", str(prompts_file), "--out", str(tmp_path)])
+
+    assert exit_code == 2
+    mock_client_class.return_value.models.generate_content.assert_not_called()
+
+
+def test_row_results_are_yielded_as_rows_complete(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test that a finished row is reported while a slower row is still in flight."""
+    release_slow = threading.Event()
+
+    def generate(*args: object, **kwargs: object) -> MagicMock:
+        if _prompt_of(kwargs) == "slow":
+            assert release_slow.wait(timeout=5)
+        return mock_gemini_success
+
+    rows = [PromptRow(key="slow", prompt="slow"), PromptRow(key="fast", prompt="fast")]
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client_class.return_value.models.generate_content.side_effect = generate
+        results = iter_prompt_row_results(
+            rows, GeminiService(), ImageService(), tmp_path, concurrency=2
+        )
+
+        first = next(results)
+        assert first.key == "fast"
+        assert (tmp_path / "fast.png").exists()
+        assert not (tmp_path / "slow.png").exists()
+
+        release_slow.set()
+        rest = list(results)
+
+    assert [r.key for r in rest] == ["slow"]
+    assert all(r.success for r in [first, *rest])
+
+
+def test_rows_never_overwrite_existing_or_each_other(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test that an existing file and a second row with the same output are renamed."""
+    (tmp_path / "hero.png").write_bytes(b"keep me")
+    shared = tmp_path / "shared.png"
+    rows = [
+        PromptRow(key="hero", prompt="Hero"),
+        PromptRow(key="a", prompt="A", output_path=shared),
+        PromptRow(key="b", prompt="B", output_path=shared),
+    ]
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client_class.return_value.models.generate_content.return_value = mock_gemini_success
+        results = sorted(
+            iter_prompt_row_results(rows, GeminiService(), ImageService(), tmp_path),
+            key=lambda r: r.index,
+        )
+
+    assert [r.output_path.name for r in results] == ["hero_1.png", "shared.png", "shared_1.png"]
+    assert (tmp_path / "hero.png").read_bytes() == b"keep me"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "hero.png",
+        "hero_1.png",
+        "shared.png",
+        "shared_1.png",
+    ]
+
+
+def test_options_prompts_mode_ignores_are_rejected(tmp_path: Path) -> None:
+    """Test that --in, --batch and --cache-dir are usage errors with --prompts."""
+    from src.cli.main import main
+
+    prompts_file = tmp_path / "prompts.txt"
+    prompts_file.write_text("A fox\n")
+
+    for extra in (["--in", "ref.png"], ["--batch", "3"], ["--cache-dir", str(tmp_path)]):
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--prompts", str(prompts_file), *extra])
+        assert exc_info.value.code == 2
@@ -0,0 +1,68 @@
+"""Integration test: response cache short-circuits identical requests."""
+
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+def test_cache_hit_skips_api_call(tmp_path: Path, mock_gemini_success: MagicMock) -> None:
+    """Test that a repeated request is served from --cache-dir without an API call."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    cache_dir = tmp_path / "cache"
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        first = main(
+            ["--prompt", "Cat", "--out", str(tmp_path / "a.png"), "--cache-dir", str(cache_dir)]
+        )
+        second = main(
+            ["--prompt", "Cat", "--out", str(tmp_path / "b.png"), "--cache-dir", str(cache_dir)]
+        )
+
+        assert mock_client.models.generate_content.call_count == 1
+
+        refreshed = main(
+            [
+                "--prompt",
+                "Cat",
+                "--out",
+                str(tmp_path / "c.png"),
+                "--cache-dir",
+                str(cache_dir),
+                "--refresh",
+            ]
+        )
+
+        assert mock_client.models.generate_content.call_count == 2
+
+    assert first == second == refreshed == 0
+    assert (tmp_path / "a.png").read_bytes() == (tmp_path / "b.png").read_bytes()
+    assert (tmp_path / "c.png").exists()
+
+
+def test_batch_variants_are_cached_separately(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test that --batch N caches N variants rather than one image N times."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    from src.cli.main import main
+
+    cache_dir = tmp_path / "cache"
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        args = ["--prompt", "Dog", "--out", str(tmp_path / "dog.png"), "--batch", "3"]
+        main(args + ["--cache-dir", str(cache_dir)])
+
+    assert mock_client.models.generate_content.call_count == 3
+    assert len(list(cache_dir.glob("*/*.png"))) == 3
@@ -0,0 +1,128 @@
+"""Integration test: running CLI jobs on an ``anyimg serve`` daemon."""
+
+import http.client
+import json
+import os
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services.daemon_service import GenerationDaemon
+from src.services.remote_service import token_path
+
+
+@contextmanager
+def _serving(daemon: GenerationDaemon) -> Generator[GenerationDaemon]:
+    """Run a daemon on a background thread for the duration of the block."""
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield daemon
+    finally:
+        daemon.shutdown()
+        daemon.close()
+        thread.join()
+
+
+def test_jobs_share_one_warm_client(
+    tmp_path: Path, mock_gemini_success: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test: successive --server runs reuse the daemon's client, writing where they ran."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    monkeypatch.chdir(work_dir)
+    socket_path = tmp_path / "anyimg.sock"
+
+    from src.cli.main import main
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.models.generate_content.return_value = mock_gemini_success
+        mock_client_class.return_value = mock_client
+
+        with _serving(GenerationDaemon(socket_path=socket_path, concurrency=4)):
+            assert socket_path.stat().st_mode & 0o077 == 0
+            first = main(["--server", str(socket_path), "--prompt", "A", "--out", "a.png"])
+            second = main(
+                ["--server", str(socket_path), "--prompt", "B", "--batch", "3", "--out", "b.png"]
+            )
+
+    assert (first, second) == (0, 0)
+    assert mock_client_class.call_count == 1
+    assert mock_client.models.generate_content.call_count == 4
+    assert sorted(p.name for p in work_dir.iterdir()) == ["a.png", "b_1.png", "b_2.png", "b_3.png"]
+    assert not socket_path.exists()
+
+
+def test_prompt_rows_stream_over_tcp(
+    tmp_path: Path,
+    mock_gemini_success: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test: a prompts file's relative paths resolve against the client's directory."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    Path("prompts.txt").write_text("First\nSecond\n")
+
+    from src.cli.main import main
+
+    with patch("src.services.gemini_service.genai.Client") as mock_client_class:
+        mock_client_class.return_value.models.generate_content.return_value = mock_gemini_success
+
+        with _serving(GenerationDaemon(port=0)) as daemon:
+            exit_code = main(
+                ["--server", daemon.address, "--prompts", "prompts.txt", "--out", "shots"]
+            )
+
+    assert exit_code == 0
+    assert sorted(p.name for p in (tmp_path / "shots").iterdir()) == [
+        "request-1.png",
+        "request-2.png",
+    ]
+    assert "2 successful, 0 failed" in capsys.readouterr().out
+    assert not list((tmp_path / "cache").rglob("*.token"))
+
+
+def test_tcp_jobs_require_the_daemon_token(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test: on a port, only a client that can read the owner-only token file is served."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    with _serving(GenerationDaemon(port=0, api_key="test_key")) as daemon:
+        port = int(daemon.address.rsplit(":", 1)[1])
+        assert token_path(port).stat().st_mode & 0o777 == 0o600
+
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        try:
+            connection.request("POST", "/jobs", body="{}", headers={"Authorization": "Bearer x"})
+            response = connection.getresponse()
+            event = json.loads(response.readline())
+        finally:
+            connection.close()
+
+    assert response.status == 401
+    assert event["error"]["exit_code"] == 1
+
+
+def test_errors_keep_cli_exit_codes(tmp_path: Path) -> None:
+    """Test: daemon errors and an unreachable daemon exit as the local CLI would."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+    bad_prompts = tmp_path / "prompts.jsonl"
+    bad_prompts.write_text("not json\n")
+    socket_path = tmp_path / "anyimg.sock"
+
+    from src.cli.main import main
+
+    with _serving(GenerationDaemon(socket_path=socket_path)):
+        invalid = main(["--server", str(socket_path), "--prompts", str(bad_prompts)])
+
+    unreachable = main(["--server", str(socket_path), "--prompt", "Test"])
+
+    assert invalid == 2
+    assert unreachable == 1
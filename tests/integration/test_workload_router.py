@@ -0,0 +1,135 @@
+"""Integration test: routing one workload across inline generation and the Batch API."""
+
+import asyncio
+import base64
+import json
+import os
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.models.poll import PollPolicy
+from src.models.prompt_row import PromptRow
+from src.services.batch_api_service import BatchAPIService
+from src.services.gemini_service import GeminiService
+from src.services.image_service import ImageService
+from src.services.ledger_service import JobLedger
+from src.services.quota_service import QuotaLimiter
+from src.services.router_service import WorkloadRouter, plan_routes
+
+
+def _batch_client(tmp_path: Path) -> MagicMock:
+    """Client that accepts one batch job and returns an image for every submitted key."""
+    client = MagicMock()
+    submitted: list[str] = []
+
+    def upload(file: str, config: Any) -> MagicMock:
+        submitted.extend(json.loads(line)["key"] for line in Path(file).read_text().splitlines())
+        return MagicMock()
+
+    def job(name: str) -> MagicMock:
+        batch_job = MagicMock()
+        batch_job.state.name = "JOB_STATE_SUCCEEDED"
+        batch_job.error = None
+        batch_job.create_time = None
+        batch_job.dest.file_name = "files/results"
+        return batch_job
+
+    def download(file: str, destination: str) -> None:
+        data = base64.b64encode(b"batch-image").decode()
+        part = {"inlineData": {"mimeType": "image/png", "data": data}}
+        lines = [
+            json.dumps({"key": key, "response": {"candidates": [{"content": {"parts": [part]}}]}})
+            for key in submitted
+        ]
+        Path(destination).write_text("\n".join(lines) + "\n")
+
+    client.files.upload.side_effect = upload
+    client.batches.create.return_value.name = "batches/routed"
+    client.batches.get.side_effect = job
+    client.aio.batches.get = AsyncMock(side_effect=job)
+    client.files.download.side_effect = download
+    return client
+
+
+def test_router_runs_both_paths_and_merges_results(
+    tmp_path: Path, mock_gemini_success: MagicMock
+) -> None:
+    """Test that urgent rows run inline, bulk rows via batch, merged in workload order."""
+    inline_client = MagicMock()
+    inline_client.models.generate_content.return_value = mock_gemini_success
+    batch_client = _batch_client(tmp_path)
+    ledger = JobLedger(tmp_path / "jobs.db")
+
+    router = WorkloadRouter(
+        GeminiService(client=inline_client),
+        ImageService(),
+        BatchAPIService(client=batch_client, ledger=ledger, poll_policy=PollPolicy(min_interval=0)),
+        ledger=ledger,
+        concurrency=2,
+        min_batch_size=2,
+    )
+    rows = [
+        PromptRow(key="bulk-1", prompt="Bulk one"),
+        PromptRow(key="preview", prompt="Preview", deadline=30),
+        PromptRow(key="bulk-2", prompt="Bulk two", output_path=tmp_path / "custom" / "b2.png"),
+    ]
+    out_dir = tmp_path / "out"
+
+    plan = router.plan(rows, deadline=None)
+    assert [r.key for r in plan.inline] == ["preview"]
+
+    results = asyncio.run(router.run(plan, out_dir))
+
+    assert [(r.index, r.key, r.success) for r in results] == [
+        (0, "bulk-1", True),
+        (1, "preview", True),
+        (2, "bulk-2", True),
+    ]
+    assert inline_client.models.generate_content.call_count == 1
+    assert (out_dir / "bulk-1.png").read_bytes() == b"batch-image"
+    assert (tmp_path / "custom" / "b2.png").read_bytes() == b"batch-image"
+    assert not (out_dir / "bulk-2.png").exists()
+    assert (out_dir / "preview.png").exists()
+
+    # Observed latencies feed the next plan
+    assert ledger.typical_latency("inline") is not None
+    assert ledger.typical_latency("batch") is not None
+
+
+def test_route_command_limits_batch_creation_by_the_quota(tmp_path: Path) -> None:
+    """Test: batch route hands its batch job the same quota limiter as inline calls."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+    prompts = tmp_path / "prompts.txt"
+    prompts.write_text("A cat\n")
+    router = MagicMock()
+    router.plan.return_value = plan_routes([PromptRow(key="k", prompt="A cat")], deadline=None)
+    router.run = AsyncMock(return_value=[])
+
+    from src.cli.main import main
+
+    with (
+        patch("src.services.router_service.WorkloadRouter", return_value=router) as router_cls,
+        patch("src.services.batch_api_service.genai.Client"),
+        patch("src.services.gemini_service.genai.Client"),
+    ):
+        exit_code = main(
+            [
+                "batch",
+                "route",
+                str(prompts),
+                "--rpm",
+                "10",
+                "--quota-file",
+                str(tmp_path / "quota.json"),
+                "--ledger-file",
+                str(tmp_path / "jobs.db"),
+                "--out-dir",
+                str(tmp_path / "out"),
+            ]
+        )
+
+    assert exit_code == 0
+    gemini_service, _, batch_api = router_cls.call_args.args
+    assert isinstance(batch_api.quota_limiter, QuotaLimiter)
+    assert batch_api.quota_limiter is gemini_service.quota_limiter
@@ -0,0 +1,223 @@
+"""Throughput benchmark: anyimg against a local fake Gemini endpoint.
+
+Runs the real services and the real ``genai.Client`` (pointed at FakeGeminiServer via
+ClientOptions.base_url) over a grid of concurrency levels and batch sizes, for both the
+inline ``generate_batch`` path and the Batch API flow (build, upload, create, poll,
+download, save). Every scenario runs in a fresh child process so CPU time and peak RSS
+belong to that scenario alone; the fake server runs in the parent and is not counted.
+
+Usage:
+    python -m tests.performance.benchmark --concurrency 1,4,16 --batch-sizes 16,64 \\
+        --latency lognormal:0.2,0.4 --image-edge 1024
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from tests.performance.fake_gemini import FakeGeminiServer, LatencyModel
+
+INLINE = "inline"
+BATCH_API = "batch-api"
+MODES = (INLINE, BATCH_API)
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one scenario."""
+
+    mode: str
+    concurrency: int
+    batch_size: int
+    succeeded: int
+    wall_time: float
+    images_per_second: float
+    p50_latency: float | None
+    p99_latency: float | None
+    cpu_seconds: float
+    peak_rss_mb: float
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_inline(concurrency: int, batch_size: int, workdir: Path) -> tuple[int, list[float]]:
+    from src.models.config import GenerationConfig
+    from src.services.batch_service import generate_batch
+    from src.services.gemini_service import GeminiService
+    from src.services.image_service import ImageService
+
+    config = GenerationConfig.from_args(
+        prompt="benchmark",
+        output_path=str(workdir / "image.png"),
+        batch_count=batch_size,
+        concurrency=concurrency,
+        no_cache=True,
+    )
+    results = generate_batch(config, GeminiService(), ImageService(), concurrency)
+    latencies = [r.duration for r in results if r.success and r.duration is not None]
+    return sum(1 for r in results if r.success), latencies
+
+
+def _run_batch_api(concurrency: int, batch_size: int, workdir: Path) -> tuple[int, list[float]]:
+    from src.models.poll import PollPolicy
+    from src.models.prompt_row import PromptRow
+    from src.services.batch_api_service import BatchAPIService
+    from src.services.batch_builder_service import BatchBuilder
+
+    started = time.perf_counter()
+    rows = (PromptRow(key=f"request-{i + 1}", prompt="benchmark") for i in range(batch_size))
+    BatchBuilder().build(rows, workdir / "batch.jsonl")
+
+    service = BatchAPIService(poll_policy=PollPolicy(min_interval=0.05, age_fraction=0.1))
+    job_name = service.create_batch_from_file(workdir / "batch.jsonl")
+    service.poll_batch_status(job_name, request_count=batch_size)
+    results = service.save_batch_images(
+        service.iter_batch_results(job_name), workdir / "out", max_workers=concurrency
+    )
+
+    # Every image in a batch job arrives at once, so each one's latency is the job's
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for r in results if r.success)
+    return succeeded, [elapsed] * succeeded
+
+
+def _scenario(mode: str, base_url: str, concurrency: int, batch_size: int) -> dict[str, Any]:
+    """Child-process entry point: run one scenario and measure it."""
+    from src.models.client_options import ClientOptions
+    from src.services.client_service import configure_client
+    from src.services.metrics_service import summarize
+
+    os.environ["GEMINI_API_KEY"] = "benchmark"
+    configure_client(ClientOptions(pool_size=max(concurrency, 10), base_url=base_url))
+    runner = _run_inline if mode == INLINE else _run_batch_api
+
+    with tempfile.TemporaryDirectory(prefix="anyimg-bench-") as tmp:
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+        started = time.perf_counter()
+        succeeded, latencies = runner(concurrency, batch_size, Path(tmp))
+        wall_time = time.perf_counter() - started
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    summary = summarize(latencies)
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (
+        usage_after.ru_stime - usage_before.ru_stime
+    )
+    return asdict(
+        BenchmarkResult(
+            mode=mode,
+            concurrency=concurrency,
+            batch_size=batch_size,
+            succeeded=succeeded,
+            wall_time=wall_time,
+            images_per_second=succeeded / wall_time if wall_time > 0 else 0.0,
+            p50_latency=summary.p50 if summary else None,
+            p99_latency=summary.p99 if summary else None,
+            cpu_seconds=cpu,
+            peak_rss_mb=_peak_rss_mb(),
+        )
+    )
+
+
+def run_benchmark(
+    server: FakeGeminiServer,
+    modes: tuple[str, ...] = MODES,
+    concurrency_levels: tuple[int, ...] = (1, 4, 16),
+    batch_sizes: tuple[int, ...] = (16,),
+) -> list[BenchmarkResult]:
+    """Run every mode x concurrency x batch size scenario against a running fake server.
+
+    Args:
+        server: Started FakeGeminiServer
+        modes: Pipelines to exercise (INLINE and/or BATCH_API)
+        concurrency_levels: Worker counts (requests in flight inline; save threads for
+            the Batch API)
+        batch_sizes: Images per scenario
+
+    Returns:
+        One BenchmarkResult per scenario, in run order
+    """
+    context = multiprocessing.get_context("spawn")
+    results: list[BenchmarkResult] = []
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for mode in modes:
+            for batch_size in batch_sizes:
+                for concurrency in concurrency_levels:
+                    args = (mode, server.base_url, concurrency, batch_size)
+                    results.append(BenchmarkResult(**pool.apply(_scenario, args)))
+    return results
+
+
+def format_table(results: list[BenchmarkResult]) -> str:
+    """Render results as a fixed-width text table."""
+
+    def seconds(value: float | None) -> str:
+        return "-" if value is None else f"{value:.3f}"
+
+    header = (
+        f"{'mode':<10}{'conc':>6}{'batch':>7}{'ok':>6}{'wall s':>9}{'img/s':>9}"
+        f"{'p50 s':>8}{'p99 s':>8}{'cpu s':>8}{'rss MB':>9}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.mode:<10}{r.concurrency:>6}{r.batch_size:>7}{r.succeeded:>6}"
+            f"{r.wall_time:>9.3f}{r.images_per_second:>9.2f}"
+            f"{seconds(r.p50_latency):>8}{seconds(r.p99_latency):>8}"
+            f"{r.cpu_seconds:>8.3f}{r.peak_rss_mb:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> tuple[int, ...]:
+    return tuple(int(v) for v in value.split(","))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=(__doc__ or "").split("\n\n")[0])
+    parser.add_argument("--modes", default=",".join(MODES), help="inline,batch-api")
+    parser.add_argument("--concurrency", type=_int_list, default=(1, 4, 16))
+    parser.add_argument("--batch-sizes", type=_int_list, default=(16,))
+    parser.add_argument(
+        "--latency",
+        type=LatencyModel.parse,
+        default=LatencyModel("lognormal", (0.2, 0.4)),
+        help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA (seconds)",
+    )
+    parser.add_argument("--image-edge", type=int, default=1024, help="Response PNG edge in px")
+    parser.add_argument("--batch-latency", type=float, default=1.0, help="Batch job runtime")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    modes = tuple(m for m in args.modes.split(",") if m)
+    if unknown := set(modes) - set(MODES):
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+
+    server = FakeGeminiServer(args.latency, args.image_edge, args.batch_latency).start()
+    try:
+        results = run_benchmark(server, modes, args.concurrency, args.batch_sizes)
+    finally:
+        server.stop()
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(f"latency={args.latency} image_edge={args.image_edge}px")
+        print(format_table(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
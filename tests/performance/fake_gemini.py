@@ -0,0 +1,252 @@
+"""Local HTTP stand-in for the Gemini endpoints anyimg uses, for benchmarks.
+
+Serves generateContent, streamGenerateContent (SSE), the Files API resumable upload
+and download, and batchGenerateContent/batches.get, so the real ``genai.Client`` can be
+pointed at it through ``ClientOptions(base_url=...)``. Each response waits for a delay
+drawn from a configurable latency distribution and returns a real PNG of a configurable
+size.
+"""
+
+import base64
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Any, cast
+
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Server-side delay distribution, parsed from specs like ``lognormal:1.5,0.4``.
+
+    Kinds: ``fixed:S`` (always S seconds), ``uniform:LO,HI``, and ``lognormal:MEDIAN,SIGMA``
+    (heavy right tail, like real generation latency).
+    """
+
+    kind: str
+    params: tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse a ``kind:param[,param]`` spec."""
+        kind, _, raw = spec.partition(":")
+        params = tuple(float(p) for p in raw.split(",") if p)
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"invalid latency spec: {spec!r}")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one delay in seconds."""
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        median, sigma = self.params
+        return rng.lognormvariate(0.0, sigma) * median
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+def make_png(edge: int, seed: int = 0) -> bytes:
+    """Build an ``edge`` x ``edge`` noise PNG (noise keeps it near real output sizes)."""
+    rng = random.Random(seed)
+    image = Image.frombytes("RGB", (edge, edge), rng.randbytes(edge * edge * 3))
+    buffer = BytesIO()
+    image.save(buffer, "PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+@dataclass
+class _State:
+    image_b64: str
+    latency: LatencyModel
+    batch_latency: float
+    rng: random.Random = field(default_factory=lambda: random.Random(0))
+    files: dict[str, bytes] = field(default_factory=dict[str, bytes])
+    uploads: dict[str, str] = field(default_factory=dict[str, str])
+    jobs: dict[str, tuple[float, str]] = field(default_factory=dict[str, tuple[float, str]])
+    ids: "itertools.count[int]" = field(default_factory=itertools.count)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    requests: int = 0
+
+    def next_id(self) -> int:
+        with self.lock:
+            return next(self.ids)
+
+    def delay(self) -> None:
+        with self.lock:
+            self.requests += 1
+            seconds = self.latency.sample(self.rng)
+        time.sleep(seconds)
+
+
+def _candidate(parts: list[dict[str, Any]]) -> dict[str, Any]:
+    return {"candidates": [{"content": {"role": "model", "parts": parts}}]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+    @property
+    def state(self) -> _State:
+        return cast("FakeGeminiServer", self.server).state
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self._send(200, b"")
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?")[0]
+        state = self.state
+
+        if path.endswith(":generateContent"):
+            state.delay()
+            image = {"inlineData": {"mimeType": "image/png", "data": state.image_b64}}
+            self._send_json(_candidate([{"text": "Here you go."}, image]))
+        elif path.endswith(":streamGenerateContent"):
+            self._stream(state)
+        elif path.endswith(":batchGenerateContent"):
+            self._create_batch(state, json.loads(body))
+        elif path.endswith("/files") and "upload" in path:
+            upload_id = f"u{state.next_id()}"
+            state.uploads[upload_id] = (
+                json.loads(body or b"{}")
+                .get("file", {})
+                .get("mimeType", "application/octet-stream")
+            )
+            host = self.headers["Host"]
+            self._send(200, b"{}", {"x-goog-upload-url": f"http://{host}/upload/{upload_id}"})
+        elif path.startswith("/upload/"):
+            name = f"files/{path.rsplit('/', 1)[1]}"
+            state.files[name] = body
+            file = {"name": name, "uri": f"http://fake/{name}", "sizeBytes": str(len(body))}
+            self._send_json({"file": file}, {"x-goog-upload-status": "final"})
+        else:
+            self._send(404, b"{}")
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        state = self.state
+
+        if match := re.search(r"(batches/[^/:]+)$", path):
+            self._send_json(self._batch(state, match.group(1)))
+        elif match := re.search(r"(files/[^/:]+):download$", path):
+            self._send(200, state.files.get(match.group(1), b""))
+        else:
+            self._send(404, b"{}")
+
+    def _stream(self, state: _State) -> None:
+        state.delay()
+        chunks = [
+            _candidate([{"text": "Here"}]),
+            _candidate([{"inlineData": {"mimeType": "image/png", "data": state.image_b64}}]),
+            _candidate([{"text": " is your image."}]),
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                event = f"data: {json.dumps(chunk)}\r\n\r\n".encode()
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # Client stopped reading after the image
+
+    def _create_batch(self, state: _State, body: dict[str, Any]) -> None:
+        input_name = body["batch"]["inputConfig"]["fileName"]
+        image = {"inlineData": {"mimeType": "image/png", "data": state.image_b64}}
+        lines: list[str] = []
+        for line in state.files.get(input_name, b"").decode().splitlines():
+            if line.strip():
+                key = json.loads(line).get("key")
+                lines.append(json.dumps({"key": key, "response": _candidate([image])}))
+        output_name = f"files/batch-output-{state.next_id()}"
+        state.files[output_name] = ("\n".join(lines) + "\n").encode()
+
+        job_name = f"batches/{state.next_id()}"
+        state.jobs[job_name] = (time.monotonic() + state.batch_latency, output_name)
+        self._send_json(self._batch(state, job_name))
+
+    def _batch(self, state: _State, job_name: str) -> dict[str, Any]:
+        ready_at, output_name = state.jobs[job_name]
+        metadata: dict[str, Any] = {"state": "BATCH_STATE_RUNNING"}
+        if time.monotonic() >= ready_at:
+            metadata = {"state": "BATCH_STATE_SUCCEEDED", "output": {"responsesFile": output_name}}
+        return {"name": job_name, "metadata": metadata}
+
+    def _send_json(self, payload: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        self._send(200, json.dumps(payload).encode(), headers, "application/json")
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+        content_type: str = "application/octet-stream",
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    """Threaded fake Gemini endpoint on an ephemeral localhost port."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        image_edge: int = 256,
+        batch_latency: float = 0.5,
+    ) -> None:
+        """Initialize and bind the server (call ``start`` to serve).
+
+        Args:
+            latency: Delay before each generation response (default: fixed 50 ms)
+            image_edge: Edge in pixels of the PNG every response returns
+            batch_latency: Seconds until a created batch job reports success
+        """
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.state = _State(
+            image_b64=base64.b64encode(make_png(image_edge)).decode(),
+            latency=latency or LatencyModel("fixed", (0.05,)),
+            batch_latency=batch_latency,
+        )
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to pass as ClientOptions.base_url."""
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def start(self) -> "FakeGeminiServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
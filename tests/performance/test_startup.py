@@ -0,0 +1,69 @@
+"""Startup benchmark: guards CLI cold-start import time."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import budget for src.cli.main; override on slow CI machines
+STARTUP_BUDGET_MS = float(os.environ.get("ANYIMG_STARTUP_BUDGET_MS", "100"))
+
+HEAVY_MODULES = ("google.genai", "PIL", "pydantic", "rich")
+
+
+def _import_times(*args: str) -> tuple[int, dict[str, int]]:
+    """Run python -X importtime and return (exit code, cumulative microseconds per module)."""
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (field.strip() for field in line.split(":", 1)[1].split("|"))
+        times[name] = int(cumulative)
+
+    return proc.returncode, times
+
+
+def test_cli_import_within_budget() -> None:
+    """Test: importing the CLI entry point stays under the startup budget."""
+    _, times = _import_times("-c", "import src.cli.main")
+
+    assert "src.cli.main" in times
+    assert times["src.cli.main"] / 1000 < STARTUP_BUDGET_MS
+
+
+def test_help_skips_heavy_imports() -> None:
+    """Test: --help never imports the SDK, Pillow, pydantic or Rich."""
+    exit_code, times = _import_times("-m", "src", "--help")
+
+    assert exit_code == 0
+    assert not [m for m in times if m.startswith(HEAVY_MODULES)]
+
+
+def test_validation_error_skips_sdk() -> None:
+    """Test: a validation failure exits without importing the SDK or Pillow."""
+    exit_code, times = _import_times("-m", "src", "--prompt", "Test", "--batch", "0")
+
+    assert exit_code != 0
+    assert not [m for m in times if m.startswith(("google.genai", "PIL", "rich"))]
+
+
+def test_server_client_skips_sdk(tmp_path: Path) -> None:
+    """Test: --server client mode forwards the run without importing the SDK or Pillow."""
+    exit_code, times = _import_times(
+        "-m", "src", "--server", str(tmp_path / "missing.sock"), "--prompt", "Test"
+    )
+
+    assert exit_code == 1  # Nothing is listening
+    assert not [m for m in times if m.startswith(("google.genai", "PIL", "rich"))]
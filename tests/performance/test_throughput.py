@@ -0,0 +1,46 @@
+"""Throughput benchmark: guards concurrency scaling and the Batch API round trip."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from tests.performance.benchmark import BATCH_API, INLINE, format_table, run_benchmark
+from tests.performance.fake_gemini import FakeGeminiServer, LatencyModel
+
+
+@pytest.fixture
+def fake_gemini() -> Iterator[FakeGeminiServer]:
+    """Fake endpoint with a fixed 100 ms generation latency and small images."""
+    server = FakeGeminiServer(LatencyModel.parse("fixed:0.1"), image_edge=64, batch_latency=0.2)
+    yield server.start()
+    server.stop()
+
+
+def test_latency_spec_parsing() -> None:
+    """Test: latency specs parse into models and malformed specs are rejected."""
+    assert LatencyModel.parse("uniform:0.1,0.3") == LatencyModel("uniform", (0.1, 0.3))
+    with pytest.raises(ValueError):
+        LatencyModel.parse("lognormal:1.0")
+
+
+def test_concurrency_scales_throughput(fake_gemini: FakeGeminiServer) -> None:
+    """Test: eight workers finish a batch of eight well over twice as fast as one."""
+    serial, parallel = run_benchmark(
+        fake_gemini, modes=(INLINE,), concurrency_levels=(1, 8), batch_sizes=(8,)
+    )
+
+    assert serial.succeeded == parallel.succeeded == 8
+    assert parallel.images_per_second > 2 * serial.images_per_second, format_table(
+        [serial, parallel]
+    )
+    assert parallel.p99_latency is not None and parallel.cpu_seconds > 0
+
+
+def test_batch_api_round_trip(fake_gemini: FakeGeminiServer) -> None:
+    """Test: the Batch API flow uploads, polls, downloads and saves every image."""
+    (result,) = run_benchmark(
+        fake_gemini, modes=(BATCH_API,), concurrency_levels=(4,), batch_sizes=(6,)
+    )
+
+    assert result.succeeded == 6
+    assert result.peak_rss_mb > 0
@@ -0,0 +1,128 @@
+"""Unit tests for atomic image writes and durability modes."""
+
+import errno
+import os
+import stat
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.models.exceptions import FileSystemError
+from src.services.image_service import ImageService
+from src.utils.atomic_write import DurableWriter, link_atomic
+
+
+def test_save_replaces_atomically_without_leftovers(tmp_path: Path) -> None:
+    """Test: an image replaces the old file in one step and no temp file remains."""
+    target = tmp_path / "image.png"
+    target.write_bytes(b"old")
+
+    ImageService().save_image(b"new image", target)
+
+    assert target.read_bytes() == b"new image"
+    assert stat.S_IMODE(target.stat().st_mode) == 0o644
+    assert [p.name for p in tmp_path.iterdir()] == ["image.png"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path: Path) -> None:
+    """Test: a write that fails before the rename leaves the old file and no temp file."""
+    target = tmp_path / "image.png"
+    target.write_bytes(b"old")
+
+    with patch("src.utils.atomic_write.os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(FileSystemError):
+            ImageService().save_image(b"new image", target)
+
+    assert target.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["image.png"]
+
+
+def test_link_replaces_placeholder_in_one_step(tmp_path: Path) -> None:
+    """Test: a link takes over a claimed placeholder without freeing the name first."""
+    source = tmp_path / "cached.png"
+    source.write_bytes(b"cached image")
+    target = tmp_path / "out.png"
+    target.touch()
+
+    with patch("src.utils.atomic_write.os.unlink") as unlink:
+        link_atomic(source, target)
+
+    unlink.assert_not_called()
+    assert target.stat().st_ino == source.stat().st_ino
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cached.png", "out.png"]
+
+
+def test_link_copies_only_across_filesystems(tmp_path: Path) -> None:
+    """Test: EXDEV falls back to an atomic copy; other link errors are raised."""
+    source = tmp_path / "cached.png"
+    source.write_bytes(b"cached image")
+    target = tmp_path / "out.png"
+
+    with patch("src.utils.atomic_write.os.link", side_effect=OSError(errno.EXDEV, "xdev")):
+        link_atomic(source, target)
+    assert target.read_bytes() == b"cached image"
+    assert target.stat().st_ino != source.stat().st_ino
+
+    other = tmp_path / "other.png"
+    with patch("src.utils.atomic_write.os.link", side_effect=OSError(errno.EIO, "io")):
+        with pytest.raises(OSError):
+            link_atomic(source, other)
+    assert not other.exists()
+
+
+def test_file_durability_fsyncs_every_image(tmp_path: Path) -> None:
+    """Test: 'file' mode flushes each image and its directory before returning."""
+    writer = DurableWriter("file")
+
+    with patch("src.utils.atomic_write.os.fsync", wraps=os.fsync) as fsync:
+        for i in range(3):
+            writer.write(tmp_path / f"{i}.png", b"png")
+
+    assert fsync.call_count == 6  # File plus directory, per image
+
+
+def test_group_durability_flushes_once_per_group(tmp_path: Path) -> None:
+    """Test: 'group' mode places files only at each commit, after fsyncing each of them."""
+    writer = DurableWriter("group", group_size=2)
+
+    with patch("src.utils.atomic_write.os.fsync", wraps=os.fsync) as fsync:
+        for i in range(5):
+            writer.write(tmp_path / f"{i}.png", b"png")
+        assert fsync.call_count == 6  # Per group: each file, then the directory once
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            ".4.png.pending",
+            "0.png",
+            "1.png",
+            "2.png",
+            "3.png",
+        ]
+
+        writer.flush()
+        writer.flush()
+
+    assert fsync.call_count == 8
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{i}.png" for i in range(5)]
+
+
+def test_group_durability_stages_links(tmp_path: Path) -> None:
+    """Test: a link in 'group' mode replaces its destination when the group commits."""
+    source = tmp_path / "cached.png"
+    source.write_bytes(b"cached image")
+    target = tmp_path / "out.png"
+    target.write_bytes(b"old")
+    writer = DurableWriter("group", group_size=10)
+
+    writer.link(source, target)
+    assert target.read_bytes() == b"old"
+
+    writer.flush()
+
+    assert target.stat().st_ino == source.stat().st_ino
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cached.png", "out.png"]
+
+
+def test_unknown_durability_rejected() -> None:
+    """Test: an unknown durability mode is a configuration error."""
+    with pytest.raises(ValueError):
+        DurableWriter("eventually")
@@ -0,0 +1,70 @@
+"""Unit tests for splitting batch input files into shards."""
+
+import json
+from pathlib import Path
+
+from src.services.batch_api_service import split_batch_file
+
+
+def _write_requests(path: Path, count: int, keyed: bool = True) -> None:
+    lines: list[str] = []
+    for i in range(count):
+        request = {"request": {"contents": [{"parts": [{"text": f"prompt {i}"}]}]}}
+        if keyed:
+            request = {"key": f"k{i}", **request}
+        lines.append(json.dumps(request))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_small_file_is_not_copied(tmp_path: Path) -> None:
+    """Test: a file within both limits is submitted as-is."""
+    path = tmp_path / "batch.jsonl"
+    _write_requests(path, 3)
+
+    [shard] = split_batch_file(path, max_requests=10, max_bytes=1024 * 1024)
+
+    assert shard.path == path
+    assert shard.request_count == 3
+    assert not (tmp_path / "batch.shards").exists()
+
+
+def test_split_by_request_count(tmp_path: Path) -> None:
+    """Test: shards hold at most max_requests requests, in source order."""
+    path = tmp_path / "batch.jsonl"
+    _write_requests(path, 5)
+
+    shards = split_batch_file(path, max_requests=2, max_bytes=1024 * 1024)
+
+    assert [s.request_count for s in shards] == [2, 2, 1]
+    keys = [json.loads(line)["key"] for s in shards for line in s.path.read_text().splitlines()]
+    assert keys == ["k0", "k1", "k2", "k3", "k4"]
+    assert all(s.path.parent == tmp_path / "batch.shards" for s in shards)
+    assert all(s.size_bytes == s.path.stat().st_size for s in shards)
+
+
+def test_split_by_size(tmp_path: Path) -> None:
+    """Test: shards stay under max_bytes; an oversized request gets its own shard."""
+    path = tmp_path / "batch.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps({"key": f"k{i}", "request": {"text": "x" * size}})
+            for i, size in enumerate([100, 100, 500, 100])
+        )
+        + "\n"
+    )
+
+    shards = split_batch_file(path, max_requests=100, max_bytes=300)
+
+    assert [s.request_count for s in shards] == [2, 1, 1]
+    assert all(s.size_bytes <= 300 for s in shards if s.request_count > 1)
+
+
+def test_unkeyed_requests_get_positional_keys(tmp_path: Path) -> None:
+    """Test: requests without keys are keyed by their position in the source file."""
+    path = tmp_path / "batch.jsonl"
+    _write_requests(path, 3, keyed=False)
+
+    shards = split_batch_file(path, max_requests=2, max_bytes=1024 * 1024)
+
+    keys = [json.loads(line)["key"] for s in shards for line in s.path.read_text().splitlines()]
+    assert keys == ["request-1", "request-2", "request-3"]
@@ -0,0 +1,120 @@
+"""Unit tests for ClientOptions and the shared client factory."""
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from src.models.client_options import ClientOptions
+from src.models.config import GenerationConfig
+from src.services.batch_api_service import BatchAPIService
+from src.services.client_service import ClientFactory, configure_client
+from src.services.gemini_service import GeminiService
+
+
+@pytest.fixture
+def local_server() -> Iterator[tuple[str, set[int]]]:
+    """Slow local HTTP server recording the client port of every connection it serves."""
+    ports: set[int] = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_HEAD(self) -> None:
+            ports.add(self.client_address[1])
+            time.sleep(0.2)  # Hold the connection so concurrent requests can't share it
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", ports
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_size_matches_concurrency() -> None:
+    """Test: the pool holds one connection per worker, with a floor for small runs."""
+    os.environ["GEMINI_API_KEY"] = "test_key"
+
+    busy = GenerationConfig.from_args(prompt="p", concurrency=32)
+    small = GenerationConfig.from_args(prompt="p", concurrency=2)
+    explicit = GenerationConfig.from_args(prompt="p", concurrency=32, pool_size=8)
+
+    assert ClientOptions.from_config(busy).pool_size == 32
+    assert ClientOptions.from_config(small).pool_size == 10
+    assert ClientOptions.from_config(explicit).pool_size == 8
+
+
+def test_services_share_one_client() -> None:
+    """Test: services without an explicit client all get the same pooled client."""
+    configure_client(ClientOptions(pool_size=24, keepalive_expiry=90))
+
+    with patch("src.services.client_service.genai.Client") as mock_client_class:
+        gemini = GeminiService()
+        batch_api = BatchAPIService()
+
+    assert gemini.client is batch_api.client
+    assert mock_client_class.call_count == 1
+
+    http_options = mock_client_class.call_args.kwargs["http_options"]
+    limits = http_options.async_client_args["limits"]
+    assert limits.max_connections == 24
+    assert limits.max_keepalive_connections == 24
+    assert limits.keepalive_expiry == 90
+    assert http_options.httpx_client is not None
+
+
+def test_reconfiguring_closes_the_previous_pool() -> None:
+    """Test: replacing the shared factory closes the old client's pooled connections."""
+    with patch("src.services.client_service.genai.Client") as mock_client_class:
+        old = configure_client(ClientOptions(pool_size=4))
+        old.get()
+        old_http_client = mock_client_class.call_args.kwargs["http_options"].httpx_client
+
+        configure_client(ClientOptions(pool_size=8))
+
+    assert old_http_client.is_closed
+    assert old.http_client is None
+
+
+def test_prewarm_opens_connections_in_parallel(local_server: tuple[str, set[int]]) -> None:
+    """Test: prewarming opens one socket per worker and later requests reuse them."""
+    base_url, ports = local_server
+    factory = ClientFactory(ClientOptions(pool_size=4, base_url=base_url))
+
+    with patch("src.services.client_service.genai.Client"):
+        started = time.monotonic()
+        opened = factory.prewarm(3)
+        elapsed = time.monotonic() - started
+
+        assert opened == 3
+        assert len(ports) == 3
+        # Three 0.2s requests finished together, not one after another
+        assert elapsed < 0.5
+
+        assert factory.http_client is not None
+        factory.http_client.head(base_url)
+        assert len(ports) == 3
+
+    factory.close()
+
+
+def test_prewarm_tolerates_unreachable_endpoint() -> None:
+    """Test: a failed prewarm is reported, not raised."""
+    factory = ClientFactory(ClientOptions(pool_size=2, base_url="http://127.0.0.1:9/"))
+
+    with patch("src.services.client_service.genai.Client"):
+        assert factory.prewarm() == 0
+
+    factory.close()
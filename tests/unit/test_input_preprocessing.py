@@ -0,0 +1,62 @@
+"""Unit tests for input image preprocessing."""
+
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from src.services.image_service import ImageService
+
+
+def test_oversized_image_is_downsampled(tmp_path: Path) -> None:
+    """Test: images above max_edge are resized and re-encoded as JPEG."""
+    path = tmp_path / "large.png"
+    Image.new("RGB", (3000, 1500), color="red").save(path)
+
+    [part] = ImageService.prepare_input_images([path], max_edge=1000, quality=80)
+
+    assert part.inline_data is not None
+    assert part.inline_data.mime_type == "image/jpeg"
+    with Image.open(BytesIO(part.inline_data.data or b"")) as img:
+        assert img.size == (1000, 500)
+
+
+def test_small_image_passes_through_unchanged(tmp_path: Path) -> None:
+    """Test: images within max_edge are uploaded byte-for-byte."""
+    path = tmp_path / "small.jpg"
+    Image.new("RGB", (200, 100), color="green").save(path)
+
+    [part] = ImageService.prepare_input_images([path], max_edge=1000)
+
+    assert part.inline_data is not None
+    assert part.inline_data.data == path.read_bytes()
+    assert part.inline_data.mime_type == "image/jpeg"
+
+
+def test_alpha_is_preserved_as_png(tmp_path: Path) -> None:
+    """Test: transparent images are re-encoded as PNG rather than JPEG."""
+    path = tmp_path / "logo.png"
+    Image.new("RGBA", (2000, 2000), color=(0, 0, 255, 128)).save(path)
+
+    [part] = ImageService.prepare_input_images([path], max_edge=500)
+
+    assert part.inline_data is not None
+    assert part.inline_data.mime_type == "image/png"
+
+
+def test_preprocessed_images_are_cached_on_disk(tmp_path: Path) -> None:
+    """Test: re-encoded images are cached by file hash and settings."""
+    path = tmp_path / "large.png"
+    Image.new("RGB", (3000, 1500), color="red").save(path)
+    cache_dir = tmp_path / "cache"
+
+    [first] = ImageService.prepare_input_images([path], max_edge=1000, cache_dir=cache_dir)
+    assert len(list((cache_dir / "inputs").glob("*.jpg"))) == 1
+
+    [second] = ImageService.prepare_input_images([path], max_edge=1000, cache_dir=cache_dir)
+    assert first.inline_data is not None and second.inline_data is not None
+    assert first.inline_data.data == second.inline_data.data
+
+    # Different settings produce a separate entry
+    ImageService.prepare_input_images([path], max_edge=500, cache_dir=cache_dir)
+    assert len(list((cache_dir / "inputs").glob("*.jpg"))) == 2
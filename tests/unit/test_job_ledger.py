@@ -0,0 +1,43 @@
+"""Unit tests for the persistent batch job ledger."""
+
+from pathlib import Path
+
+from src.services.ledger_service import JobLedger
+
+
+def test_jobs_persist_across_instances(tmp_path: Path) -> None:
+    """Test: a job recorded by one runner is visible to a later one."""
+    ledger_file = tmp_path / "jobs.db"
+    JobLedger(ledger_file).record("batches/1", tmp_path / "in.jsonl", state="JOB_STATE_PENDING")
+
+    [entry] = JobLedger(ledger_file).list_jobs()
+
+    assert entry.job_name == "batches/1"
+    assert entry.source_file == (tmp_path / "in.jsonl").resolve()
+    assert entry.state == "JOB_STATE_PENDING"
+    assert entry.fetched_at is None
+
+
+def test_state_updates_and_fetch_marking(tmp_path: Path) -> None:
+    """Test: state changes are stored and fetched jobs drop out of the unfetched list."""
+    ledger = JobLedger(tmp_path / "jobs.db")
+    ledger.record("batches/1", tmp_path / "a.jsonl")
+    ledger.record("batches/2", tmp_path / "b.jsonl")
+
+    ledger.update_state("batches/1", "JOB_STATE_FAILED", "quota exceeded")
+    ledger.update_state("batches/2", "JOB_STATE_SUCCEEDED")
+    ledger.mark_fetched("batches/2", tmp_path / "out")
+
+    failed = ledger.get("batches/1")
+    assert failed is not None
+    assert failed.state == "JOB_STATE_FAILED"
+    assert failed.error_message == "quota exceeded"
+
+    assert [e.job_name for e in ledger.list_jobs(include_fetched=False)] == ["batches/1"]
+    fetched = ledger.get("batches/2")
+    assert fetched is not None and fetched.output_dir == (tmp_path / "out").resolve()
+
+
+def test_unknown_job_returns_none(tmp_path: Path) -> None:
+    """Test: looking up a job that was never recorded returns None."""
+    assert JobLedger(tmp_path / "jobs.db").get("batches/missing") is None
@@ -0,0 +1,91 @@
+"""Unit tests for PathAllocator and default output naming."""
+
+import os
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from src.utils.atomic_write import DurableWriter
+from src.utils.path_utils import (
+    PathAllocator,
+    generate_timestamp_filename,
+    reservation_path,
+)
+
+
+def test_continues_after_highest_suffix_with_one_scan(tmp_path: Path) -> None:
+    """Test: a crowded directory is listed once and renames skip straight past it."""
+    (tmp_path / "art.png").touch()
+    for n in range(1, 2001):
+        (tmp_path / f"art_{n}.png").touch()
+
+    allocator = PathAllocator()
+    with patch("src.utils.path_utils.os.scandir", wraps=os.scandir) as scandir:
+        paths = [allocator.allocate(tmp_path / "art.png") for _ in range(3)]
+
+    assert [p.name for p in paths] == ["art_2001.png", "art_2002.png", "art_2003.png"]
+    assert scandir.call_count == 1
+    # Claims are hidden reservations; the output names appear only once written
+    assert not any(p.exists() for p in paths)
+    assert all(reservation_path(p).read_text() == str(os.getpid()) for p in paths)
+
+
+def test_skips_names_created_after_the_scan(tmp_path: Path) -> None:
+    """Test: a name another process took since the scan is skipped, not overwritten."""
+    (tmp_path / "art.png").write_bytes(b"first")
+    allocator = PathAllocator()
+    assert allocator.allocate(tmp_path / "other.png") == tmp_path / "other.png"
+
+    (tmp_path / "art_1.png").write_bytes(b"raced")
+
+    assert allocator.allocate(tmp_path / "art.png") == tmp_path / "art_2.png"
+    assert (tmp_path / "art_1.png").read_bytes() == b"raced"
+
+
+def test_skips_names_staged_for_a_group_commit(tmp_path: Path) -> None:
+    """Test: an image awaiting its group commit keeps its name, before and after a scan."""
+    writer = DurableWriter("group")
+    writer.write(tmp_path / "art.png", b"staged")
+    allocator = PathAllocator()
+    assert allocator.allocate(tmp_path / "art.png") == tmp_path / "art_1.png"
+
+    writer.write(tmp_path / "art_2.png", b"staged")
+
+    assert allocator.allocate(tmp_path / "art.png") == tmp_path / "art_3.png"
+    writer.flush()
+    assert (tmp_path / "art_2.png").read_bytes() == b"staged"
+
+
+def test_release_and_close_drop_reservations(tmp_path: Path) -> None:
+    """Test: released claims lose their reservation but are not handed out again."""
+    allocator = PathAllocator()
+    written = allocator.allocate(tmp_path / "image.png")
+    written.write_bytes(b"png")
+    unused = allocator.allocate(tmp_path / "image.png")
+
+    allocator.release(written)
+    assert allocator.allocate(tmp_path / "image.png") == tmp_path / "image_2.png"
+    allocator.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["image.png"]
+    assert written.read_bytes() == b"png"
+    assert not unused.exists()
+
+
+def test_reservations_of_other_processes(tmp_path: Path) -> None:
+    """Test: a live process's reservation is respected; a dead one's is cleared."""
+    reservation_path(tmp_path / "live.png").write_text(str(os.getppid()))
+    reservation_path(tmp_path / "dead.png").write_text("999999999")
+    allocator = PathAllocator()
+
+    assert allocator.allocate(tmp_path / "live.png") == tmp_path / "live_1.png"
+    assert allocator.allocate(tmp_path / "dead.png") == tmp_path / "dead.png"
+    assert reservation_path(tmp_path / "dead.png").read_text() == str(os.getpid())
+
+
+def test_timestamp_filename_has_milliseconds_and_index() -> None:
+    """Test: default names are stamped to the millisecond and can carry a batch index."""
+    now = datetime(2025, 9, 30, 14, 30, 22, 517000)
+
+    assert generate_timestamp_filename(now=now) == "anyimg_20250930_143022_517.png"
+    assert generate_timestamp_filename(3, now) == "anyimg_20250930_143022_517_3.png"
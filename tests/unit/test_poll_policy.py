@@ -0,0 +1,24 @@
+"""Unit tests for adaptive batch job polling."""
+
+from src.models.poll import PollPolicy
+
+
+def test_young_small_jobs_poll_at_the_floor() -> None:
+    """Test: a fresh single-request job is checked every min_interval."""
+    assert PollPolicy(min_interval=5).interval(age=0, request_count=1) == 5
+
+
+def test_interval_grows_with_age_up_to_the_cap() -> None:
+    """Test: the wait is a fraction of the job's age, capped at max_interval."""
+    policy = PollPolicy(min_interval=5, max_interval=120, age_fraction=0.1)
+
+    assert policy.interval(age=600) == 60
+    assert policy.interval(age=100_000) == 120
+
+
+def test_larger_jobs_start_with_longer_intervals() -> None:
+    """Test: the floor rises with the log of the request count."""
+    policy = PollPolicy(min_interval=5)
+
+    assert policy.interval(age=0, request_count=100) == 15
+    assert policy.interval(age=0, request_count=10_000) > policy.interval(age=0, request_count=100)
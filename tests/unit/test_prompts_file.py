@@ -0,0 +1,93 @@
+"""Unit tests for the prompts file reader."""
+
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src.models.exceptions import InvalidPromptsFileError
+from src.utils.prompts_file import iter_prompt_rows
+
+
+def test_text_file_yields_one_row_per_prompt(tmp_path: Path) -> None:
+    """Test: blank and comment lines are skipped, keys default to the row number."""
+    path = tmp_path / "prompts.txt"
+    path.write_text("# header\nA red fox\n\n  A blue bird  \n")
+
+    rows = list(iter_prompt_rows(path, aspect_ratio="16:9"))
+
+    assert [r.prompt for r in rows] == ["A red fox", "A blue bird"]
+    assert [r.key for r in rows] == ["request-1", "request-2"]
+    assert all(r.aspect_ratio == "16:9" for r in rows)
+
+
+def test_jsonl_rows_override_defaults(tmp_path: Path) -> None:
+    """Test: JSONL rows carry their own key, settings and reference images."""
+    image = tmp_path / "style.png"
+    Image.new("RGB", (10, 10)).save(image)
+    path = tmp_path / "prompts.jsonl"
+    path.write_text(
+        json.dumps({"key": "fox", "prompt": "A fox", "resolution": "4K", "images": [str(image)]})
+        + "\n"
+        + json.dumps({"prompt": "A bird", "output": "out/bird.png"})
+        + "\n"
+    )
+
+    fox, bird = iter_prompt_rows(path, resolution="1K")
+
+    assert fox.key == "fox"
+    assert fox.resolution == "4K"
+    assert fox.input_images == [image]
+    assert bird.key == "request-2"
+    assert bird.resolution == "1K"
+    assert bird.output_path == Path("out/bird.png")
+
+
+def test_rows_are_read_lazily(tmp_path: Path) -> None:
+    """Test: an invalid row is only reported once the reader reaches it."""
+    path = tmp_path / "prompts.jsonl"
+    path.write_text('{"prompt": "ok"}\nnot json\n')
+
+    rows = iter_prompt_rows(path)
+    assert next(rows).prompt == "ok"
+
+    with pytest.raises(InvalidPromptsFileError) as exc_info:
+        next(rows)
+    assert exc_info.value.line_number == 2
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"prompt": ""}',
+        '{"prompt": "x", "aspect_ratio": "7:3"}',
+        '{"prompt": "x", "images": ["missing.png"]}',
+        '["not", "an", "object"]',
+    ],
+)
+def test_invalid_rows_report_line_number(tmp_path: Path, line: str) -> None:
+    """Test: invalid rows raise InvalidPromptsFileError with their line number."""
+    path = tmp_path / "prompts.jsonl"
+    path.write_text('{"prompt": "fine"}\n' + line + "\n")
+
+    with pytest.raises(InvalidPromptsFileError) as exc_info:
+        list(iter_prompt_rows(path))
+
+    assert exc_info.value.line_number == 2
+    assert "line 2" in exc_info.value.message
+
+
+def test_duplicate_keys_are_rejected(tmp_path: Path) -> None:
+    """Test: keys must be unique so results can be matched back to rows."""
+    path = tmp_path / "prompts.jsonl"
+    path.write_text('{"key": "a", "prompt": "x"}\n{"key": "a", "prompt": "y"}\n')
+
+    with pytest.raises(InvalidPromptsFileError, match="duplicate key"):
+        list(iter_prompt_rows(path))
+
+
+def test_missing_file_is_reported(tmp_path: Path) -> None:
+    """Test: an unreadable prompts file raises InvalidPromptsFileError."""
+    with pytest.raises(InvalidPromptsFileError):
+        list(iter_prompt_rows(tmp_path / "nope.txt"))
@@ -0,0 +1,77 @@
+"""Unit tests for QuotaLimiter."""
+
+import asyncio
+import fcntl
+import threading
+from pathlib import Path
+
+from src.services.quota_service import QuotaLimiter
+
+
+def test_requests_bucket_blocks_when_empty(tmp_path: Path) -> None:
+    """Test: requests beyond the per-minute quota must wait."""
+    limiter = QuotaLimiter(requests_per_minute=2, state_path=tmp_path / "quota.json")
+
+    assert limiter.try_acquire(requests=1) == 0.0
+    assert limiter.try_acquire(requests=1) == 0.0
+
+    wait = limiter.try_acquire(requests=1)
+    assert 0.0 < wait <= 30.0
+
+
+def test_images_bucket_is_independent(tmp_path: Path) -> None:
+    """Test: images quota is enforced separately from the requests quota."""
+    limiter = QuotaLimiter(
+        requests_per_minute=100, images_per_minute=1, state_path=tmp_path / "quota.json"
+    )
+
+    assert limiter.try_acquire(requests=1, images=1) == 0.0
+    assert limiter.try_acquire(requests=1, images=1) > 0.0
+    # A call that generates no images is still allowed
+    assert limiter.try_acquire(requests=1, images=0) == 0.0
+
+
+def test_limiters_share_budget_through_state_file(tmp_path: Path) -> None:
+    """Test: two limiters (e.g. two processes) on one state file share one budget."""
+    state_path = tmp_path / "quota.json"
+    first = QuotaLimiter(requests_per_minute=1, state_path=state_path)
+    second = QuotaLimiter(requests_per_minute=1, state_path=state_path)
+
+    assert first.try_acquire(requests=1) == 0.0
+    assert second.try_acquire(requests=1) > 0.0
+
+
+def test_unlimited_limiter_never_waits(tmp_path: Path) -> None:
+    """Test: no configured quota means no waiting and no state file."""
+    state_path = tmp_path / "quota.json"
+    limiter = QuotaLimiter(state_path=state_path)
+
+    assert limiter.try_acquire(requests=5, images=5) == 0.0
+    assert not state_path.exists()
+
+
+def test_async_acquire_leaves_event_loop_free_while_locked(tmp_path: Path) -> None:
+    """Test: waiting on another process's state file lock doesn't stall the event loop."""
+    state_path = tmp_path / "quota.json"
+    limiter = QuotaLimiter(requests_per_minute=10, state_path=state_path)
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def acquire() -> int:
+        await limiter.acquire_async()
+        return ticks
+
+    async def run() -> int:
+        with open(state_path, "a+") as holder:
+            fcntl.flock(holder.fileno(), fcntl.LOCK_EX)
+            threading.Timer(0.3, fcntl.flock, (holder.fileno(), fcntl.LOCK_UN)).start()
+            ticks_when_acquired, _ = await asyncio.gather(acquire(), tick())
+        return ticks_when_acquired
+
+    # Every tick ran while acquire_async was still waiting for the lock
+    assert asyncio.run(run()) == 10
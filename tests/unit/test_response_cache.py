@@ -0,0 +1,85 @@
+"""Unit tests for ResponseCache."""
+
+import gc
+import os
+import weakref
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from src.models.request import ImageGenerationRequest
+from src.services.cache_service import ResponseCache
+
+
+def test_key_depends_on_input_image_content(tmp_path: Path) -> None:
+    """Test: key changes with input image pixels but not with the image object."""
+    cache = ResponseCache(tmp_path, max_bytes=1024)
+    red = Image.new("RGB", (8, 8), color="red")
+
+    key_a = cache.key_for(ImageGenerationRequest(prompt="Test", input_images=[red]))
+    key_b = cache.key_for(
+        ImageGenerationRequest(prompt="Test", input_images=[Image.new("RGB", (8, 8), "red")])
+    )
+    key_c = cache.key_for(
+        ImageGenerationRequest(prompt="Test", input_images=[Image.new("RGB", (8, 8), "blue")])
+    )
+
+    assert key_a == key_b
+    assert key_a != key_c
+
+
+def test_image_digest_memo_does_not_keep_images_alive(tmp_path: Path) -> None:
+    """Test: a hashed input image is freed once the run drops it."""
+    cache = ResponseCache(tmp_path, max_bytes=1024)
+    image = Image.new("RGB", (8, 8), color="red")
+    key = cache.key_for(ImageGenerationRequest(prompt="Test", input_images=[image]))
+    assert cache.key_for(ImageGenerationRequest(prompt="Test", input_images=[image])) == key
+    freed = weakref.ref(image)
+
+    del image
+    gc.collect()
+
+    assert freed() is None
+
+
+def test_replacing_an_entry_counts_only_the_size_change(tmp_path: Path) -> None:
+    """Test: re-storing a key doesn't inflate the running total and rescan for eviction."""
+    cache = ResponseCache(tmp_path, max_bytes=250)
+    key = "ee" + "0" * 62
+    cache.store("aa" + "0" * 62, b"x" * 100, "image/png")
+    cache.store(key, b"x" * 100, "image/png")
+
+    with patch("src.services.cache_service.os.scandir", wraps=os.scandir) as scandir:
+        cache.store(key, b"y" * 100, "image/png")
+        cache.store(key, b"z" * 120, "image/png")
+
+    scandir.assert_not_called()
+    assert (tmp_path / key[:2] / f"{key}.png").read_bytes() == b"z" * 120
+
+
+def test_lru_eviction_removes_oldest_entries(tmp_path: Path) -> None:
+    """Test: exceeding the size cap evicts least recently used entries first."""
+    cache = ResponseCache(tmp_path, max_bytes=250)
+
+    old = cache.store("aa" + "0" * 62, b"x" * 100, "image/png")
+    recent = cache.store("bb" + "0" * 62, b"x" * 100, "image/png")
+    os.utime(old, (1, 1))
+    os.utime(recent, (2, 2))
+
+    # Touching "old" makes it most recently used
+    assert cache.lookup("aa" + "0" * 62) == old
+
+    cache.store("cc" + "0" * 62, b"x" * 100, "image/png")
+
+    assert old.exists()
+    assert not recent.exists()
+
+
+def test_refresh_mode_never_hits(tmp_path: Path) -> None:
+    """Test: a cache opened with read=False stores but never returns entries."""
+    key = "dd" + "0" * 62
+    ResponseCache(tmp_path, max_bytes=1024).store(key, b"data", "image/jpeg")
+
+    assert ResponseCache(tmp_path, max_bytes=1024, read=False).lookup(key) is None
+    assert ResponseCache(tmp_path, max_bytes=1024).lookup(key) is not None
@@ -0,0 +1,87 @@
+"""Unit tests for RetryPolicy and Retrier."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.models.exceptions import (
+    APIError,
+    APIRateLimitError,
+    APIServerError,
+    ConfigurationError,
+)
+from src.models.retry import RetryPolicy
+from src.services.retry_service import Retrier
+
+
+def test_retries_transient_error_then_succeeds() -> None:
+    """Test: transient errors are retried and attempts/wait are reported."""
+    calls = iter([APIServerError(503, "Unavailable"), APIRateLimitError(), b"image"])
+
+    def attempt() -> bytes:
+        outcome = next(calls)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    retrier = Retrier(RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.01))
+    with patch("src.services.retry_service.time.sleep") as mock_sleep:
+        result, attempts, waited = retrier.call(attempt)
+
+    assert result == b"image"
+    assert attempts == 3
+    assert mock_sleep.call_count == 2
+    assert waited == pytest.approx(sum(c.args[0] for c in mock_sleep.call_args_list))
+
+
+def test_permanent_error_is_not_retried() -> None:
+    """Test: non-transient errors propagate after a single attempt."""
+
+    def attempt() -> bytes:
+        raise ConfigurationError("Authentication failed")
+
+    retrier = Retrier(RetryPolicy(max_retries=3))
+    with pytest.raises(ConfigurationError):
+        retrier.call(attempt)
+
+
+def test_retry_after_hint_is_honored() -> None:
+    """Test: backoff never waits less than the server's Retry-After hint."""
+    retrier = Retrier(RetryPolicy(max_retries=1, base_delay=0.01, max_delay=10.0))
+
+    delay = retrier.next_delay(APIRateLimitError(retry_after=7.0), attempt=1)
+
+    assert delay == 7.0
+
+
+def test_oversized_retry_after_hint_gives_up() -> None:
+    """Test: a hint longer than max_delay fails the request without spending budget."""
+    retrier = Retrier(RetryPolicy(max_retries=3, base_delay=0.01, retry_budget=1))
+
+    assert retrier.next_delay(APIRateLimitError(retry_after=3600.0), attempt=1) is None
+    assert retrier.next_delay(APIRateLimitError(retry_after=60.0), attempt=1) == 60.0
+
+
+def test_budget_is_shared_across_requests() -> None:
+    """Test: once the run's retry budget is spent, failures are final."""
+    retrier = Retrier(RetryPolicy(max_retries=5, base_delay=0.01, retry_budget=2))
+    error = APIServerError(500, "Internal")
+
+    assert retrier.next_delay(error, attempt=1) is not None
+    assert retrier.next_delay(error, attempt=1) is not None
+    assert retrier.next_delay(error, attempt=1) is None
+
+
+def test_exhausted_error_records_attempts() -> None:
+    """Test: the final exception carries attempts and total wait."""
+
+    def attempt() -> bytes:
+        raise APIServerError(502, "Bad gateway")
+
+    retrier = Retrier(RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01))
+    with patch("src.services.retry_service.time.sleep"):
+        with pytest.raises(APIError) as exc_info:
+            retrier.call(attempt)
+
+    assert exc_info.value.attempts == 3
+    assert exc_info.value.retry_wait <= 0.02
@@ -0,0 +1,97 @@
+"""Unit tests for routing rows between inline generation and the Batch API."""
+
+from src.models.prompt_row import PromptRow
+from src.services.router_service import plan_routes
+
+
+def _rows(count: int, deadline: float | None = None) -> list[PromptRow]:
+    return [PromptRow(key=f"r{i}", prompt=f"p{i}", deadline=deadline) for i in range(count)]
+
+
+def test_no_deadline_sends_bulk_work_to_batch() -> None:
+    """Test: without a deadline, a large workload rides the Batch API."""
+    plan = plan_routes(_rows(50), deadline=None, min_batch_size=20)
+
+    assert plan.inline == []
+    assert len(plan.batch) == 50
+
+
+def test_deadline_shorter_than_batch_turnaround_goes_inline() -> None:
+    """Test: rows needed before a batch job would finish are generated inline."""
+    plan = plan_routes(_rows(50), deadline=600, batch_latency=3600, min_batch_size=20)
+
+    assert len(plan.inline) == 50
+    assert plan.batch == []
+
+
+def test_rows_with_their_own_deadline_are_split_out() -> None:
+    """Test: urgent rows go inline while the rest of the workload goes to batch."""
+    rows = _rows(2, deadline=30) + _rows(30)
+    rows = [row.model_copy(update={"key": f"k{i}"}) for i, row in enumerate(rows)]
+
+    plan = plan_routes(rows, deadline=None, min_batch_size=20)
+
+    assert [r.key for r in plan.inline] == ["k0", "k1"]
+    assert len(plan.batch) == 30
+    assert plan.order == [r.key for r in rows]
+
+
+def test_small_batch_remainder_runs_inline() -> None:
+    """Test: too few batch-bound rows to justify a job are generated inline."""
+    plan = plan_routes(_rows(5), deadline=None, min_batch_size=20)
+
+    assert len(plan.inline) == 5
+    assert plan.batch == []
+
+
+def test_observed_fast_batch_turnaround_keeps_work_on_batch() -> None:
+    """Test: when batch jobs have been finishing quickly, a loose deadline uses batch."""
+    plan = plan_routes(_rows(50), deadline=1800, batch_latency=900, min_batch_size=20)
+
+    assert plan.inline == []
+    assert len(plan.batch) == 50
+
+
+def test_long_inline_queue_overflows_to_batch() -> None:
+    """Test: rows the inline queue would finish after a batch job go to batch instead."""
+    plan = plan_routes(
+        _rows(200),
+        deadline=300,
+        inline_latency=60,
+        batch_latency=600,
+        concurrency=10,
+        min_batch_size=20,
+    )
+
+    # Nine waves of ten finish within 540s; a tenth wave would take as long as batch
+    assert len(plan.inline) == 90
+    assert len(plan.batch) == 110
+    assert plan.inline_duration == 540
+
+
+def test_quota_limits_inline_share() -> None:
+    """Test: a requests-per-minute quota shortens the inline queue that beats batch."""
+    plan = plan_routes(
+        _rows(200),
+        deadline=300,
+        inline_latency=30,
+        batch_latency=600,
+        concurrency=50,
+        requests_per_minute=10,
+        min_batch_size=20,
+    )
+
+    # After the first minute's 10, a request starts every 6s: the 104th finishes at 594s
+    assert len(plan.inline) == 104
+    assert len(plan.batch) == 96
+
+
+def test_tightest_deadlines_take_the_inline_slots() -> None:
+    """Test: when only some urgent rows fit inline, the most urgent ones are kept."""
+    rows = [PromptRow(key=f"r{i}", prompt=f"p{i}", deadline=500 - i) for i in range(30)] + _rows(20)
+    rows = [row.model_copy(update={"key": f"k{i}"}) for i, row in enumerate(rows)]
+
+    plan = plan_routes(rows, deadline=None, inline_latency=100, batch_latency=600, concurrency=5)
+
+    assert [r.key for r in plan.inline] == [f"k{i}" for i in range(29, 4, -1)]
+    assert [r.key for r in plan.batch] == [f"k{i}" for i in (0, 1, 2, 3, 4, *range(30, 50))]
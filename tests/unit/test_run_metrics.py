@@ -0,0 +1,91 @@
+"""Unit tests for run metrics summaries and export."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.models.result import GenerationResult
+from src.services.metrics_service import (
+    render_prometheus,
+    summarize,
+    summarize_run,
+    write_metrics,
+)
+
+
+def _result(index: int, api: float, success: bool = True) -> GenerationResult:
+    return GenerationResult(
+        index=index,
+        output_path=Path(f"out_{index}.png"),
+        success=success,
+        error_message=None if success else "boom",
+        timings={"request_build": 0.001, "api": api, "extract": 0.002, "write": 0.01},
+        duration=api + 0.013,
+        time_to_image=api + 0.002 if success else None,
+    )
+
+
+def test_summarize_interpolates_percentiles() -> None:
+    """Test: quantiles are interpolated between ranked observations."""
+    summary = summarize(float(v) for v in range(1, 101))
+
+    assert summary is not None
+    assert summary.count == 100
+    assert summary.mean == pytest.approx(50.5)
+    assert summary.p50 == pytest.approx(50.5)
+    assert summary.p95 == pytest.approx(95.05)
+    assert summary.p99 == pytest.approx(99.01)
+    assert summary.max == 100.0
+
+
+def test_summarize_single_and_empty() -> None:
+    """Test: one observation is every quantile; no observations is no summary."""
+    single = summarize([2.0])
+
+    assert single is not None
+    assert single.p50 == single.p99 == 2.0
+    assert summarize([]) is None
+
+
+def test_summarize_run_counts_and_throughput() -> None:
+    """Test: stages, end-to-end latency and images/second come from the results."""
+    results = [_result(i, api=1.0 + i) for i in range(3)] + [_result(3, 5.0, success=False)]
+
+    metrics = summarize_run(results, datetime(2026, 1, 1), wall_time=2.0)
+
+    assert (metrics.requests, metrics.succeeded, metrics.failed) == (4, 3, 1)
+    assert metrics.images_per_second == pytest.approx(1.5)
+    assert set(metrics.stages) == {"request_build", "api", "extract", "write"}
+    assert metrics.stages["api"].max == 5.0
+    assert metrics.latency["time_to_image"].count == 3
+    assert "ttfb" not in metrics.latency
+
+
+def test_prometheus_textfile_format() -> None:
+    """Test: timings are exported as labelled summaries with quantiles, sum and count."""
+    metrics = summarize_run([_result(0, 1.0), _result(1, 3.0)], datetime(2026, 1, 1), 4.0)
+
+    text = render_prometheus(metrics)
+
+    assert "# TYPE anyimg_stage_seconds summary" in text
+    assert 'anyimg_stage_seconds{stage="api",quantile="0.5"} 2.0' in text
+    assert 'anyimg_stage_seconds_sum{stage="api"} 4.0' in text
+    assert 'anyimg_stage_seconds_count{stage="api"} 2' in text
+    assert "# TYPE anyimg_requests_total counter" in text
+    assert 'anyimg_requests_total{outcome="success"} 2' in text
+    assert "anyimg_images_per_second 0.5" in text
+    assert text.endswith("\n")
+
+
+def test_write_metrics_picks_format_by_extension(tmp_path: Path) -> None:
+    """Test: .prom paths get a textfile, others JSON, with no temp files left behind."""
+    metrics = summarize_run([_result(0, 1.0)], datetime(2026, 1, 1), 1.0)
+
+    write_metrics(metrics, tmp_path / "anyimg.prom")
+    write_metrics(metrics, tmp_path / "run.json")
+
+    assert (tmp_path / "anyimg.prom").read_text().startswith("# HELP")
+    assert json.loads((tmp_path / "run.json").read_text())["succeeded"] == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["anyimg.prom", "run.json"]